@@ -0,0 +1,41 @@
+"""Vazão de AnalisadorVeiculo.analisar_lote em 10k e 100k anúncios sintéticos.
+
+Uso: python -m benchmarks.bench_analisador [--tamanhos 10000 100000]
+"""
+import argparse
+import random
+import time
+
+from benchmarks.fixtures import anuncio_olx
+from src.analyser import AnalisadorVeiculo
+from src.models import Anuncio
+
+def anuncios_sinteticos(n: int, seed: int = 42) -> list[Anuncio]:
+    rng = random.Random(seed)
+    anuncios = []
+    for i in range(n):
+        item = anuncio_olx(rng, i)
+        props = {p["name"]: p["value"] for p in item["properties"]}
+        anuncios.append(Anuncio(
+            id=str(item["listId"]), titulo=item["subject"], preco=item["price"],
+            ano=int(props["regdate"]), km=int(props["mileage"]) if rng.random() > 0.05 else 0,
+        ))
+    return anuncios
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--fipe", type=float, default=95_000)
+    args = parser.parse_args()
+
+    for n in args.tamanhos:
+        analisador = AnalisadorVeiculo(fipe_referencia=args.fipe)
+        anuncios = anuncios_sinteticos(n)
+
+        inicio = time.perf_counter()
+        analisador.analisar_lote(anuncios)
+        t = time.perf_counter() - inicio
+        print(f"{n:>7} anúncios | {t:6.3f}s | {n / t:>10,.0f} anúncios/s")
+
+if __name__ == "__main__":
+    main()
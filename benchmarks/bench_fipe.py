@@ -0,0 +1,34 @@
+"""Compara o modo serial e o concorrente de ConsultorFipe.obter_preco_medio contra o stub local.
+
+Uso: python -m benchmarks.bench_fipe [--latencia 0.03] [--concorrencia 8]
+"""
+import argparse
+import time
+
+from benchmarks.servidor_stub import ServidorStub
+from src.fipe import ConsultorFipe
+
+def medir(url: str, concorrencia: int, termo: str, ano: int) -> tuple[float, tuple[float, str]]:
+    consultor = ConsultorFipe(usar_cache=False, concorrencia=concorrencia, base_url=url)
+    inicio = time.perf_counter()
+    resultado = consultor.obter_preco_medio(termo, ano)
+    return time.perf_counter() - inicio, resultado
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latencia", type=float, default=0.03)
+    parser.add_argument("--concorrencia", type=int, default=8)
+    parser.add_argument("--versoes", type=int, default=40)
+    args = parser.parse_args()
+
+    with ServidorStub(latencia=args.latencia, n_versoes=args.versoes) as stub:
+        t_serial, r_serial = medir(stub.url_fipe, 1, "Honda Civic", 2020)
+        t_conc, r_conc = medir(stub.url_fipe, args.concorrencia, "Honda Civic", 2020)
+
+    assert r_serial == r_conc, f"Resultados divergentes: {r_serial} != {r_conc}"
+    print(f"\nSerial:       {t_serial:.3f}s -> {r_serial}")
+    print(f"Concorrente:  {t_conc:.3f}s (x{args.concorrencia}) -> {r_conc}")
+    print(f"Speedup:      {t_serial / t_conc:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Compara a extração rápida do __NEXT_DATA__ com o caminho BeautifulSoup em páginas salvas.
+
+Uso: python -m benchmarks.bench_parse [--pasta benchmarks/fixtures/olx] [--repeticoes 5]
+
+Qualquer .html salvo do navegador pode ser colocado na pasta; se ela estiver vazia,
+páginas sintéticas são geradas.
+"""
+import argparse
+import glob
+import os
+import time
+
+from benchmarks.fixtures import gerar_fixtures
+from src.scraper import OLXScraper, _json_loads
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pasta", default="benchmarks/fixtures/olx")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    caminhos = sorted(glob.glob(os.path.join(args.pasta, "*.html"))) or gerar_fixtures(args.pasta)
+    paginas = []
+    for c in caminhos:
+        with open(c, "rb") as f:
+            paginas.append(f.read())
+
+    scraper = OLXScraper()
+    print(f"JSON backend: {_json_loads.__module__}")
+    print(f"{len(paginas)} páginas, {sum(map(len, paginas)) / 1024:.0f} KB no total\n")
+
+    tempos = {}
+    for nome, rapido in (("soup", False), ("rapido", True)):
+        inicio = time.perf_counter()
+        for _ in range(args.repeticoes):
+            saidas = [scraper._parse_html(html, rapido=rapido) for html in paginas]
+        tempos[nome] = (time.perf_counter() - inicio) / (args.repeticoes * len(paginas))
+        tempos[nome + "_saida"] = saidas
+
+    for soup, rapido in zip(tempos["soup_saida"], tempos["rapido_saida"]):
+        assert [a.model_dump() for a in soup] == [a.model_dump() for a in rapido], "Listas de Anuncio divergentes"
+
+    total = sum(len(s) for s in tempos["rapido_saida"])
+    print(f"BeautifulSoup: {tempos['soup'] * 1000:8.2f} ms/página")
+    print(f"Varredura:     {tempos['rapido'] * 1000:8.2f} ms/página")
+    print(f"Speedup:       {tempos['soup'] / tempos['rapido']:8.1f}x  ({total} anúncios idênticos)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Gera páginas de resultado da OLX sintéticas, no mesmo formato do __NEXT_DATA__ real."""
+import json
+import os
+import random
+
+MODELOS = [
+    ("Honda Civic", ["LX", "LXR", "EXL", "Touring", "Sport"]),
+    ("Toyota Corolla", ["GLi", "XEi", "Altis", "Cross"]),
+    ("VW Gol", ["1.0", "1.6 MSI", "Track"]),
+    ("Chevrolet Onix", ["LT", "LTZ", "Premier"]),
+]
+UFS = ["SP", "RJ", "MG", "PR", "SC", "RS", "BA", "GO", "DF", "PE"]
+TITULOS_EXTRA = ["", "", "", " único dono", " revisado", " de leilão", " sinistro recuperado", " baixa km"]
+
+LINK_OLX = "https://sp.olx.com.br/autos-e-pecas/carros-vans-e-utilitarios"
+DESCRICOES = ["Carro muito conservado, revisões na concessionária.", "Aceito troca. IPVA pago.",
+              "Veículo de leilão, documentação ok.", "Pequena batida na traseira já reparada.",
+              "Único dono, manual e chave reserva."]
+
+def anuncio_olx(rng: random.Random, list_id: int, base_link: str = LINK_OLX) -> dict:
+    modelo, versoes = rng.choice(MODELOS)
+    ano = rng.randint(2010, 2024)
+    uf = rng.choice(UFS)
+    return {
+        "listId": list_id,
+        "subject": f"{modelo} {rng.choice(versoes)} {ano}{rng.choice(TITULOS_EXTRA)}",
+        "price": f"R$ {rng.randint(30, 180) * 1000:,}".replace(",", "."),
+        "url": f"{base_link}/anuncio-{list_id}",
+        "listTime": f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T10:00:00.000Z",
+        "images": [{"url": f"https://img.olx.com.br/images/{list_id % 97}/{list_id}.jpg"}],
+        "location": {"municipality": f"Cidade {rng.randint(1, 40)}", "uf": uf},
+        "properties": [
+            {"name": "regdate", "value": str(ano)},
+            {"name": "mileage", "value": str(rng.randint(0, 40000) * max(1, 2025 - ano) // 4)},
+            {"name": "gearbox", "value": rng.choice(["Manual", "Automático"])},
+            {"name": "fuel", "value": rng.choice(["Flex", "Gasolina", "Diesel"])},
+        ],
+    }
+
+def _html_next_data(dados: dict, ruido_kb: int) -> str:
+    bloco = '<div class="sc-card"><a href="/x"><span class="price">R$ 1.000</span><img src="/i.jpg" alt=""></a></div>\n'
+    ruido = bloco * (ruido_kb * 1024 // len(bloco))
+    return (
+        "<!DOCTYPE html><html lang=\"pt-BR\"><head><meta charset=\"utf-8\"><title>Carros | OLX</title>"
+        "<script>window.dataLayer=[];</script></head><body><div id=\"__next\">" + ruido + "</div>"
+        "<script id=\"__NEXT_DATA__\" type=\"application/json\">" + json.dumps(dados, ensure_ascii=False) + "</script>"
+        "<script src=\"/_next/static/chunks/main.js\" async></script></body></html>"
+    )
+
+def pagina_olx(pagina: int, n_anuncios: int = 50, seed: int = 0, ruido_kb: int = 400, base_link: str = LINK_OLX) -> str:
+    """Monta uma página com ``n_anuncios`` e ~``ruido_kb`` KB de marcação extra, como o HTML real."""
+    rng = random.Random(seed * 1000 + pagina)
+    ads = [anuncio_olx(rng, 1_000_000 * (seed + 1) + pagina * 1000 + i, base_link) for i in range(n_anuncios)]
+    dados = {"props": {"pageProps": {"ads": ads, "totalOfAds": n_anuncios * 10}}, "page": "/autos-e-pecas"}
+    return _html_next_data(dados, ruido_kb)
+
+def pagina_detalhe(list_id: int, ruido_kb: int = 200) -> str:
+    """Página de um anúncio (adview) com descrição e propriedades completas no __NEXT_DATA__."""
+    rng = random.Random(list_id)
+    ad = {
+        "listId": list_id,
+        "description": "<br>".join(rng.sample(DESCRICOES, 2)),
+        "properties": [
+            {"name": "regdate", "label": "Ano", "value": str(rng.randint(2010, 2024))},
+            {"name": "mileage", "label": "Quilometragem", "value": str(rng.randint(0, 200000))},
+            {"name": "car_steering", "label": "Direção", "value": rng.choice(["Elétrica", "Hidráulica"])},
+            {"name": "end_tag", "label": "Final de placa", "value": str(rng.randint(0, 9))},
+        ],
+    }
+    return _html_next_data({"props": {"pageProps": {"ad": ad}}, "page": "/vi/[id]"}, ruido_kb)
+
+def gerar_fixtures(pasta: str, paginas: int = 5, n_anuncios: int = 50) -> list[str]:
+    if not os.path.exists(pasta): os.makedirs(pasta)
+    caminhos = []
+    for p in range(1, paginas + 1):
+        caminho = os.path.join(pasta, f"olx_pagina_{p}.html")
+        if not os.path.exists(caminho):
+            with open(caminho, "w", encoding="utf-8") as f:
+                f.write(pagina_olx(p, n_anuncios))
+        caminhos.append(caminho)
+    return caminhos
@@ -0,0 +1,61 @@
+"""Grava páginas reais da OLX e respostas reais da FIPE como fixtures dos benchmarks (usa a rede).
+
+Uso: python -m benchmarks.gravar "Honda Civic" --paginas 5 --anos 2018 2019 2020
+
+As páginas vão para ``benchmarks/fixtures/olx/olx_pagina_N.html`` (fora do git) e as respostas
+FIPE para ``benchmarks/fixtures/fipe.json`` (endpoint -> JSON), que o ``ServidorStub`` reproduz.
+"""
+import argparse
+import json
+import os
+
+from src.fipe import ConsultorFipe
+from src.scraper import OLXScraper
+
+class ConsultorGravador(ConsultorFipe):
+    """ConsultorFipe que guarda cada resposta recebida, chaveada pelo endpoint."""
+    def __init__(self, **kwargs):
+        super().__init__(usar_cache=False, **kwargs)
+        self.gravacao = {}
+
+    def _get_json(self, endpoint: str, chave=None):
+        dados = super()._get_json(endpoint, chave)
+        with self._lock:
+            self.gravacao[endpoint] = dados
+        return dados
+
+def gravar_olx(termo: str, paginas: int, pasta: str) -> int:
+    if not os.path.exists(pasta): os.makedirs(pasta)
+    scraper = OLXScraper()
+    for p in range(1, paginas + 1):
+        print(f"🔎 Gravando OLX página {p}...")
+        resp = scraper.session.get(scraper.base_url, params={"q": termo, "o": p},
+                                   impersonate=scraper.impersonate, timeout=scraper.timeout)
+        if resp.status_code != 200:
+            print(f"❌ Erro HTTP {resp.status_code}")
+            return p - 1
+        with open(os.path.join(pasta, f"olx_pagina_{p}.html"), "wb") as f:
+            f.write(resp.content)
+    return paginas
+
+def gravar_fipe(termo: str, anos: list, caminho: str) -> int:
+    consultor = ConsultorGravador()
+    print(consultor.planejar(termo).precos(anos))
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(consultor.gravacao, f, ensure_ascii=False)
+    return len(consultor.gravacao)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("termo")
+    parser.add_argument("--paginas", type=int, default=5)
+    parser.add_argument("--anos", type=int, nargs="+", default=[2018, 2019, 2020])
+    parser.add_argument("--pasta-olx", default="benchmarks/fixtures/olx")
+    parser.add_argument("--fipe", default="benchmarks/fixtures/fipe.json")
+    args = parser.parse_args()
+
+    print(f"✅ {gravar_olx(args.termo, args.paginas, args.pasta_olx)} páginas OLX gravadas em {args.pasta_olx}")
+    print(f"✅ {gravar_fipe(args.termo, args.anos, args.fipe)} respostas FIPE gravadas em {args.fipe}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Inicialização da GUI: orçamento de import por módulo (``-X importtime``) e tempo até a primeira janela.
+
+Uso:
+    python -m benchmarks.inicializacao                  # melhor de 5, compara com ORCAMENTO_MS
+    python -m benchmarks.inicializacao --repeticoes 10 --modulo main
+
+Cada medida roda num interpretador novo (o cache de import do processo atual não interfere).
+Falha (código 1) se um import direto de ``main`` estourar o orçamento ou se alguma dependência
+pesada (``PESADOS``) for carregada antes da janela. Sem display, a medida da janela é pulada.
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+# ms, import cumulativo; módulos fora da lista usam o orçamento "*"
+ORCAMENTO_MS = {"main": 250, "customtkinter": 200, "*": 20}
+# Só devem carregar no primeiro uso (busca, Excel) ou pelo pré-aquecimento em segundo plano
+PESADOS = ("pandas", "numpy", "curl_cffi", "bs4", "pydantic", "requests", "openpyxl", "xlsxwriter")
+
+_JANELA = """
+import time
+inicio = time.perf_counter()
+import main
+app = main.PyMotorsApp()
+app.update()
+print(time.perf_counter() - inicio)
+app.destroy()
+"""
+
+def importtime(modulo: str) -> list:
+    """[(profundidade, nome, próprio_us, cumulativo_us)] de ``python -X importtime -c 'import modulo'``."""
+    saida = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+                           capture_output=True, text=True, env={**os.environ, "PYMOTORS_PREAQUECER": "0"})
+    if saida.returncode != 0:
+        raise RuntimeError(saida.stderr.strip().splitlines()[-1])
+    linhas = []
+    for linha in saida.stderr.splitlines():
+        if not linha.startswith("import time:") or "self [us]" in linha:
+            continue
+        proprio, cumulativo, nome = linha[len("import time:"):].split("|")
+        profundidade = (len(nome) - len(nome.lstrip())) // 2
+        linhas.append((profundidade, nome.strip(), int(proprio), int(cumulativo)))
+    return linhas
+
+def diretos(linhas: list, modulo: str) -> dict:
+    """Tempo cumulativo (ms) do próprio módulo e de cada import feito diretamente por ele.
+
+    O ``-X importtime`` lista os filhos antes do pai: os diretos são as linhas um nível abaixo
+    que antecedem a do módulo, até a linha anterior do mesmo nível.
+    """
+    fim = next(i for i, (_, nome, _, _) in enumerate(linhas) if nome == modulo)
+    raiz = linhas[fim][0]
+    tempos = {modulo: linhas[fim][3] / 1000}
+    for profundidade, nome, _, cumulativo in reversed(linhas[:fim]):
+        if profundidade <= raiz:
+            break
+        if profundidade == raiz + 1:
+            tempos[nome] = cumulativo / 1000
+    return tempos
+
+def tempo_janela() -> float:
+    """Segundos do primeiro import até a janela desenhada (``update``), num interpretador novo."""
+    saida = subprocess.run([sys.executable, "-c", _JANELA], capture_output=True, text=True,
+                           env={**os.environ, "PYMOTORS_PREAQUECER": "0"})
+    if saida.returncode != 0:
+        raise RuntimeError(saida.stderr.strip().splitlines()[-1])
+    return float(saida.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modulo", default="main")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    melhores = defaultdict(lambda: float("inf"))
+    carregados = set()
+    for _ in range(args.repeticoes):
+        linhas = importtime(args.modulo)
+        carregados.update(nome.split(".")[0] for _, nome, _, _ in linhas)
+        for nome, ms in diretos(linhas, args.modulo).items():
+            melhores[nome] = min(melhores[nome], ms)
+
+    falhas = 0
+    print(f"\n{'import (cumulativo)':<42} {'melhor':>10} {'orçamento':>10}")
+    for nome, ms in sorted(melhores.items(), key=lambda item: -item[1]):
+        orcamento = ORCAMENTO_MS.get(nome, ORCAMENTO_MS["*"])
+        estourou = ms > orcamento
+        falhas += estourou
+        print(f"{nome:<42} {ms:>8.1f}ms {orcamento:>8}ms {'🔴' if estourou else ''}")
+
+    pesados = sorted(p for p in PESADOS if p in carregados)
+    if pesados:
+        falhas += 1
+        print(f"\n🔴 Carregados antes da janela: {', '.join(pesados)}")
+
+    try:
+        janela = min(tempo_janela() for _ in range(args.repeticoes))
+        print(f"\n🪟 Até a primeira janela: {janela * 1000:.0f}ms (melhor de {args.repeticoes})")
+    except RuntimeError as e:
+        print(f"\n⚠️ Janela não medida (sem display?): {e}")
+
+    print(f"\n{'🔴 ' + str(falhas) + ' estouros de orçamento' if falhas else '✅ Dentro do orçamento'}")
+    return 1 if falhas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""Servidor HTTP local que imita a OLX e a API FIPE, usado pelos benchmarks (sem tocar a rede).
+
+FIPE: responde a partir de uma gravação (endpoint -> JSON, ver ``benchmarks/fixtures/fipe.json``)
+ou, sem gravação, de um catálogo sintético. OLX: caminhos terminados em ``/anuncio-<id>`` são
+páginas de anúncio; os demais são buscas, em que o parâmetro ``o`` escolhe a página, lida de
+``pasta_olx`` (``olx_pagina_N.html``) ou gerada com links apontando para o próprio stub.
+"""
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.fixtures import pagina_detalhe, pagina_olx
+
+PREFIXO_FIPE = "/fipe/api/v1"
+CAMINHO_OLX = "/brasil/autos-e-pecas/carros-vans-e-utilitarios"
+PAGINA_VAZIA = b'<html><body><script id="__NEXT_DATA__" type="application/json">{"props": {"pageProps": {"ads": []}}}</script></body></html>'
+
+def catalogo_fipe(n_versoes: int = 40) -> dict:
+    marcas = [{"codigo": "25", "nome": "Honda"}, {"codigo": "1", "nome": "Acura"}, {"codigo": "59", "nome": "VW - VolksWagen"}]
+    modelos = [{"codigo": 5000 + i, "nome": f"Civic Sedan {sufixo} 2.0 Flex Aut."}
+               for i, sufixo in enumerate(["LX", "LXR", "EXL", "Touring", "Sport", "EX"] * (n_versoes // 6 + 1))][:n_versoes]
+    modelos.append({"codigo": 9999, "nome": "Fit LX 1.5 Flex"})
+    anos = [{"codigo": f"{a}-1", "nome": f"{a} Gasolina"} for a in range(2024, 2012, -1)]
+    return {"marcas": marcas, "modelos": modelos, "anos": anos}
+
+def _resposta_sintetica(catalogo: dict, partes: list):
+    if partes == ["carros", "marcas"]:
+        return catalogo["marcas"]
+    if len(partes) == 4 and partes[3] == "modelos":
+        return {"modelos": catalogo["modelos"], "anos": []}
+    if len(partes) == 6 and partes[5] == "anos":
+        return catalogo["anos"]
+    if len(partes) == 7:
+        cod_modelo, ano = int(partes[4]), int(partes[6].split("-")[0])
+        valor = 60000 + (cod_modelo % 100) * 1500 + (ano - 2012) * 4000
+        return {"Valor": f"R$ {valor:,}".replace(",", ".") + ",00", "AnoModelo": ano}
+    return None
+
+def gravacao_sintetica(n_versoes: int = 40) -> dict:
+    """O catálogo sintético no formato de gravação (endpoint -> JSON), para salvar como fixture."""
+    catalogo = catalogo_fipe(n_versoes)
+    gravacao = {"/carros/marcas": catalogo["marcas"],
+                "/carros/marcas/25/modelos": {"modelos": catalogo["modelos"], "anos": []}}
+    for mod in catalogo["modelos"]:
+        base = f"/carros/marcas/25/modelos/{mod['codigo']}/anos"
+        gravacao[base] = catalogo["anos"]
+        for ano in catalogo["anos"]:
+            gravacao[f"{base}/{ano['codigo']}"] = _resposta_sintetica(catalogo, f"{base}/{ano['codigo']}".strip("/").split("/"))
+    return gravacao
+
+def carregar_gravacao(caminho: str) -> dict:
+    with open(caminho, encoding="utf-8") as f:
+        return json.load(f)
+
+class _HandlerStub(BaseHTTPRequestHandler):
+    catalogo: dict = {}
+    gravacao: Optional[dict] = None
+    latencia: float = 0.0
+    pasta_olx: Optional[str] = None
+    paginas_olx: int = 5
+    anuncios_por_pagina: int = 50
+    _paginas: dict = {}
+    _lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _enviar(self, corpo: bytes, tipo: str):
+        self.send_response(200)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _pagina_olx(self, pagina: int) -> bytes:
+        with self._lock:
+            if pagina not in self._paginas:
+                caminho = os.path.join(self.pasta_olx, f"olx_pagina_{pagina}.html") if self.pasta_olx else None
+                if caminho and os.path.exists(caminho):
+                    with open(caminho, "rb") as f:
+                        self._paginas[pagina] = f.read()
+                elif not self.pasta_olx and 1 <= pagina <= self.paginas_olx:
+                    base_link = f"http://{self.headers.get('Host')}{CAMINHO_OLX}"
+                    self._paginas[pagina] = pagina_olx(pagina, self.anuncios_por_pagina, base_link=base_link).encode()
+                else:
+                    self._paginas[pagina] = PAGINA_VAZIA
+            return self._paginas[pagina]
+
+    def do_GET(self):
+        time.sleep(self.latencia)
+        url = urlparse(self.path)
+
+        if "/anuncio-" in url.path:
+            self._enviar(pagina_detalhe(int(url.path.rsplit("-", 1)[1])).encode(), "text/html; charset=utf-8")
+            return
+
+        if not url.path.startswith(PREFIXO_FIPE):
+            pagina = int(parse_qs(url.query).get("o", ["1"])[0])
+            self._enviar(self._pagina_olx(pagina), "text/html; charset=utf-8")
+            return
+
+        endpoint = url.path[len(PREFIXO_FIPE):].rstrip("/")
+        if self.gravacao is not None:
+            dados = self.gravacao.get(endpoint)
+        else:
+            dados = _resposta_sintetica(self.catalogo, endpoint.strip("/").split("/"))
+        if dados is None:
+            self.send_error(404)
+            return
+        self._enviar(json.dumps(dados).encode(), "application/json")
+
+class ServidorStub:
+    """Sobe o stub em uma porta livre de 127.0.0.1, em thread daemon.
+
+    Com ``pasta_olx`` as páginas gravadas são servidas e as demais vêm vazias; sem ela,
+    ``paginas_olx`` páginas sintéticas de ``anuncios_por_pagina`` anúncios são geradas.
+    """
+    def __init__(self, latencia: float = 0.03, n_versoes: int = 40, gravacao_fipe: Optional[dict] = None,
+                 pasta_olx: Optional[str] = None, paginas_olx: int = 5, anuncios_por_pagina: int = 50):
+        handler = type("HandlerStub", (_HandlerStub,), {
+            "catalogo": catalogo_fipe(n_versoes), "gravacao": gravacao_fipe, "latencia": latencia,
+            "pasta_olx": pasta_olx, "paginas_olx": paginas_olx, "anuncios_por_pagina": anuncios_por_pagina,
+            "_paginas": {}, "_lock": threading.Lock(),
+        })
+        self.servidor = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.servidor.daemon_threads = True
+        self.thread = threading.Thread(target=self.servidor.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.servidor.server_port}"
+
+    @property
+    def url_fipe(self) -> str:
+        return f"{self.url}{PREFIXO_FIPE}"
+
+    @property
+    def url_olx(self) -> str:
+        return f"{self.url}{CAMINHO_OLX}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.servidor.shutdown()
+        self.servidor.server_close()
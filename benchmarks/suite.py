@@ -0,0 +1,238 @@
+"""Suíte offline: vazão por etapa e ponta a ponta contra o stub local, comparada a um baseline salvo.
+
+Uso:
+    python -m benchmarks.suite                      # mede e compara com benchmarks/baseline.json
+    python -m benchmarks.suite --salvar-baseline    # mede e grava o baseline
+    python -m benchmarks.suite --paginas 1 5 20 --anuncios 50 200 --tolerancia 0.3
+
+Etapas: ``_parse_html`` (por tamanho de página), ``obter_preco_medio`` (frio e com cache),
+``AnalisadorVeiculo.analisar_lote``, exportação Excel, ``executar_consulta`` inteiro
+(OLX + FIPE servidos pelo stub) por número de páginas, o enriquecimento pelas páginas de anúncio e as
+``EstatisticasMercado`` (``adicionar``/``pontuar``) e o acervo de páginas (gravar e reprocessar). Cada medida é o melhor de N repetições;
+a saída termina com código 1 se alguma etapa ficou mais lenta que o baseline além da tolerância.
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+
+from benchmarks.bench_analisador import anuncios_sinteticos
+from benchmarks.fixtures import pagina_olx
+from benchmarks.servidor_stub import ServidorStub, carregar_gravacao
+from src.acervo import AcervoPaginas, reprocessar
+from src.analyser import AnalisadorVeiculo
+from src.cache import CacheFipe
+from src.detalhes import EnriquecedorAnuncios
+from src.duplicados import IndiceDuplicados
+from src.exportador import ExportadorExcel
+from src.fipe import ConsultorFipe
+from src.mercado import EstatisticasMercado
+from src.metricas import metricas
+from src.models import Consulta
+from src.pipeline import executar_consulta
+from src.scraper import OLXScraper
+
+BASELINE = "benchmarks/baseline.json"
+GRAVACAO_FIPE = "benchmarks/fixtures/fipe.json"
+
+def melhor_de(repeticoes: int, funcao, preparar=None) -> float:
+    """Menor tempo (s) de ``funcao(preparado)`` em ``repeticoes`` rodadas; ``preparar`` fica fora da medida."""
+    tempos = []
+    for _ in range(repeticoes):
+        argumento = preparar() if preparar else None
+        # Como no timeit: coleta antes e GC desligado durante a medida, para reduzir o ruído
+        gc.collect()
+        gc.disable()
+        try:
+            inicio = time.perf_counter()
+            with redirect_stdout(io.StringIO()):
+                funcao(argumento)
+            tempos.append(time.perf_counter() - inicio)
+        finally:
+            gc.enable()
+    return min(tempos)
+
+def medir_parse(anuncios_por_pagina: list, repeticoes: int) -> dict:
+    scraper = OLXScraper()
+    resultados = {}
+    for n in anuncios_por_pagina:
+        paginas = [pagina_olx(p, n).encode() for p in range(1, 6)]
+        t = melhor_de(repeticoes, lambda _: [scraper._parse_html(html) for html in paginas])
+        resultados[f"parse.{n}_anuncios_por_pagina"] = (t / len(paginas), n, "anúncio")
+    return resultados
+
+def medir_fipe(gravacao, latencia: float, repeticoes: int) -> dict:
+    resultados = {}
+    with ServidorStub(latencia=latencia, gravacao_fipe=gravacao) as stub, tempfile.TemporaryDirectory() as tmp:
+        frio = lambda _: ConsultorFipe(usar_cache=False, base_url=stub.url_fipe).obter_preco_medio("Honda Civic", 2020)
+        resultados["fipe.preco_medio_frio"] = (melhor_de(repeticoes, frio), 1, "consulta")
+
+        cache = CacheFipe(os.path.join(tmp, "cache.sqlite"))
+        ConsultorFipe(cache=cache, base_url=stub.url_fipe).obter_preco_medio("Honda Civic", 2020)
+        quente = lambda _: ConsultorFipe(cache=cache, base_url=stub.url_fipe).obter_preco_medio("Honda Civic", 2020)
+        resultados["fipe.preco_medio_cache"] = (melhor_de(repeticoes, quente), 1, "consulta")
+        cache.fechar()
+    return resultados
+
+def medir_analise_e_excel(tamanhos: list, repeticoes: int) -> dict:
+    resultados = {}
+    analisador = AnalisadorVeiculo(fipe_referencia=95_000)
+    for n in tamanhos:
+        preparar = lambda: anuncios_sinteticos(n)
+        t = melhor_de(repeticoes, analisador.analisar_lote, preparar)
+        resultados[f"analise.lote_{n}"] = (t, n, "anúncio")
+
+        analisados = analisador.analisar_lote(anuncios_sinteticos(n))
+        with tempfile.TemporaryDirectory() as tmp:
+            t = melhor_de(repeticoes, lambda _: ExportadorExcel(pasta=tmp).exportar(analisados, "bench"))
+        resultados[f"exportar.excel_{n}"] = (t, n, "anúncio")
+    return resultados
+
+def medir_mercado(tamanhos: list, repeticoes: int) -> dict:
+    resultados = {}
+    for n in tamanhos:
+        anuncios = anuncios_sinteticos(n)
+        t = melhor_de(repeticoes, lambda mercado: mercado.adicionar(anuncios, "Honda Civic"), EstatisticasMercado)
+        resultados[f"mercado.adicionar_{n}"] = (t, n, "anúncio")
+
+        mercado = EstatisticasMercado()
+        mercado.adicionar(anuncios, "Honda Civic")
+        t = melhor_de(repeticoes, lambda _: mercado.pontuar(anuncios, "Honda Civic"))
+        resultados[f"mercado.pontuar_{n}"] = (t, n, "anúncio")
+    return resultados
+
+def medir_duplicados(tamanhos: list, repeticoes: int) -> dict:
+    resultados = {}
+    for n in tamanhos:
+        preparar = lambda: anuncios_sinteticos(n)
+        t = melhor_de(repeticoes, lambda lote: IndiceDuplicados().colapsar(lote), preparar)
+        resultados[f"duplicados.colapsar_{n}"] = (t, n, "anúncio")
+    return resultados
+
+def medir_acervo(paginas: int, anuncios_por_pagina: int, repeticoes: int) -> dict:
+    conteudos = [pagina_olx(p, anuncios_por_pagina).encode() for p in range(1, 21)]
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        def gravar(pasta):
+            acervo = AcervoPaginas(pasta)
+            for i in range(paginas):
+                acervo.gravar(conteudos[i % len(conteudos)], termo="civic", pagina=i % len(conteudos) + 1)
+            acervo.fechar()
+        t = melhor_de(repeticoes, gravar, lambda: tempfile.mkdtemp(dir=tmp))
+        resultados[f"acervo.gravar_{paginas}_paginas"] = (t, paginas, "página")
+
+        pasta = tempfile.mkdtemp(dir=tmp)
+        gravar(pasta)
+        t = melhor_de(repeticoes, lambda _: sum(1 for _ in reprocessar(AcervoPaginas(pasta))))
+        resultados[f"acervo.reprocessar_{paginas}_paginas"] = (t, paginas * anuncios_por_pagina, "anúncio")
+    return resultados
+
+def medir_ponta_a_ponta(paginas: list, anuncios_por_pagina: int, gravacao, latencia: float, repeticoes: int) -> dict:
+    resultados = {}
+    for p in paginas:
+        with ServidorStub(latencia=latencia, gravacao_fipe=gravacao, paginas_olx=p,
+                          anuncios_por_pagina=anuncios_por_pagina) as stub:
+            consulta = Consulta(termo="civic", termo_fipe="Honda Civic", paginas=p, min_year=2018)
+
+            def rodar(_):
+                scraper = OLXScraper(max_paralelo=4, intervalo_minimo=0, base_url=stub.url_olx)
+                consultor = ConsultorFipe(usar_cache=False, base_url=stub.url_fipe)
+                resultado = executar_consulta(consulta, scraper, consultor)
+                assert not resultado.erro and len(resultado.anuncios) == p * anuncios_por_pagina, resultado.erro
+
+            metricas.zerar()
+            t = melhor_de(repeticoes, rodar)
+            etapas = metricas.resumo()["etapas"]
+        resultados[f"e2e.{p}_paginas"] = (t, p * anuncios_por_pagina, "anúncio")
+        for etapa in ("pipeline.olx", "pipeline.fipe", "analise.lote"):
+            if etapa in etapas:
+                resultados[f"e2e.{p}_paginas.{etapa}"] = (etapas[etapa]["min_ms"] / 1000, p * anuncios_por_pagina, "anúncio")
+    return resultados
+
+def medir_detalhes(paginas: int, anuncios_por_pagina: int, latencia: float, repeticoes: int) -> dict:
+    """Enriquecimento sem cache: uma página de anúncio por listing, pelo pool do EnriquecedorAnuncios."""
+    with ServidorStub(latencia=latencia, paginas_olx=paginas, anuncios_por_pagina=anuncios_por_pagina) as stub:
+        scraper = OLXScraper(max_paralelo=8, intervalo_minimo=0, base_url=stub.url_olx)
+        with redirect_stdout(io.StringIO()):
+            anuncios = scraper.buscar("civic", paginas)
+        enriquecedor = EnriquecedorAnuncios(scraper, usar_cache=False)
+
+        def preparar():
+            for a in anuncios:
+                a.descricao = None
+            return anuncios
+
+        t = melhor_de(repeticoes, enriquecedor.enriquecer, preparar)
+    return {f"detalhes.{len(anuncios)}_anuncios": (t, len(anuncios), "anúncio")}
+
+def comparar(resultados: dict, baseline: dict, tolerancia: float) -> int:
+    regressoes = 0
+    print(f"\n{'etapa':<42} {'tempo':>10} {'vazão':>16} {'baseline':>10} {'Δ':>8}")
+    for nome, (segundos, unidades, unidade) in resultados.items():
+        vazao = f"{unidades / segundos:,.0f} {unidade}/s" if segundos else "-"
+        linha = f"{nome:<42} {segundos * 1000:>8.1f}ms {vazao:>16}"
+        if nome in baseline:
+            delta = segundos / baseline[nome] - 1 if baseline[nome] else 0.0
+            marca = "🔴" if delta > tolerancia else ("🟢" if delta < -tolerancia else "  ")
+            regressoes += delta > tolerancia
+            linha += f" {baseline[nome] * 1000:>8.1f}ms {delta:>+7.0%} {marca}"
+        print(linha)
+    return regressoes
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--paginas", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--anuncios", type=int, nargs="+", default=[50, 200], help="anúncios por página")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[1_000, 10_000], help="lotes do analisador/Excel")
+    parser.add_argument("--latencia", type=float, default=0.005, help="latência do stub por requisição (s)")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--tolerancia", type=float, default=0.3)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--salvar-baseline", action="store_true")
+    args = parser.parse_args()
+
+    # Com gravação FIPE (real ou sintética) no disco, o stub a reproduz; senão usa o catálogo sintético
+    gravacao = carregar_gravacao(GRAVACAO_FIPE) if os.path.exists(GRAVACAO_FIPE) else None
+
+    resultados = {}
+    print("⏱️ Parse..."); resultados.update(medir_parse(args.anuncios, args.repeticoes))
+    print("⏱️ FIPE..."); resultados.update(medir_fipe(gravacao, args.latencia, args.repeticoes))
+    print("⏱️ Análise e Excel..."); resultados.update(medir_analise_e_excel(args.tamanhos, args.repeticoes))
+    print("⏱️ Mercado..."); resultados.update(medir_mercado(args.tamanhos, args.repeticoes))
+    print("⏱️ Duplicados..."); resultados.update(medir_duplicados(args.tamanhos, args.repeticoes))
+    print("⏱️ Acervo..."); resultados.update(medir_acervo(200, args.anuncios[0], args.repeticoes))
+    print("⏱️ Ponta a ponta...")
+    resultados.update(medir_ponta_a_ponta(args.paginas, args.anuncios[0], gravacao, args.latencia, args.repeticoes))
+    print("⏱️ Detalhes...")
+    resultados.update(medir_detalhes(max(args.paginas), args.anuncios[0], args.latencia, args.repeticoes))
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.salvar_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["resultados"]
+    regressoes = comparar(resultados, baseline, args.tolerancia)
+
+    if args.salvar_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "gerado_em": datetime.now().isoformat(timespec="seconds"),
+                "maquina": {"python": platform.python_version(), "sistema": platform.platform(),
+                            "processador": platform.processor() or platform.machine(), "cpus": os.cpu_count()},
+                "parametros": vars(args),
+                "resultados": {nome: round(segundos, 6) for nome, (segundos, _, _) in resultados.items()},
+            }, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Baseline salvo em {args.baseline}")
+    elif baseline:
+        print(f"\n{'🔴 ' + str(regressoes) + ' regressões' if regressoes else '✅ Sem regressões'} "
+              f"(tolerância {args.tolerancia:.0%})")
+    return 1 if regressoes else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
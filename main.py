@@ -1,14 +1,14 @@
+import importlib
 import os
+import queue
 import threading
 import webbrowser
-from datetime import datetime
 from tkinter import messagebox
-import pandas as pd
 import customtkinter as ctk
 
-from src.scraper import OLXScraper
-from src.analyser import AnalisadorVeiculo
-from src.fipe import ConsultorFipe
+from src.metricas import metricas
+# scraper (curl_cffi, pydantic), analisador (numpy), FIPE (requests) e pandas só carregam no primeiro
+# uso, para a janela abrir antes; com a UI ociosa, uma thread de fundo pode adiantar esses imports
 
 ctk.set_appearance_mode("Light")
 ctk.set_default_color_theme("blue")
@@ -23,62 +23,191 @@ MOTORES = [
     "3.0", "Turbo", "V6", "V8", "Diesel", "Híbrido", "Elétrico"
 ]
 
+ALTURA_CARD = 150
+MAX_TAGS_CARD = 6
+TAMANHO_BLOCO_UI = 200
+
+PREAQUECER = os.environ.get("PYMOTORS_PREAQUECER", "1") != "0"
+MODULOS_BUSCA = ("src.scraper", "src.analyser", "src.fipe")
+
+def preaquecer(modulos):
+    """Importa ``modulos`` em segundo plano; erros ficam para o uso real relatar."""
+    def importar():
+        for nome in modulos:
+            try:
+                importlib.import_module(nome)
+            except Exception:
+                pass
+    threading.Thread(target=importar, daemon=True).start()
+
+def ordem_score(anuncio):
+    return (anuncio.score_preco != "Excelente", anuncio.score_preco != "Bom")
+
 class CardAnuncio(ctk.CTkFrame):
-    """Componente visual que representa um único anúncio na lista."""
-    def __init__(self, master, anuncio):
-        bg_color = ("gray90", "gray30")
+    """Componente visual reciclável: os widgets são criados uma vez e reapontados via ``mostrar``."""
+    def __init__(self, master):
+        super().__init__(master, fg_color=("gray90", "gray30"), corner_radius=8,
+                         border_width=1, border_color="gray80", height=ALTURA_CARD - 10)
+        self.anuncio = None
+        
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_columnconfigure(1, weight=0)
+        self.grid_propagate(False)
+        
+        self.lbl_titulo = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=14, weight="bold"), anchor="w")
+        self.lbl_titulo.grid(row=0, column=0, padx=10, pady=(10, 0), sticky="ew")
+        
+        self.frame_tags = ctk.CTkFrame(self, fg_color="transparent")
+        self.frame_tags.grid(row=1, column=0, padx=10, pady=(5, 0), sticky="w")
+        fonte_tag = ctk.CTkFont(size=10, weight="bold")
+        self.lbl_tags = [ctk.CTkLabel(self.frame_tags, text="", text_color="white", font=fonte_tag, corner_radius=6)
+                         for _ in range(MAX_TAGS_CARD)]
+
+        self.lbl_detalhes = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=12), text_color=("gray40", "gray70"), anchor="w")
+        self.lbl_detalhes.grid(row=2, column=0, padx=10, pady=(5, 5), sticky="ew")
+
+        self.lbl_local = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=11), text_color=("gray50", "gray60"), anchor="w")
+        self.lbl_local.grid(row=3, column=0, padx=10, pady=(0, 10), sticky="ew")
+        
+        self.lbl_preco = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=16, weight="bold"), text_color="#00AA66")
+        self.lbl_preco.grid(row=0, column=1, rowspan=4, padx=15, pady=10)
+        
+        self.btn_link = ctk.CTkButton(self, text="Ver Oferta ↗", width=100, height=25, 
+                                      fg_color="transparent", border_width=1, border_color=("gray60", "gray50"),
+                                      text_color=("gray10", "gray90"), hover_color=("gray80", "gray40"),
+                                      command=lambda: self.anuncio and webbrowser.open(self.anuncio.link))
+        self.btn_link.grid(row=4, column=0, columnspan=2, padx=10, pady=(0, 10), sticky="e")
+
+    def mostrar(self, anuncio):
+        if anuncio is self.anuncio:
+            return
+        self.anuncio = anuncio
+
         border_color = "gray80"
         border_width = 1
-
         if "Excelente" in anuncio.score_preco:
             border_color = "#00AA66"
             border_width = 2
         elif "Cuidado" in anuncio.score_preco:
             border_color = "#FF5555"
             border_width = 2
-
-        super().__init__(master, fg_color=bg_color, corner_radius=8, 
-                         border_width=border_width, border_color=border_color)
-        
-        self.grid_columnconfigure(0, weight=1)
-        self.grid_columnconfigure(1, weight=0)
-        
-        lbl_titulo = ctk.CTkLabel(self, text=anuncio.titulo, font=ctk.CTkFont(size=14, weight="bold"), anchor="w")
-        lbl_titulo.grid(row=0, column=0, padx=10, pady=(10, 0), sticky="ew")
-        
-        if anuncio.tags:
-            frame_tags = ctk.CTkFrame(self, fg_color="transparent")
-            frame_tags.grid(row=1, column=0, padx=10, pady=(5, 0), sticky="w")
-            for tag in anuncio.tags:
-                cor_tag = "#3B8ED0"
-                if "ALERTA" in tag: cor_tag = "#D03B3B"
-                elif "Abaixo" in tag or "Baixa" in tag: cor_tag = "#2CC985"
-                elif "Acima" in tag or "Alta" in tag: cor_tag = "#E5A000"
-                
-                lbl_tag = ctk.CTkLabel(frame_tags, text=f" {tag} ", fg_color=cor_tag, text_color="white", 
-                                     font=ctk.CTkFont(size=10, weight="bold"), corner_radius=6)
-                lbl_tag.pack(side="left", padx=(0, 5))
+        self.configure(border_width=border_width, border_color=border_color)
+
+        self.lbl_titulo.configure(text=anuncio.titulo)
+
+        for i, lbl_tag in enumerate(self.lbl_tags):
+            if i >= len(anuncio.tags):
+                lbl_tag.pack_forget()
+                continue
+            tag = anuncio.tags[i]
+            cor_tag = "#3B8ED0"
+            if "ALERTA" in tag: cor_tag = "#D03B3B"
+            elif "Abaixo" in tag or "Baixa" in tag: cor_tag = "#2CC985"
+            elif "Acima" in tag or "Alta" in tag: cor_tag = "#E5A000"
+            lbl_tag.configure(text=f" {tag} ", fg_color=cor_tag)
+            lbl_tag.pack(side="left", padx=(0, 5))
 
         km_txt = f"{anuncio.km} km"
         if anuncio.km_anual > 0: km_txt += f" (~{anuncio.km_anual}/ano)"
-            
-        detalhes = f"{anuncio.ano} • {km_txt} • {anuncio.cambio}"
-        lbl_detalhes = ctk.CTkLabel(self, text=detalhes, font=ctk.CTkFont(size=12), text_color=("gray40", "gray70"), anchor="w")
-        lbl_detalhes.grid(row=2, column=0, padx=10, pady=(5, 5), sticky="ew")
-
+        self.lbl_detalhes.configure(text=f"{anuncio.ano} • {km_txt} • {anuncio.cambio}")
         local = f"📍 {anuncio.cidade}-{anuncio.estado}"
-        lbl_local = ctk.CTkLabel(self, text=local, font=ctk.CTkFont(size=11), text_color=("gray50", "gray60"), anchor="w")
-        lbl_local.grid(row=3, column=0, padx=10, pady=(0, 10), sticky="ew")
-        
-        preco_fmt = f"R$ {anuncio.preco:,.0f}".replace(",", ".")
-        lbl_preco = ctk.CTkLabel(self, text=preco_fmt, font=ctk.CTkFont(size=16, weight="bold"), text_color="#00AA66")
-        lbl_preco.grid(row=0, column=1, rowspan=4, padx=15, pady=10)
-        
-        btn_link = ctk.CTkButton(self, text="Ver Oferta ↗", width=100, height=25, 
-                                 fg_color="transparent", border_width=1, border_color=("gray60", "gray50"),
-                                 text_color=("gray10", "gray90"), hover_color=("gray80", "gray40"),
-                                 command=lambda: webbrowser.open(anuncio.link))
-        btn_link.grid(row=4, column=0, columnspan=2, padx=10, pady=(0, 10), sticky="e")
+        if anuncio.duplicados:
+            local += f"  •  🔁 mais {anuncio.duplicados} anúncio{'s' if anuncio.duplicados > 1 else ''} deste carro"
+        self.lbl_local.configure(text=local)
+        self.lbl_preco.configure(text=f"R$ {anuncio.preco:,.0f}".replace(",", "."))
+
+class ListaVirtual(ctk.CTkFrame):
+    """Lista rolável que só materializa cards para as linhas visíveis e os recicla ao rolar.
+
+    Todas as linhas têm a mesma altura, então a posição de cada uma é ``indice * ALTURA_CARD``
+    e o custo de desenhar independe de quantos anúncios existem.
+    """
+    def __init__(self, master, label_text: str = ""):
+        super().__init__(master)
+        self.itens = []
+        self.cards = []
+        self.janelas = []
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+
+        self.lbl_titulo = ctk.CTkLabel(self, text=label_text, font=ctk.CTkFont(weight="bold"))
+        self.lbl_titulo.grid(row=0, column=0, columnspan=2, pady=(5, 0))
+
+        self.canvas = ctk.CTkCanvas(self, highlightthickness=0, bg=self._apply_appearance_mode(self.cget("fg_color")))
+        self.canvas.grid(row=1, column=0, sticky="nsew", padx=(5, 0), pady=5)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.canvas.yview)
+        self.scrollbar.grid(row=1, column=1, sticky="ns", pady=5)
+        self.canvas.configure(yscrollcommand=self._ao_rolar)
+
+        self.canvas.bind("<Configure>", lambda e: self._redesenhar())
+        self.canvas.bind("<Enter>", lambda e: self._ligar_roda(True))
+        self.canvas.bind("<Leave>", lambda e: self._ligar_roda(False))
+
+    def _set_appearance_mode(self, mode_string):
+        super()._set_appearance_mode(mode_string)
+        if hasattr(self, "canvas"):
+            self.canvas.configure(bg=self._apply_appearance_mode(self.cget("fg_color")))
+
+    def _ligar_roda(self, ligar: bool):
+        eventos = ("<MouseWheel>", "<Button-4>", "<Button-5>")
+        for ev in eventos:
+            if ligar: self.canvas.bind_all(ev, self._roda)
+            else: self.canvas.unbind_all(ev)
+
+    def _roda(self, event):
+        if getattr(event, "num", None) == 4: passos = -1
+        elif getattr(event, "num", None) == 5: passos = 1
+        else: passos = -1 if event.delta > 0 else 1
+        self.canvas.yview_scroll(passos, "units")
+
+    def _ao_rolar(self, inicio, fim):
+        self.scrollbar.set(inicio, fim)
+        self._redesenhar()
+
+    def adicionar(self, anuncios):
+        self.itens.extend(anuncios)
+        self.itens.sort(key=ordem_score)
+        self.canvas.configure(scrollregion=(0, 0, 0, len(self.itens) * ALTURA_CARD),
+                              yscrollincrement=ALTURA_CARD // 3)
+        for card in self.cards:
+            card.anuncio = None
+        self._redesenhar()
+
+    def atualizar(self, anuncio):
+        """Redesenha o card que mostra ``anuncio`` (se estiver visível) depois de uma mudança nele."""
+        for card in self.cards:
+            if card.anuncio is anuncio:
+                card.anuncio = None
+                card.mostrar(anuncio)
+
+    def limpar(self):
+        self.itens = []
+        self.canvas.configure(scrollregion=(0, 0, 0, 0))
+        self.canvas.yview_moveto(0)
+        self._redesenhar()
+
+    def _redesenhar(self):
+        largura = max(self.canvas.winfo_width(), 1)
+        altura = max(self.canvas.winfo_height(), 1)
+        necessarios = altura // ALTURA_CARD + 2
+
+        while len(self.cards) < necessarios:
+            card = CardAnuncio(self.canvas)
+            self.cards.append(card)
+            self.janelas.append(self.canvas.create_window(0, 0, window=card, anchor="nw"))
+            # Entrar num card conta como "Leave" do canvas; religa a roda do mouse
+            card.bind("<Enter>", lambda e: self._ligar_roda(True), add="+")
+
+        primeiro = int(self.canvas.canvasy(0)) // ALTURA_CARD
+        for k, (card, janela) in enumerate(zip(self.cards, self.janelas)):
+            indice = primeiro + k
+            if indice >= len(self.itens) or k >= necessarios:
+                self.canvas.itemconfigure(janela, state="hidden")
+                continue
+            self.canvas.coords(janela, 5, indice * ALTURA_CARD + 5)
+            self.canvas.itemconfigure(janela, state="normal", width=largura - 15, height=ALTURA_CARD - 10)
+            card.mostrar(self.itens[indice])
 
 class PyMotorsApp(ctk.CTk):
     """Aplicação Principal do PyMotors."""
@@ -90,8 +219,19 @@ class PyMotorsApp(ctk.CTk):
         self.grid_columnconfigure(1, weight=1)
         self.grid_rowconfigure(0, weight=1)
 
+        # Threads de trabalho nunca tocam nos widgets: mandam mensagens por esta fila,
+        # que o loop principal drena via after()
+        self.fila_ui = queue.Queue()
+        self.pendentes = []
+        # Anúncios já recebidos pela UI, por id: as contagens de duplicados chegam depois pela fila
+        self.exibidos = {}
+
         self._setup_sidebar()
         self._setup_main_area()
+        self.after(50, self._drenar_fila)
+        if PREAQUECER:
+            # Depois da primeira pintura, para não disputar o GIL com a abertura da janela
+            self.after(300, lambda: self.after_idle(preaquecer, MODULOS_BUSCA))
 
     def _setup_sidebar(self):
         self.sidebar = ctk.CTkFrame(self, width=220, corner_radius=0)
@@ -116,7 +256,8 @@ class PyMotorsApp(ctk.CTk):
                                             font=ctk.CTkFont(size=11), text_color="gray60", wraplength=180)
         self.lbl_fipe_status.grid(row=3, column=0, padx=20, pady=0)
 
-        self.switch_excel = ctk.CTkSwitch(self.sidebar, text="Salvar Excel", onvalue=True, offvalue=False)
+        self.switch_excel = ctk.CTkSwitch(self.sidebar, text="Salvar Excel", onvalue=True, offvalue=False,
+                                          command=self._ao_alternar_excel)
         self.switch_excel.grid(row=5, column=0, padx=20, pady=10, sticky="s")
 
         self.opt_tema = ctk.CTkOptionMenu(self.sidebar, values=["Light", "Dark", "System"], command=ctk.set_appearance_mode)
@@ -184,9 +325,12 @@ class PyMotorsApp(ctk.CTk):
         self.lbl_status = ctk.CTkLabel(self.main_area, text="Preencha o Ano Inicial para ver a FIPE.", text_color="gray")
         self.lbl_status.grid(row=2, column=0, sticky="w", pady=(0, 5))
 
-        self.scroll_resultados = ctk.CTkScrollableFrame(self.main_area, label_text="Oportunidades Encontradas")
-        self.scroll_resultados.grid(row=3, column=0, sticky="nsew")
-        self.scroll_resultados.grid_columnconfigure(0, weight=1)
+        self.lista_resultados = ListaVirtual(self.main_area, label_text="Oportunidades Encontradas")
+        self.lista_resultados.grid(row=3, column=0, sticky="nsew")
+
+    def _ao_alternar_excel(self):
+        if PREAQUECER and self.switch_excel.get():
+            preaquecer(("pandas", "xlsxwriter"))
 
     def update_slider(self, valor):
         self.lbl_paginas.configure(text=f"📄 Páginas: {int(valor)}")
@@ -205,10 +349,18 @@ class PyMotorsApp(ctk.CTk):
         try:
             val_min = self.entry_min_a.get()
             a_min = int(val_min) if val_min else None
+            a_max = int(self.entry_max_a.get()) if self.entry_max_a.get() else None
         except ValueError:
             messagebox.showerror("Erro", "Ano deve ser numérico (Ex: 2020)")
             return
 
+        try:
+            p_min = int(self.entry_min_p.get()) if self.entry_min_p.get() else None
+            p_max = int(self.entry_max_p.get()) if self.entry_max_p.get() else None
+        except ValueError:
+            messagebox.showerror("Erro", "Preço deve ser numérico (Ex: 50000)")
+            return
+
         termo_final = carro
         if motor != "Motor": termo_final += f" {motor}"
         if cidade: termo_final += f" {cidade}"
@@ -217,97 +369,144 @@ class PyMotorsApp(ctk.CTk):
         self.lbl_fipe_valor.configure(text="...")
         self.lbl_fipe_status.configure(text="Consultando...")
         
-        for widget in self.scroll_resultados.winfo_children():
-            widget.destroy()
+        self.pendentes = []
+        self.exibidos = {}
+        self.lista_resultados.limpar()
+
+        filtros = (p_min, p_max, a_min, a_max, int(self.slider.get()), bool(self.switch_excel.get()))
+        threading.Thread(target=self.rodar_scraper, args=(termo_final, carro, estado, filtros), daemon=True).start()
 
-        threading.Thread(target=self.rodar_scraper, args=(termo_final, carro, estado, a_min)).start()
+    def _na_ui(self, tipo, *dados):
+        self.fila_ui.put((tipo, dados))
 
-    def rodar_scraper(self, termo_completo, termo_fipe, estado, ano_min):
+    def _drenar_fila(self):
+        try:
+            while True:
+                tipo, dados = self.fila_ui.get_nowait()
+                if tipo == "status":
+                    self.lbl_status.configure(text=dados[0], text_color=dados[1])
+                elif tipo == "fipe":
+                    self.lbl_fipe_valor.configure(text=dados[0])
+                    self.lbl_fipe_status.configure(text=dados[1], text_color=dados[2])
+                elif tipo == "lote":
+                    self.pendentes.extend(dados[0])
+                    self.exibidos.update((a.id, a) for a in dados[0])
+                elif tipo == "duplicados":
+                    anuncio = self.exibidos.get(dados[0])
+                    if anuncio is not None:
+                        anuncio.duplicados = dados[1]
+                        self.lista_resultados.atualizar(anuncio)
+                elif tipo == "fim":
+                    self.finalizar()
+        except queue.Empty:
+            pass
+
+        # Inserção em blocos: a UI continua respondendo mesmo com milhares de anúncios na fila
+        if self.pendentes:
+            bloco, self.pendentes = self.pendentes[:TAMANHO_BLOCO_UI], self.pendentes[TAMANHO_BLOCO_UI:]
+            self.lista_resultados.adicionar(bloco)
+
+        self.after(50, self._drenar_fila)
+
+    def rodar_scraper(self, termo_completo, termo_fipe, estado, filtros):
+        from src.analyser import AnalisadorVeiculo
+        from src.duplicados import IndiceDuplicados
+        from src.fipe import ConsultorFipe
+        from src.scraper import OLXScraper
+
+        p_min, p_max, ano_min, a_max, paginas, salvar = filtros
+        metricas.zerar()
+        scraper = None
         try:
+            consultor = ConsultorFipe()
+            # O plano resolve marca e versões uma vez, só quando há ano a precificar (o ano inicial ou o
+            # da primeira página com anos); cada página seguinte só precifica os anos ainda não vistos
+            plano = None
             fipe_valor = 0.0
             if ano_min:
-                self.lbl_status.configure(text=f"🔎 Consultando FIPE para {termo_fipe} ({ano_min})...", text_color="#006CE5")
-                consultor = ConsultorFipe()
+                self._na_ui("status", f"🔎 Consultando FIPE para {termo_fipe} ({ano_min})...", "#006CE5")
                 
-                fipe_valor, fipe_msg = consultor.obter_preco_medio(termo_fipe, ano_min)
+                plano = consultor.planejar(termo_fipe)
+                fipe_valor, fipe_msg = plano.precos([ano_min])[ano_min]
                 
-                if fipe_valor > 0:
-                    self.lbl_fipe_valor.configure(text=f"R$ {fipe_valor/1000:.1f}k")
-                    self.lbl_fipe_status.configure(text=fipe_msg, text_color="green")
+                aviso = plano.aviso()
+                if fipe_valor > 0 and aviso:
+                    # Valor de uma versão que pode não ser o carro buscado: mostra, mas em alerta
+                    self._na_ui("fipe", f"R$ {fipe_valor/1000:.1f}k", f"{fipe_msg}\n⚠️ {aviso}", "#E5A000")
+                elif fipe_valor > 0:
+                    self._na_ui("fipe", f"R$ {fipe_valor/1000:.1f}k", fipe_msg, "green")
                 else:
-                    self.lbl_fipe_valor.configure(text="Não achei")
-                    self.lbl_fipe_status.configure(text=fipe_msg, text_color="#D03B3B")
+                    self._na_ui("fipe", "Não achei", fipe_msg, "#D03B3B")
             else:
-                self.lbl_fipe_valor.configure(text="--")
-                self.lbl_fipe_status.configure(text="Ano não informado.")
+                self._na_ui("fipe", "--", "Ano não informado.", "gray60")
 
-            self.lbl_status.configure(text=f"🔎 Buscando na OLX...", text_color="#006CE5")
-            
-            p_min = int(self.entry_min_p.get()) if self.entry_min_p.get() else None
-            p_max = int(self.entry_max_p.get()) if self.entry_max_p.get() else None
-            a_max = int(self.entry_max_a.get()) if self.entry_max_a.get() else None
-            paginas = int(self.slider.get())
-
-            scraper = OLXScraper()
-            anuncios_brutos = scraper.buscar(termo_completo, paginas, p_min, p_max, ano_min, a_max, estado)
-
-            if not anuncios_brutos:
-                self.lbl_status.configure(text="❌ Nenhum veículo encontrado.", text_color="red")
-                self.finalizar()
-                return
+            self._na_ui("status", f"🔎 Buscando na OLX...", "#006CE5")
 
+            scraper = OLXScraper(max_paralelo=4)
             analisador = AnalisadorVeiculo(fipe_referencia=fipe_valor)
+            duplicados = IndiceDuplicados()
             anuncios_processados = []
-            for a in anuncios_brutos:
-                anuncios_processados.append(analisador.analisar(a))
+            enviados = set()
+            total = 0
 
-            anuncios_processados.sort(key=lambda x: (x.score_preco != "Excelente", x.score_preco != "Bom"))
+            def contar_copias(anuncio, n):
+                # Anúncio já enviado pertence à thread da UI: a contagem nova vai pela fila
+                if anuncio.id in enviados:
+                    self._na_ui("duplicados", anuncio.id, n)
+                else:
+                    anuncio.duplicados = n
+
+            paginas_stream = scraper.iterar_paginas(termo_completo, paginas, p_min, p_max, ano_min, a_max, estado)
+            for pagina in paginas_stream:
+                # Republicações do mesmo carro aparecem uma vez só, com a contagem no anúncio já mostrado
+                pagina = list(duplicados.filtrar(pagina, ao_duplicar=contar_copias))
+                if not pagina:
+                    continue
+                anos = {a.ano for a in pagina if a.ano} - set(analisador.fipe_por_ano)
+                if anos:
+                    if plano is None:
+                        plano = consultor.planejar(termo_fipe)
+                        if plano.erro:
+                            self._na_ui("fipe", "Não achei", plano.erro, "#D03B3B")
+                        elif plano.aviso():
+                            self._na_ui("fipe", "--", f"Ano não informado.\n⚠️ {plano.aviso()}", "#E5A000")
+                    for ano, (valor, _) in plano.precos(anos).items():
+                        if valor > 0: analisador.fipe_por_ano[ano] = valor
+                lote = analisador.analisar_lote(pagina)
+                total += len(lote)
+
+                if salvar:
+                    anuncios_processados.extend(lote)
+                else:
+                    # Cada página aparece assim que chega, sem esperar as demais
+                    self._na_ui("lote", lote)
+                    enviados.update(a.id for a in lote)
+                self._na_ui("status", f"🔎 {total} veículos analisados...", "#006CE5")
+
+            if not total:
+                self._na_ui("status", "❌ Nenhum veículo encontrado.", "red")
+                return
 
-            if self.switch_excel.get():
+            if salvar:
+                anuncios_processados.sort(key=ordem_score)
                 self.salvar_excel(anuncios_processados, termo_fipe, estado)
-                self.lbl_status.configure(text=f"✅ Análise salva no Excel!", text_color="green")
+                self._na_ui("status", f"✅ Análise salva no Excel!", "green")
             else:
-                self.mostrar_na_tela(anuncios_processados)
-                self.lbl_status.configure(text=f"✅ {len(anuncios_processados)} veículos analisados.", text_color="green")
+                self._na_ui("status", f"✅ {total} veículos analisados.", "green")
 
         except Exception as e:
-            self.lbl_status.configure(text=f"Erro: {str(e)}", text_color="red")
+            self._na_ui("status", f"Erro: {str(e)}", "red")
         
         finally:
-            self.finalizar()
-
-    def mostrar_na_tela(self, anuncios):
-        for anuncio in anuncios:
-            card = CardAnuncio(self.scroll_resultados, anuncio)
-            card.pack(fill="x", pady=5, padx=5)
+            if scraper is not None:
+                print(f"🌐 OLX: {scraper.resumo_requisicoes()}")
+            metricas.imprimir()
+            self._na_ui("fim")
 
     def salvar_excel(self, anuncios, termo, uf):
-        dados = []
-        for a in anuncios:
-            d = a.model_dump()
-            d["tags"] = ", ".join(a.tags)
-            dados.append(d)
-
-        df = pd.DataFrame(dados)
-        colunas = ["titulo", "preco", "score_preco", "tags", "ano", "km", "km_anual", "cidade", "estado", "link"]
-        cols_finais = [c for c in colunas if c in df.columns]
-        df = df[cols_finais]
-
-        if not os.path.exists("data"): os.makedirs("data")
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M")
-        nome = f"data/analise_{uf}_{termo.replace(' ', '_')}_{timestamp}.xlsx"
-
-        with pd.ExcelWriter(nome, engine='xlsxwriter') as writer:
-            df.to_excel(writer, index=False, sheet_name='Analise')
-            workbook = writer.book
-            worksheet = writer.sheets['Analise']
-            fmt_moeda = workbook.add_format({'num_format': 'R$ #,##0'})
-            fmt_centro = workbook.add_format({'align': 'center'})
-            worksheet.set_column('A:A', 40)
-            worksheet.set_column('B:B', 15, fmt_moeda)
-            worksheet.set_column('J:J', 60)
-        
-        os.startfile(os.path.abspath("data"))
+        from src.exportador import ExportadorExcel, abrir_pasta
+        ExportadorExcel(pasta="data").exportar(anuncios, termo, uf)
+        abrir_pasta("data")
 
     def finalizar(self):
         self.btn_buscar.configure(state="normal", text="ANALISAR")
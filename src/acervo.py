@@ -0,0 +1,177 @@
+"""Acervo das páginas brutas da OLX: arquivo comprimido só de acréscimo, gravado durante as buscas,
+e reprocessamento offline (``extrair_anuncios`` + analisador) sem nenhuma chamada de rede."""
+import bisect
+import glob
+import gzip
+import io
+import json
+import os
+import threading
+import time
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.metricas import metricas
+
+EXTENSOES = {"zstd": "zst", "gzip": "gz"}
+
+def _zstandard():
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        return None
+
+def _dia(caminho: str) -> str:
+    return os.path.basename(caminho).split("-", 1)[1].split(".", 1)[0]
+
+class AcervoPaginas:
+    """Páginas de busca em ``pasta/paginas-AAAAMMDD.<zst|gz>``, um segmento por dia.
+
+    Cada registro é uma linha JSON de metadados (termo, url, params, pagina, coletado_em, tamanho)
+    seguida de ``tamanho`` bytes da página, comprimido como um quadro zstd (ou membro gzip) próprio:
+    acrescentar nunca reescreve o que já está no disco e um registro cortado por uma queda no meio
+    da escrita só perde ele mesmo. zstd é usado quando o pacote ``zstandard`` está instalado.
+
+    As referências FIPE de cada consulta ficam ao lado, em ``fipe.jsonl`` (``anotar_fipe``), para que
+    o reprocessamento reanalise com os mesmos valores da época.
+    """
+    def __init__(self, pasta: str = "data/acervo", compressao: Optional[str] = None, nivel: Optional[int] = None):
+        if compressao is None:
+            compressao = "zstd" if _zstandard() else "gzip"
+        if compressao not in EXTENSOES:
+            raise ValueError(f"Compressão desconhecida: {compressao} (use {', '.join(EXTENSOES)})")
+        if compressao == "zstd" and _zstandard() is None:
+            raise ValueError("Compressão zstd requer o pacote zstandard (pip install zstandard)")
+        self.pasta = pasta
+        self.compressao = compressao
+        self.nivel = nivel if nivel is not None else (6 if compressao == "gzip" else 9)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._arquivo = None
+        self._dia_aberto = None
+
+        if not os.path.exists(pasta): os.makedirs(pasta)
+
+    def _comprimir(self, dados: bytes) -> bytes:
+        if self.compressao == "gzip":
+            return gzip.compress(dados, compresslevel=self.nivel, mtime=0)
+        # ZstdCompressor não é thread-safe: um por thread
+        compressor = getattr(self._local, "compressor", None)
+        if compressor is None:
+            compressor = self._local.compressor = _zstandard().ZstdCompressor(level=self.nivel)
+        return compressor.compress(dados)
+
+    def gravar(self, conteudo: bytes, **meta):
+        """Acrescenta uma página; ``meta`` (termo, url, params, pagina...) vai junto no registro."""
+        with metricas.etapa("acervo.gravar"):
+            meta = {"coletado_em": time.time(), **meta, "tamanho": len(conteudo)}
+            # Compressão fora do lock: páginas de threads diferentes comprimem em paralelo
+            registro = self._comprimir(json.dumps(meta, ensure_ascii=False).encode() + b"\n" + conteudo)
+            dia = date.fromtimestamp(meta["coletado_em"]).strftime("%Y%m%d")
+            with self._lock:
+                if dia != self._dia_aberto:
+                    if self._arquivo: self._arquivo.close()
+                    self._arquivo = open(os.path.join(self.pasta, f"paginas-{dia}.{EXTENSOES[self.compressao]}"), "ab")
+                    self._dia_aberto = dia
+                self._arquivo.write(registro)
+                self._arquivo.flush()
+        metricas.contar("acervo.bytes", len(registro))
+
+    def anotar_fipe(self, termo: str, fipe_referencia: float, fipe_por_ano: Dict[int, float]):
+        linha = {"coletado_em": time.time(), "termo": termo, "fipe_referencia": fipe_referencia,
+                 "fipe_por_ano": {str(a): v for a, v in fipe_por_ano.items()}}
+        with self._lock:
+            with open(os.path.join(self.pasta, "fipe.jsonl"), "a", encoding="utf-8") as f:
+                f.write(json.dumps(linha, ensure_ascii=False) + "\n")
+
+    def segmentos(self, desde: Optional[date] = None, ate: Optional[date] = None) -> List[str]:
+        caminhos = glob.glob(os.path.join(self.pasta, "paginas-*.zst")) + glob.glob(os.path.join(self.pasta, "paginas-*.gz"))
+        return sorted(c for c in caminhos
+                      if (desde is None or _dia(c) >= desde.strftime("%Y%m%d"))
+                      and (ate is None or _dia(c) <= ate.strftime("%Y%m%d")))
+
+    def _abrir(self, bruto):
+        if bruto.name.endswith(".gz"):
+            return gzip.GzipFile(fileobj=bruto)
+        zstandard = _zstandard()
+        if zstandard is None:
+            raise ValueError(f"{bruto.name}: leitura de zstd requer o pacote zstandard")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(bruto, read_across_frames=True),
+                                 buffer_size=1 << 20)
+
+    def ler(self, desde: Optional[date] = None, ate: Optional[date] = None) -> Iterator[Tuple[dict, bytes]]:
+        """(metadados, página) de cada registro, em ordem de gravação, lendo em blocos (sem carregar o segmento)."""
+        for caminho in self.segmentos(desde, ate):
+            with open(caminho, "rb", buffering=1 << 20) as bruto:
+                leitor = self._abrir(bruto)
+                try:
+                    while True:
+                        linha = leitor.readline()
+                        if not linha:
+                            break
+                        meta = json.loads(linha)
+                        conteudo = leitor.read(meta["tamanho"])
+                        if len(conteudo) < meta["tamanho"]:
+                            raise EOFError("registro incompleto")
+                        yield meta, conteudo
+                except (EOFError, ValueError, OSError):
+                    # Só o fim do segmento pode estar cortado (queda durante uma gravação)
+                    metricas.erro("acervo.registro_cortado")
+
+    def referencias_fipe(self) -> Dict[str, list]:
+        """termo -> [(coletado_em, fipe_referencia, fipe_por_ano)] em ordem de tempo."""
+        referencias = {}
+        caminho = os.path.join(self.pasta, "fipe.jsonl")
+        if not os.path.exists(caminho):
+            return referencias
+        with open(caminho, encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    r = json.loads(linha)
+                except ValueError:
+                    continue
+                por_ano = {int(a): v for a, v in r["fipe_por_ano"].items()}
+                referencias.setdefault(r["termo"], []).append((r["coletado_em"], r["fipe_referencia"], por_ano))
+        for lista in referencias.values():
+            lista.sort(key=lambda r: r[0])
+        return referencias
+
+    def fechar(self):
+        with self._lock:
+            if self._arquivo:
+                self._arquivo.close()
+                self._arquivo = None
+                self._dia_aberto = None
+
+def reprocessar(acervo: AcervoPaginas, desde: Optional[date] = None, ate: Optional[date] = None,
+                termo: Optional[str] = None) -> Iterator[Tuple[dict, list]]:
+    """Passa as páginas arquivadas por ``extrair_anuncios`` (AnuncioLeve, sem validação) e pelo analisador
+    atual; entrega (metadados, anúncios analisados) por página.
+
+    A FIPE de cada página é a primeira anotação do mesmo termo feita a partir da coleta (a consulta
+    precifica logo depois de buscar) ou, sem ela, a última anterior; sem nenhuma, a análise roda sem FIPE.
+    """
+    from src.analyser import AnalisadorVeiculo
+    from src.scraper import extrair_anuncios
+
+    referencias = acervo.referencias_fipe()
+    analisadores = {}
+
+    for meta, conteudo in acervo.ler(desde, ate):
+        if termo and meta.get("termo") != termo:
+            continue
+        with metricas.etapa("acervo.parse"):
+            anuncios, _ = extrair_anuncios(conteudo, validar=False)
+        if not anuncios:
+            continue
+
+        lista = referencias.get(meta.get("termo"), [])
+        i = bisect.bisect_left(lista, meta["coletado_em"], key=lambda r: r[0])
+        escolhida = i if i < len(lista) else len(lista) - 1
+        chave = (meta.get("termo"), escolhida)
+        if chave not in analisadores:
+            _, fipe_referencia, por_ano = lista[escolhida] if lista else (0, 0.0, {})
+            analisadores[chave] = AnalisadorVeiculo(fipe_referencia=fipe_referencia, fipe_por_ano=por_ano)
+        yield meta, analisadores[chave].analisar_lote(anuncios)
+        metricas.contar("acervo.paginas_reprocessadas")
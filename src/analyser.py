@@ -1,24 +1,39 @@
 from datetime import datetime
-from src.models import Anuncio
+from typing import Dict, List, Optional, Union
+from src.metricas import metricas
+from src.models import Anuncio, AnuncioLeve
 
 class AnalisadorVeiculo:
-    def __init__(self, fipe_referencia: float = 0):
+    def __init__(self, fipe_referencia: float = 0, fipe_por_ano: Optional[Dict[int, float]] = None):
         self.fipe = fipe_referencia
+        # Referência por ano-modelo; anos sem valor (ou fora do dicionário) caem na referência única
+        self.fipe_por_ano = dict(fipe_por_ano or {})
         self.ano_atual = datetime.now().year
         self.red_flags = ["leilao", "leilão", "sinistro", "batido", "consta", "recuperado", "csv", "remarcado", "chassi"]
 
+    @staticmethod
+    def texto(anuncio) -> str:
+        """Título e, se o anúncio foi enriquecido, a descrição completa (onde o vendedor conta o histórico)."""
+        descricao = anuncio.descricao
+        return f"{anuncio.titulo}\n{descricao}".lower() if descricao else f"{anuncio.titulo}".lower()
+
+    def referencia(self, anuncio) -> float:
+        fipe = self.fipe_por_ano.get(anuncio.ano, 0.0) if anuncio.ano else 0.0
+        return fipe if fipe > 0 else self.fipe
+
     def analisar(self, anuncio: Anuncio) -> Anuncio:
         tags = []
-        texto_completo = f"{anuncio.titulo}".lower()
+        texto_completo = self.texto(anuncio)
 
         for flag in self.red_flags:
             if flag in texto_completo:
                 tags.append(f"⚠️ ALERTA: {flag.upper()}")
                 anuncio.score_preco = "Cuidado"
 
-        if self.fipe > 0 and anuncio.preco > 0:
-            diferenca = anuncio.preco - self.fipe
-            porcentagem = (diferenca / self.fipe) * 100
+        fipe = self.referencia(anuncio)
+        if fipe > 0 and anuncio.preco > 0:
+            diferenca = anuncio.preco - fipe
+            porcentagem = (diferenca / fipe) * 100
             
             if porcentagem < -15:
                 tags.append(f"💰 {abs(int(porcentagem))}% Abaixo da Fipe")
@@ -46,4 +61,9 @@ class AnalisadorVeiculo:
                 tags.append("💎 Baixa Rodagem")
 
         anuncio.tags = tags
-        return anuncio
\ No newline at end of file
+        return anuncio
+
+    @metricas.cronometrado("analise.lote")
+    def analisar_lote(self, anuncios: List[Union[Anuncio, AnuncioLeve]]) -> List[Union[Anuncio, AnuncioLeve]]:
+        """``analisar`` em cada anúncio de uma página, cronometrado como uma etapa só."""
+        return [self.analisar(a) for a in anuncios]
@@ -0,0 +1,128 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from src.models import Anuncio, AnuncioLeve
+
+_COLUNAS = ["id", "titulo", "preco", "ano", "km", "cambio", "combustivel", "cidade", "estado",
+            "link", "imagem", "data_publicacao", "tags", "score_preco", "km_anual",
+            "descricao", "propriedades", "duplicados"]
+# Guardadas como texto JSON
+_COLUNAS_JSON = {"tags": "[]", "propriedades": "{}"}
+# Colunas criadas depois da primeira versão do armazém: acrescentadas em bancos antigos ao abrir
+_MIGRACOES = {"descricao": "TEXT", "propriedades": "TEXT", "duplicados": "INTEGER NOT NULL DEFAULT 0"}
+
+class ArmazemAnuncios:
+    """Armazém local (SQLite) dos anúncios já vistos, com primeira/última aparição por listId."""
+    def __init__(self, caminho: str = "data/anuncios.sqlite"):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+
+        pasta = os.path.dirname(caminho)
+        if pasta and not os.path.exists(pasta): os.makedirs(pasta)
+
+        self._conn = sqlite3.connect(caminho, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS anuncios ("
+            " id TEXT PRIMARY KEY, titulo TEXT, preco REAL, ano INTEGER, km INTEGER,"
+            " cambio TEXT, combustivel TEXT, cidade TEXT, estado TEXT, link TEXT, imagem TEXT,"
+            " data_publicacao TEXT, tags TEXT, score_preco TEXT, km_anual INTEGER,"
+            " descricao TEXT, propriedades TEXT, duplicados INTEGER NOT NULL DEFAULT 0,"
+            " preco_anterior REAL, primeiro_visto REAL NOT NULL, ultimo_visto REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_anuncios_estado ON anuncios (estado);"
+            "CREATE INDEX IF NOT EXISTS idx_anuncios_ano ON anuncios (ano);"
+            "CREATE INDEX IF NOT EXISTS idx_anuncios_preco ON anuncios (preco);"
+        )
+        existentes = {row[1] for row in self._conn.execute("PRAGMA table_info(anuncios)")}
+        for coluna, tipo in _MIGRACOES.items():
+            if coluna not in existentes:
+                self._conn.execute(f"ALTER TABLE anuncios ADD COLUMN {coluna} {tipo}")
+        self._conn.commit()
+
+    def _precos(self, ids: Sequence[str]) -> Dict[str, float]:
+        precos = {}
+        # Lotes de 500 para ficar abaixo do limite de parâmetros do SQLite
+        for i in range(0, len(ids), 500):
+            lote = ids[i:i + 500]
+            marcadores = ",".join("?" * len(lote))
+            with self._lock:
+                rows = self._conn.execute(f"SELECT id, preco FROM anuncios WHERE id IN ({marcadores})", lote).fetchall()
+            precos.update(rows)
+        return precos
+
+    def classificar(self, anuncios: Sequence[Union[Anuncio, AnuncioLeve]],
+                    conhecidos: Optional[set] = None) -> Tuple[list, list]:
+        """Separa (novos ou com preço alterado, inalterados); ``conhecidos``, se dado, recebe os
+        listIds que já estavam no armazém (inclusive os de preço alterado)."""
+        precos = self._precos([a.id for a in anuncios])
+        if conhecidos is not None:
+            conhecidos.update(precos)
+        novos, inalterados = [], []
+        for a in anuncios:
+            if a.id in precos and precos[a.id] == a.preco:
+                inalterados.append(a)
+            else:
+                novos.append(a)
+        return novos, inalterados
+
+    def todos_conhecidos(self, anuncios: Sequence[Union[Anuncio, AnuncioLeve]]) -> bool:
+        if not anuncios:
+            return False
+        return len(self._precos([a.id for a in anuncios])) == len({a.id for a in anuncios})
+
+    def registrar(self, anuncios: Iterable[Union[Anuncio, AnuncioLeve]]):
+        agora = time.time()
+        linhas = []
+        for a in anuncios:
+            valores = [json.dumps(getattr(a, c), ensure_ascii=False) if c in _COLUNAS_JSON else getattr(a, c)
+                       for c in _COLUNAS]
+            linhas.append(valores + [agora, agora])
+
+        colunas = ", ".join(_COLUNAS)
+        atualizacao = ", ".join(f"{c} = excluded.{c}" for c in _COLUNAS if c != "id")
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT INTO anuncios ({colunas}, primeiro_visto, ultimo_visto)"
+                f" VALUES ({', '.join('?' * (len(_COLUNAS) + 2))})"
+                f" ON CONFLICT(id) DO UPDATE SET {atualizacao},"
+                f" preco_anterior = CASE WHEN anuncios.preco != excluded.preco THEN anuncios.preco"
+                f"                       ELSE anuncios.preco_anterior END,"
+                f" ultimo_visto = excluded.ultimo_visto",
+                linhas
+            )
+            self._conn.commit()
+
+    def tocar(self, ids: Sequence[str]):
+        """Atualiza só o ``ultimo_visto`` de anúncios que reapareceram sem mudança."""
+        agora = time.time()
+        with self._lock:
+            self._conn.executemany("UPDATE anuncios SET ultimo_visto = ? WHERE id = ?", [(agora, i) for i in ids])
+            self._conn.commit()
+
+    def carregar(self, ids: Sequence[str], leve: bool = False) -> List[Union[Anuncio, AnuncioLeve]]:
+        """Devolve os anúncios guardados (com a análise já feita), na ordem de ``ids``."""
+        por_id = {}
+        for i in range(0, len(ids), 500):
+            lote = ids[i:i + 500]
+            marcadores = ",".join("?" * len(lote))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT {', '.join(_COLUNAS)} FROM anuncios WHERE id IN ({marcadores})", lote
+                ).fetchall()
+            for row in rows:
+                campos = dict(zip(_COLUNAS, row))
+                for coluna, vazio in _COLUNAS_JSON.items():
+                    campos[coluna] = json.loads(campos[coluna] or vazio)
+                por_id[campos["id"]] = AnuncioLeve(**campos) if leve else Anuncio(**campos)
+        return [por_id[i] for i in ids if i in por_id]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM anuncios").fetchone()[0]
+
+    def fechar(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,91 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Optional
+
+class CacheFipe:
+    """Cache persistente (SQLite) das respostas da API FIPE, chaveado por endpoint."""
+    def __init__(self, caminho: str = "data/cache_fipe.sqlite",
+                 ttl_catalogo: float = 30 * 24 * 3600, ttl_precos: float = 30 * 24 * 3600,
+                 alinhar_mes: bool = True):
+        self.caminho = caminho
+        self.ttl_catalogo = ttl_catalogo
+        self.ttl_precos = ttl_precos
+        self.alinhar_mes = alinhar_mes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        pasta = os.path.dirname(caminho)
+        if pasta and not os.path.exists(pasta): os.makedirs(pasta)
+
+        self._conn = sqlite3.connect(caminho, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS respostas ("
+            " chave TEXT PRIMARY KEY, valor TEXT NOT NULL,"
+            " criado_em REAL NOT NULL, referencia TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        # Linhas vencidas desde a última execução (TTL ou virada de mês) saem logo na abertura
+        self.limpar_expirados()
+
+    @staticmethod
+    def chave_preco(cod_modelo, cod_ano) -> str:
+        return f"preco/{cod_modelo}/{cod_ano}"
+
+    def _referencia_atual(self) -> str:
+        # A tabela FIPE é republicada todo mês; a referência marca o mês em que o dado foi baixado
+        return datetime.now().strftime("%Y-%m")
+
+    def _expirado(self, chave: str, criado_em: float, referencia: str) -> bool:
+        ttl = self.ttl_precos if chave.startswith("preco/") else self.ttl_catalogo
+        if time.time() - criado_em > ttl:
+            return True
+        return self.alinhar_mes and referencia != self._referencia_atual()
+
+    def obter(self, chave: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT valor, criado_em, referencia FROM respostas WHERE chave = ?", (chave,)
+            ).fetchone()
+
+            if row is None or self._expirado(chave, row[1], row[2]):
+                if row is not None:
+                    self._conn.execute("DELETE FROM respostas WHERE chave = ?", (chave,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return json.loads(row[0])
+
+    def salvar(self, chave: str, valor: Any):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO respostas (chave, valor, criado_em, referencia) VALUES (?, ?, ?, ?)",
+                (chave, json.dumps(valor), time.time(), self._referencia_atual())
+            )
+            self._conn.commit()
+
+    def limpar_expirados(self) -> int:
+        with self._lock:
+            rows = self._conn.execute("SELECT chave, criado_em, referencia FROM respostas").fetchall()
+            expirados = [(c,) for c, criado, ref in rows if self._expirado(c, criado, ref)]
+            self._conn.executemany("DELETE FROM respostas WHERE chave = ?", expirados)
+            self._conn.commit()
+            return len(expirados)
+
+    def estatisticas(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "taxa_acerto": self.hits / total if total else 0.0,
+        }
+
+    def fechar(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,225 @@
+"""Entrada de linha de comando (sem GUI).
+
+Exemplos:
+    python -m src.cli buscar "Honda Civic" --ano-min 2018 --estado SP --paginas 3
+    python -m src.cli lote consultas.jsonl --workers 8 --saida data/lote
+    python -m src.cli --formato parquet lote consultas.jsonl --saida data
+    python -m src.cli --metricas data/metricas.json --perfil data/buscar.prof buscar "Fiat Uno" --paginas 2
+    python -m src.cli --formato parquet varrer "Toyota Corolla" --ano-min 2015 --paginas 5 --workers 8
+    python -m src.cli --mercado --formato csv varrer "Honda Civic" --paginas 3
+    python -m src.cli --acervo buscar "Fiat Uno" --paginas 5
+    python -m src.cli --duplicados --formato csv varrer "Fiat Uno" --paginas 3
+    python -m src.cli --formato parquet reprocessar --desde 2026-01-01 --termo "Fiat Uno"
+    python -m src.cli vigiar buscas.jsonl --alerta stdout --alerta arquivo:data/alertas.jsonl
+"""
+import argparse
+import sys
+import time
+from datetime import date
+
+from src.acervo import AcervoPaginas, reprocessar
+from src.armazem import ArmazemAnuncios
+from src.detalhes import EnriquecedorAnuncios
+from src.duplicados import IndiceDuplicados
+from src.exportador import EXPORTADORES, criar_exportador
+from src.fipe import CONFIANCA_BAIXA, ConsultorFipe
+from src.mercado import EstatisticasMercado
+from src.metricas import metricas, perfil
+from src.models import BuscaVigiada, Consulta, ResultadoConsulta
+from src.pipeline import executar_consulta, executar_lote, executar_varredura, ler_consultas, salvar_resultado
+from src.scraper import OLXScraper
+from src.varredura import DIVISORES, UFS, Varredura
+from src.vigia import Vigia, criar_saida
+
+def _resumo(resultado) -> str:
+    c = resultado.consulta
+    if resultado.erro:
+        return f"❌ {c.nome}: {resultado.erro}"
+    excelentes = sum(1 for a in resultado.anuncios if a.score_preco == "Excelente")
+    resumo = (f"✅ {c.nome}: {len(resultado.anuncios)} anúncios ({resultado.novos} novos), "
+              f"{excelentes} excelentes, FIPE R$ {resultado.fipe_valor:,.0f}")
+    if resultado.fipe_confianca is not None:
+        resumo += f" (confiança {resultado.fipe_confianca:.2f}{' ⚠️ baixa' if resultado.fipe_confianca < CONFIANCA_BAIXA else ''})"
+    if resultado.fipe_aviso:
+        resumo += f"\n⚠️ FIPE: {resultado.fipe_aviso}"
+    return resumo
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="pymotors", description="PyMotors headless")
+    parser.add_argument("--paralelo-paginas", type=int, default=4, help="páginas OLX simultâneas por busca")
+    parser.add_argument("--formato", default="json", choices=["json", *EXPORTADORES],
+                        help="json guarda o resultado completo; os demais exportam só os anúncios")
+    parser.add_argument("--incremental", nargs="?", const="data/anuncios.sqlite", metavar="ARMAZEM",
+                        help="re-scan incremental usando o armazém local de anúncios (padrão: data/anuncios.sqlite)")
+    parser.add_argument("--detalhes", action="store_true",
+                        help="baixa a página de cada anúncio novo (descrição completa) antes da análise")
+    parser.add_argument("--mercado", nargs="?", const="data/mercado.sqlite", metavar="ARQUIVO",
+                        help="acumula as distribuições de preço por modelo/ano/UF e dá a cada anúncio "
+                             "percentil e z-score no seu grupo (padrão: data/mercado.sqlite)")
+    parser.add_argument("--acervo", nargs="?", const="data/acervo", metavar="PASTA",
+                        help="arquiva cada página de busca (comprimida) para reprocessar depois (padrão: data/acervo)")
+    parser.add_argument("--duplicados", action="store_true",
+                        help="junta cópias e republicações do mesmo carro num anúncio só (com a contagem)")
+    parser.add_argument("--metricas", nargs="?", const="data/metricas.json", metavar="ARQUIVO",
+                        help="salva o resumo de métricas em JSON (padrão: data/metricas.json)")
+    parser.add_argument("--perfil", metavar="ARQUIVO", help="roda sob cProfile e grava as estatísticas (.prof)")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_consulta = argparse.ArgumentParser(add_help=False)
+    p_consulta.add_argument("termo")
+    p_consulta.add_argument("--termo-fipe")
+    p_consulta.add_argument("--paginas", type=int, default=2)
+    p_consulta.add_argument("--preco-min", type=int)
+    p_consulta.add_argument("--preco-max", type=int)
+    p_consulta.add_argument("--ano-min", type=int)
+    p_consulta.add_argument("--ano-max", type=int)
+    p_consulta.add_argument("--saida", default="data")
+
+    p_buscar = sub.add_parser("buscar", parents=[p_consulta], help="executa uma única busca")
+    p_buscar.add_argument("--estado", default="BR")
+
+    p_varrer = sub.add_parser("varrer", parents=[p_consulta],
+                              help="busca em todas as UFs em paralelo e junta tudo por listId (--paginas vale por fatia)")
+    p_varrer.add_argument("--workers", type=int, default=6, help="fatias simultâneas")
+    p_varrer.add_argument("--ufs", nargs="+", default=list(UFS))
+    p_varrer.add_argument("--dividir", nargs="*", default=["ano", "preco"], choices=list(DIVISORES),
+                          help="faixas usadas quando uma fatia bate no limite de páginas (vazio: não divide)")
+    p_varrer.add_argument("--intervalo-minimo", type=float, default=0.5,
+                          help="segundos entre requisições à OLX, somando todas as fatias")
+
+    p_lote = sub.add_parser("lote", help="executa as consultas de um arquivo .jsonl ou .csv")
+    p_lote.add_argument("arquivo")
+    p_lote.add_argument("--workers", type=int, default=4)
+    p_lote.add_argument("--saida", default="data/lote")
+
+    p_reprocessar = sub.add_parser("reprocessar", help="reanalisa as páginas do acervo, sem rede")
+    p_reprocessar.add_argument("--desde", type=date.fromisoformat, metavar="AAAA-MM-DD")
+    p_reprocessar.add_argument("--ate", type=date.fromisoformat, metavar="AAAA-MM-DD")
+    p_reprocessar.add_argument("--termo", help="só as páginas deste termo de busca")
+    p_reprocessar.add_argument("--todas", action="store_true",
+                               help="mantém cada coleta do anúncio (padrão: só a mais recente por listId)")
+    p_reprocessar.add_argument("--saida", default="data")
+
+    p_vigiar = sub.add_parser("vigiar", help="reexecuta buscas salvas (.jsonl/.csv com intervalo/jitter) e alerta ofertas novas")
+    p_vigiar.add_argument("arquivo")
+    p_vigiar.add_argument("--workers", type=int, default=4)
+    p_vigiar.add_argument("--alerta", action="append", metavar="SAIDA",
+                          help="stdout, arquivo[:caminho] ou webhook:url (repetível; padrão: stdout)")
+    p_vigiar.add_argument("--intervalo-minimo", type=float, default=1.0,
+                          help="segundos entre requisições à OLX, somando todas as buscas")
+    p_vigiar.add_argument("--duracao", type=float, help="encerra após N segundos")
+    p_vigiar.add_argument("--alertar-primeira", action="store_true",
+                          help="alerta também na carga inicial de uma busca que o armazém ainda não conhece")
+
+    args = parser.parse_args(argv)
+    with perfil(args.perfil):
+        codigo = _executar(args)
+
+    metricas.imprimir()
+    if args.metricas:
+        print(f"📈 Métricas salvas em {metricas.salvar_json(args.metricas)}")
+    if args.perfil:
+        print(f"📈 Perfil salvo em {args.perfil} (python -m pstats {args.perfil})")
+    return codigo
+
+def _reprocessar(args) -> int:
+    acervo = AcervoPaginas(args.acervo or "data/acervo")
+    inicio = time.perf_counter()
+    paginas, anuncios, por_id = 0, [], {}
+    for _, analisados in reprocessar(acervo, args.desde, args.ate, args.termo):
+        paginas += 1
+        if args.todas:
+            anuncios.extend(analisados)
+        else:
+            por_id.update((a.id, a) for a in analisados)
+    anuncios = anuncios if args.todas else list(por_id.values())
+    duracao = time.perf_counter() - inicio
+
+    print(f"♻️ {paginas} páginas, {len(anuncios)} anúncios reanalisados em {duracao:.1f}s "
+          f"({paginas / duracao if duracao else 0:,.0f} páginas/s)")
+    contagem = {}
+    for a in anuncios:
+        contagem[a.score_preco] = contagem.get(a.score_preco, 0) + 1
+    print(f"📊 {contagem}")
+    if args.formato == "json":
+        resultado = ResultadoConsulta(consulta=Consulta(termo=args.termo or "acervo"), novos=len(anuncios),
+                                      anuncios=[a.para_anuncio() for a in anuncios])
+        print(f"💾 {salvar_resultado(resultado, args.saida)}")
+    elif anuncios:
+        caminho = criar_exportador(args.formato, pasta=args.saida).exportar(anuncios, args.termo or "acervo")
+        print(f"💾 {caminho}")
+    return 0
+
+def _executar(args) -> int:
+    if args.comando == "reprocessar":
+        return _reprocessar(args)
+
+    consultor = ConsultorFipe()
+    acervo = AcervoPaginas(args.acervo) if args.acervo else None
+
+    if args.comando == "vigiar":
+        scraper = OLXScraper(max_paralelo=args.paralelo_paginas, intervalo_minimo=args.intervalo_minimo, acervo=acervo)
+        enriquecedor = EnriquecedorAnuncios(scraper) if args.detalhes else None
+        vigia = Vigia(ler_consultas(args.arquivo, BuscaVigiada), [criar_saida(s) for s in args.alerta or ["stdout"]],
+                      scraper, consultor, ArmazemAnuncios(args.incremental or "data/anuncios.sqlite"), enriquecedor,
+                      workers=args.workers, alertar_na_primeira=args.alertar_primeira)
+        vigia.rodar(args.duracao)
+        if enriquecedor is not None:
+            enriquecedor.fechar()
+        print(f"👀 {vigia.execucoes} execuções, {vigia.alertas} alertas, {vigia.erros} erros")
+        print(f"🌐 OLX: {scraper.resumo_requisicoes()}")
+        return 0
+
+    scraper = OLXScraper(max_paralelo=args.paralelo_paginas,
+                         intervalo_minimo=args.intervalo_minimo if args.comando == "varrer" else 0.5, acervo=acervo)
+    armazem = ArmazemAnuncios(args.incremental) if args.incremental else None
+    enriquecedor = EnriquecedorAnuncios(scraper) if args.detalhes else None
+    mercado = EstatisticasMercado(args.mercado) if args.mercado else None
+    duplicados = IndiceDuplicados() if args.duplicados else None
+
+    if args.comando in ("buscar", "varrer"):
+        consulta = Consulta(termo=args.termo, termo_fipe=args.termo_fipe, paginas=args.paginas,
+                            min_price=args.preco_min, max_price=args.preco_max,
+                            min_year=args.ano_min, max_year=args.ano_max, estado=getattr(args, "estado", None))
+        if args.comando == "buscar":
+            resultados = [executar_consulta(consulta, scraper, consultor, armazem, enriquecedor, mercado=mercado,
+                                             duplicados=duplicados)]
+        else:
+            varredura = Varredura(scraper, args.workers, args.ufs, args.dividir)
+            resultados = [executar_varredura(consulta, scraper, consultor, armazem, enriquecedor, varredura,
+                                             mercado, duplicados)]
+        if args.formato == "json":
+            salvar_resultado(resultados[0], args.saida)
+    else:
+        pasta_json = args.saida if args.formato == "json" else None
+        resultados = executar_lote(ler_consultas(args.arquivo), args.workers, pasta_json, scraper, consultor,
+                                   armazem, enriquecedor, mercado, duplicados)
+
+    if args.formato != "json":
+        exportador = criar_exportador(args.formato, pasta=args.saida)
+        for resultado in resultados:
+            if resultado.anuncios:
+                exportador.exportar(resultado.anuncios, resultado.consulta.termo, resultado.consulta.estado)
+
+    for resultado in resultados:
+        print(_resumo(resultado))
+    print(f"🌐 OLX: {scraper.resumo_requisicoes()}")
+    if args.comando == "varrer":
+        print(f"🗺️ Varredura: {varredura.estatisticas}")
+    if consultor.cache:
+        print(f"💾 Cache FIPE: {consultor.cache.estatisticas()}")
+    if enriquecedor is not None:
+        enriquecedor.fechar()
+    if acervo is not None:
+        acervo.fechar()
+        print(f"🗄️ Acervo: páginas arquivadas em {args.acervo}")
+    if mercado is not None:
+        mercado.fechar()
+        print(f"📊 Mercado: {len(mercado)} grupos salvos em {args.mercado}")
+    if duplicados is not None:
+        print(f"🧬 Duplicados: {duplicados.estatisticas}")
+
+    return 1 if any(r.erro for r in resultados) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
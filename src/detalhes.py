@@ -0,0 +1,167 @@
+"""Enriquecimento opcional: baixa a página de cada anúncio e traz descrição e propriedades completas."""
+import html as html_lib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Sequence, Union
+
+from src.metricas import metricas
+from src.models import Anuncio, AnuncioLeve
+from src.scraper import OLXScraper, _json_loads, eh_desafio, extrair_next_data
+
+_RE_INITIAL_DATA = re.compile(rb'<script[^>]*\bid="initial-data"[^>]*\bdata-json="([^"]*)"', re.S)
+_RE_TAGS_HTML = re.compile(r"<br\s*/?>|<[^>]+>", re.I)
+
+# Propriedades da página do anúncio que completam campos vazios do resultado de busca
+_CAMPOS_PROPRIEDADES = {"regdate": "ano", "mileage": "km", "gearbox": "cambio", "fuel": "combustivel"}
+
+def _dados_anuncio(conteudo: bytes) -> Optional[dict]:
+    dados = extrair_next_data(conteudo)
+    if dados is not None:
+        props = dados.get("props", {}).get("pageProps", {})
+        ad = props.get("ad") or props.get("adDetail") or props.get("initialData", {}).get("ad")
+        if isinstance(ad, dict):
+            return ad
+    # Layout antigo do adview: JSON escapado no atributo data-json
+    m = _RE_INITIAL_DATA.search(conteudo)
+    if m:
+        try:
+            ad = _json_loads(html_lib.unescape(m.group(1).decode("utf-8", "replace"))).get("ad")
+            if isinstance(ad, dict):
+                return ad
+        except (ValueError, AttributeError):
+            return None
+    return None
+
+def extrair_detalhe(conteudo: bytes) -> Optional[dict]:
+    """{"descricao": str, "propriedades": {nome: valor}} da página de um anúncio, ou None."""
+    ad = _dados_anuncio(conteudo)
+    if ad is None:
+        return None
+
+    descricao = ad.get("description") or ad.get("body") or ""
+    descricao = html_lib.unescape(_RE_TAGS_HTML.sub("\n", descricao)).strip()
+
+    propriedades = {}
+    for p in ad.get("properties") or []:
+        if isinstance(p, dict) and p.get("name") and p.get("value") is not None:
+            propriedades[p["name"]] = str(p["value"])
+    return {"descricao": descricao, "propriedades": propriedades}
+
+class CacheDetalhes:
+    """Detalhes já baixados, por listId (SQLite). A descrição quase nunca muda; o TTL padrão é 7 dias."""
+    def __init__(self, caminho: str = "data/detalhes.sqlite", ttl: float = 7 * 24 * 3600):
+        self.caminho = caminho
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+        pasta = os.path.dirname(caminho)
+        if pasta and not os.path.exists(pasta): os.makedirs(pasta)
+
+        self._conn = sqlite3.connect(caminho, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS detalhes ("
+            " id TEXT PRIMARY KEY, descricao TEXT NOT NULL, propriedades TEXT NOT NULL, criado_em REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def obter_varios(self, ids: Sequence[str]) -> dict:
+        encontrados = {}
+        limite = time.time() - self.ttl
+        for i in range(0, len(ids), 500):
+            lote = list(ids[i:i + 500])
+            marcadores = ",".join("?" * len(lote))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT id, descricao, propriedades FROM detalhes WHERE criado_em >= ? AND id IN ({marcadores})",
+                    [limite] + lote
+                ).fetchall()
+            for id_, descricao, propriedades in rows:
+                encontrados[id_] = {"descricao": descricao, "propriedades": json.loads(propriedades)}
+        return encontrados
+
+    def salvar_varios(self, detalhes: dict):
+        agora = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO detalhes (id, descricao, propriedades, criado_em) VALUES (?, ?, ?, ?)",
+                [(i, d["descricao"], json.dumps(d["propriedades"], ensure_ascii=False), agora) for i, d in detalhes.items()]
+            )
+            self._conn.commit()
+
+    def fechar(self):
+        with self._lock:
+            self._conn.close()
+
+class EnriquecedorAnuncios:
+    """Busca a página de cada anúncio em paralelo (pool limitado) e preenche ``descricao``/``propriedades``.
+
+    As requisições passam pelo ``OLXScraper.requisitar``, então dividem com a busca o mesmo balde
+    de fichas, as retentativas e o rodízio de perfil. Anúncios já enriquecidos são pulados e os
+    detalhes ficam no ``CacheDetalhes``, de modo que um re-scan só baixa os anúncios novos.
+    """
+    def __init__(self, scraper: Optional[OLXScraper] = None, cache: Optional[CacheDetalhes] = None,
+                 usar_cache: bool = True, max_paralelo: int = 8):
+        self.scraper = scraper or OLXScraper(max_paralelo=max_paralelo)
+        self.cache = cache if cache is not None else (CacheDetalhes() if usar_cache else None)
+        self.max_paralelo = max(1, max_paralelo)
+
+    def fechar(self):
+        if self.cache is not None:
+            self.cache.fechar()
+
+    def _baixar(self, anuncio) -> Optional[dict]:
+        if not anuncio.link:
+            return None
+        try:
+            response = self.scraper.requisitar(anuncio.link, endpoint="olx.detalhe")
+            if response.status_code != 200 or eh_desafio(200, response.content):
+                return None
+            with metricas.etapa("olx.parse_detalhe"):
+                return extrair_detalhe(response.content)
+        except Exception:
+            metricas.erro("olx.detalhe")
+            return None
+
+    @staticmethod
+    def aplicar(anuncio, detalhe: dict):
+        anuncio.descricao = detalhe["descricao"]
+        anuncio.propriedades = detalhe["propriedades"]
+        for nome, campo in _CAMPOS_PROPRIEDADES.items():
+            valor = detalhe["propriedades"].get(nome)
+            if valor and getattr(anuncio, campo) in (None, 0, "", "N/A"):
+                try:
+                    setattr(anuncio, campo, int(re.sub(r"\D", "", valor)) if campo in ("ano", "km") else valor)
+                except ValueError:
+                    pass
+
+    @metricas.cronometrado("olx.enriquecer")
+    def enriquecer(self, anuncios: Sequence[Union[Anuncio, AnuncioLeve]]) -> int:
+        """Enriquece no lugar; devolve quantos anúncios ganharam detalhes."""
+        pendentes = [a for a in anuncios if a.descricao is None]
+        if not pendentes:
+            return 0
+
+        do_cache = self.cache.obter_varios([a.id for a in pendentes]) if self.cache else {}
+        faltando = [a for a in pendentes if a.id not in do_cache]
+
+        baixados = {}
+        if faltando:
+            with ThreadPoolExecutor(max_workers=min(self.max_paralelo, len(faltando))) as pool:
+                for anuncio, detalhe in zip(faltando, pool.map(self._baixar, faltando)):
+                    if detalhe is not None:
+                        baixados[anuncio.id] = detalhe
+            if self.cache and baixados:
+                self.cache.salvar_varios(baixados)
+
+        detalhes = {**do_cache, **baixados}
+        for anuncio in pendentes:
+            if anuncio.id in detalhes:
+                self.aplicar(anuncio, detalhes[anuncio.id])
+        metricas.contar("olx.detalhe_cache.hit", len(do_cache))
+        metricas.contar("olx.detalhe_cache.miss", len(faltando))
+        return len(detalhes)
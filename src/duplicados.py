@@ -0,0 +1,240 @@
+"""Detecção de anúncios duplicados e republicados (mesmo carro com outro listId)."""
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from src.indice_fipe import normalizar, tokenizar
+from src.metricas import metricas
+from src.models import Anuncio, AnuncioLeve
+
+# MinHash do título: 64 permutações (a·h + b) mod P sobre hashes crc32 dos tokens e pares de tokens,
+# em 16 bandas de 4 linhas; títulos com Jaccard ~0,5 ou mais costumam cair num mesmo balde
+N_PERMUTACOES, N_BANDAS = 64, 16
+_PRIMO = np.uint64(4_294_967_311)
+_rng = np.random.default_rng(20240601)
+_A = _rng.integers(1, 2**31, N_PERMUTACOES, dtype=np.uint64)
+_B = _rng.integers(0, 2**32, N_PERMUTACOES, dtype=np.uint64)
+
+def assinatura(titulo: str) -> np.ndarray:
+    tokens = tokenizar(titulo)
+    shingles = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])] or [""]
+    hashes = np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles))
+    return ((_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIMO).min(axis=1)
+
+@lru_cache(maxsize=4096)
+def _cidade(nome: str) -> str:
+    return normalizar(nome)
+
+def chave_imagem(url: Optional[str]) -> Optional[str]:
+    """Nome do arquivo da foto, sem extensão nem query (o mesmo upload aparece em tamanhos diferentes)."""
+    if not url:
+        return None
+    nome = os.path.basename(url.split("?", 1)[0]).rsplit(".", 1)[0]
+    return nome or None
+
+class IndiceDuplicados:
+    """Agrupa cópias do mesmo carro conforme os anúncios chegam.
+
+    Candidatos vêm de três chaves: baldes LSH da assinatura MinHash do título (separados por ano e
+    UF), a foto principal e a ficha (ano, km, cidade). Cada candidato é confirmado pelos atributos —
+    mesma foto; ou mesmo ano, UF e cidade com a mesma ficha e preço a até 25%; ou título parecido com
+    km a até 1% (ou mil km) e preço a até 15% — e os pares confirmados são unidos num union-find.
+    Para um grupo não crescer em cadeia (A parece B, B parece C, mas A não parece C), o anúncio
+    novo também precisa bater com a entrada mais antiga do grupo candidato antes da união.
+    Baldes guardam só as ``max_balde`` entradas mais recentes, então cada anúncio custa um número
+    limitado de comparações.
+
+    A memória é limitada por ``capacidade``: passando dela, os grupos menos recentemente tocados são
+    esquecidos por inteiro.
+    """
+    def __init__(self, limiar: float = 0.6, capacidade: int = 200_000, max_balde: int = 32):
+        self.limiar = limiar
+        self.capacidade = capacidade
+        self.max_balde = max_balde
+        self._lock = threading.Lock()
+        self._proximo = 0
+        self._entradas: Dict[int, tuple] = {}
+        self._por_id: Dict[str, int] = {}
+        self._baldes: Dict[tuple, List[int]] = {}
+        self._pai: Dict[int, int] = {}
+        self._membros: Dict[int, List[int]] = {}
+        self._canonico: Dict[int, object] = {}
+        # Raiz -> entrada mais antiga do grupo, contra a qual todo candidato novo é conferido
+        self._referencia: Dict[int, int] = {}
+        self._recentes: "OrderedDict[int, None]" = OrderedDict()
+        self.estatisticas = {"anuncios": 0, "duplicados": 0, "esquecidos": 0}
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def _raiz(self, i: int) -> int:
+        while self._pai[i] != i:
+            self._pai[i] = self._pai[self._pai[i]]
+            i = self._pai[i]
+        return i
+
+    def _unir(self, a: int, b: int) -> int:
+        ra, rb = self._raiz(a), self._raiz(b)
+        if ra == rb:
+            return ra
+        if len(self._membros[ra]) < len(self._membros[rb]):
+            ra, rb = rb, ra
+        self._pai[rb] = ra
+        self._membros[ra].extend(self._membros.pop(rb))
+        self._referencia[ra] = min(self._referencia[ra], self._referencia.pop(rb))
+        # O representante do grupo maior continua; o do menor só é mantido se o maior não tiver um
+        canonico = self._canonico.pop(rb, None)
+        if ra not in self._canonico and canonico is not None:
+            self._canonico[ra] = canonico
+        self._recentes.pop(rb, None)
+        return ra
+
+    def _mesmo_carro(self, e1: tuple, e2: tuple) -> bool:
+        sig1, ano1, km1, preco1, uf1, cidade1, img1, _ = e1
+        sig2, ano2, km2, preco2, uf2, cidade2, img2, _ = e2
+        if (ano1 and ano2 and ano1 != ano2) or (uf1 and uf2 and uf1 != uf2):
+            return False
+        if img1 and img1 == img2:
+            return True
+        km_conhecido = km1 > 0 and km2 > 0
+        diferenca_preco = abs(preco1 - preco2) / max(preco1, preco2, 1)
+        if cidade1 and cidade2 and cidade1 != cidade2:
+            return False
+        if km_conhecido and km1 == km2 and cidade1 and diferenca_preco <= 0.25:
+            return True
+        # Títulos parecidos são comuns entre carros diferentes: além do título, exige a mesma rodagem
+        # (a republicação só acrescenta o que o carro rodou no meio tempo) e preço próximo
+        if km_conhecido:
+            if abs(km1 - km2) > max(1_000, 0.01 * max(km1, km2)) or diferenca_preco > 0.15:
+                return False
+        elif diferenca_preco > 0.05 or not cidade1:
+            return False
+        return float(np.count_nonzero(sig1 == sig2)) / N_PERMUTACOES >= self.limiar
+
+    def _chaves(self, sig: np.ndarray, ano: int, km: int, uf: str, cidade: str, imagem: Optional[str]) -> list:
+        # Ano e UF entram na chave das bandas: cópias precisam coincidir neles de qualquer forma, e
+        # assim títulos populares (ex.: "Honda Civic EXL 2.0") não lotam os mesmos baldes no país todo
+        chaves = [("lsh", ano, uf, i, sig[i * 4:(i + 1) * 4].tobytes()) for i in range(N_BANDAS)]
+        if imagem:
+            chaves.append(("img", imagem))
+        if km > 0 and cidade:
+            chaves.append(("ficha", ano, km, cidade))
+        return chaves
+
+    def _esquecer(self):
+        while len(self._entradas) > self.capacidade and self._recentes:
+            raiz, _ = self._recentes.popitem(last=False)
+            for i in self._membros.pop(raiz, [raiz]):
+                entrada = self._entradas.pop(i)
+                self._por_id.pop(entrada[7], None)
+                self._pai.pop(i, None)
+                for chave in self._chaves(entrada[0], entrada[1], entrada[2], entrada[4], entrada[5], entrada[6]):
+                    balde = self._baldes.get(chave)
+                    if balde is not None and i in balde:
+                        balde.remove(i)
+                        if not balde:
+                            del self._baldes[chave]
+                self.estatisticas["esquecidos"] += 1
+            self._canonico.pop(raiz, None)
+            self._referencia.pop(raiz, None)
+
+    def adicionar(self, anuncio: Union[Anuncio, AnuncioLeve]) -> Tuple[int, bool]:
+        """Indexa o anúncio; devolve (grupo, novo), com ``novo`` falso se ele já pertence a um grupo conhecido."""
+        with self._lock:
+            if anuncio.id in self._por_id:
+                raiz = self._raiz(self._por_id[anuncio.id])
+                self._recentes.move_to_end(raiz)
+                return raiz, False
+
+            i = self._proximo
+            self._proximo += 1
+            ano, km = anuncio.ano or 0, anuncio.km or 0
+            cidade = _cidade(anuncio.cidade or "")
+            imagem = chave_imagem(anuncio.imagem)
+            sig = assinatura(anuncio.titulo)
+            uf = (anuncio.estado or "").upper()
+            entrada = (sig, ano, km, anuncio.preco, uf, cidade, imagem, anuncio.id)
+
+            self._entradas[i] = entrada
+            self._por_id[anuncio.id] = i
+            self._pai[i] = i
+            self._membros[i] = [i]
+            self._referencia[i] = i
+            self._recentes[i] = None
+
+            raiz, vistos = i, set()
+            for chave in self._chaves(sig, ano, km, uf, cidade, imagem):
+                balde = self._baldes.setdefault(chave, [])
+                for j in balde:
+                    if j in vistos:
+                        continue
+                    vistos.add(j)
+                    rj = self._raiz(j)
+                    if rj == raiz or not self._mesmo_carro(entrada, self._entradas[j]):
+                        continue
+                    referencia = self._referencia[rj]
+                    if referencia == j or self._mesmo_carro(entrada, self._entradas[referencia]):
+                        raiz = self._unir(i, j)
+                balde.append(i)
+                if len(balde) > self.max_balde:
+                    balde.pop(0)
+
+            novo = raiz == i and len(self._membros[i]) == 1
+            if novo:
+                self._canonico[i] = anuncio
+            else:
+                self.estatisticas["duplicados"] += 1
+            self._recentes[raiz] = None
+            self._recentes.move_to_end(raiz)
+            self.estatisticas["anuncios"] += 1
+            self._esquecer()
+            return raiz, novo
+
+    def filtrar(self, anuncios: Iterable[Union[Anuncio, AnuncioLeve]],
+                ao_duplicar: Optional[Callable[[Union[Anuncio, AnuncioLeve], int], None]] = None
+                ) -> Iterator[Union[Anuncio, AnuncioLeve]]:
+        """Versão em fluxo: entrega só a primeira cópia de cada carro e soma as seguintes no
+        ``duplicados`` dela. Com ``ao_duplicar``, a contagem nova vai para ``ao_duplicar(primeira, n)``
+        em vez de ser gravada no anúncio (ex.: quando ele já foi entregue a outra thread)."""
+        for anuncio in anuncios:
+            grupo, novo = self.adicionar(anuncio)
+            if novo:
+                yield anuncio
+                continue
+            with self._lock:
+                raiz = self._raiz(grupo) if grupo in self._pai else grupo
+                canonico = self._canonico.get(raiz)
+                n = len(self._membros[raiz]) - 1 if raiz in self._membros else 0
+            if canonico is not None and canonico is not anuncio:
+                metricas.contar("duplicados.colapsados")
+                if ao_duplicar is not None:
+                    ao_duplicar(canonico, n)
+                else:
+                    canonico.duplicados = n
+
+    @metricas.cronometrado("duplicados.colapsar")
+    def colapsar(self, anuncios: List[Union[Anuncio, AnuncioLeve]]
+                 ) -> Tuple[List[Union[Anuncio, AnuncioLeve]], List[Union[Anuncio, AnuncioLeve]]]:
+        """(um anúncio por grupo, cópias descartadas). Fica, na ordem de chegada, a cópia publicada
+        mais recentemente do lote, com ``duplicados`` = tamanho do grupo (incluindo cópias de lotes
+        anteriores) menos um; as demais voltam à parte para quem precisa registrá-las (ex.: armazém)."""
+        grupos = [self.adicionar(a)[0] for a in anuncios]
+        escolhidos: Dict[int, object] = {}
+        with self._lock:
+            for anuncio, grupo in zip(anuncios, grupos):
+                raiz = self._raiz(grupo) if grupo in self._pai else grupo
+                atual = escolhidos.get(raiz)
+                if atual is None or (anuncio.data_publicacao or "") > (atual.data_publicacao or ""):
+                    escolhidos[raiz] = anuncio
+            for raiz, anuncio in escolhidos.items():
+                anuncio.duplicados = len(self._membros.get(raiz, (raiz,))) - 1
+        unicos = list(escolhidos.values())
+        metricas.contar("duplicados.colapsados", len(anuncios) - len(unicos))
+        posicao = {id(a): n for n, a in enumerate(anuncios)}
+        ficam = {id(a) for a in unicos}
+        return sorted(unicos, key=lambda a: posicao[id(a)]), [a for a in anuncios if id(a) not in ficam]
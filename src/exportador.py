@@ -0,0 +1,159 @@
+import csv
+import os
+import subprocess
+import sys
+import uuid
+from datetime import date, datetime
+from typing import Dict, Optional, Sequence, Type
+
+from src.metricas import metricas
+
+COLUNAS_RELATORIO = ["titulo", "preco", "score_preco", "tags", "ano", "km", "km_anual", "cidade", "estado", "link",
+                     "duplicados"]
+COLUNAS_COMPLETAS = ["id", "titulo", "preco", "ano", "km", "cambio", "combustivel", "cidade", "estado",
+                     "link", "imagem", "data_publicacao", "descricao", "propriedades", "tags", "score_preco", "km_anual",
+                     "percentil_mercado", "z_mercado", "preco_esperado", "duplicados"]
+
+def _colunas(anuncios: Sequence, colunas: Sequence[str]) -> Dict[str, list]:
+    """Monta as colunas direto dos atributos (Anuncio ou AnuncioLeve), sem passar por dicts por anúncio."""
+    return {c: [getattr(a, c) for a in anuncios] for c in colunas}
+
+def nome_arquivo(termo: str, uf: Optional[str], extensao: str) -> str:
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M")
+    return f"analise_{uf or 'BR'}_{termo.replace(' ', '_')}_{timestamp}.{extensao}"
+
+def abrir_pasta(caminho: str):
+    """Abre a pasta no gerenciador de arquivos do sistema (os.startfile só existe no Windows)."""
+    caminho = os.path.abspath(caminho)
+    if sys.platform.startswith("win"):
+        os.startfile(caminho)
+    elif sys.platform == "darwin":
+        subprocess.Popen(["open", caminho])
+    else:
+        subprocess.Popen(["xdg-open", caminho])
+
+class Exportador:
+    extensao = ""
+
+    def __init__(self, pasta: str = "data", colunas: Optional[Sequence[str]] = None):
+        self.pasta = pasta
+        self.colunas = list(colunas or COLUNAS_RELATORIO)
+
+    def exportar(self, anuncios: Sequence, termo: str, uf: Optional[str] = None) -> str:
+        if not os.path.exists(self.pasta): os.makedirs(self.pasta)
+        caminho = os.path.join(self.pasta, nome_arquivo(termo, uf, self.extensao))
+        with metricas.etapa(f"exportar.{self.extensao}"):
+            self._escrever(anuncios, caminho)
+        return caminho
+
+    def _escrever(self, anuncios: Sequence, caminho: str):
+        raise NotImplementedError
+
+class ExportadorExcel(Exportador):
+    extensao = "xlsx"
+
+    def _escrever(self, anuncios: Sequence, caminho: str):
+        import pandas as pd
+
+        dados = _colunas(anuncios, self.colunas)
+        if "tags" in dados:
+            dados["tags"] = [", ".join(t) for t in dados["tags"]]
+        df = pd.DataFrame(dados, columns=self.colunas)
+
+        with pd.ExcelWriter(caminho, engine='xlsxwriter') as writer:
+            df.to_excel(writer, index=False, sheet_name='Analise')
+            workbook = writer.book
+            worksheet = writer.sheets['Analise']
+            fmt_moeda = workbook.add_format({'num_format': 'R$ #,##0'})
+            worksheet.set_column('A:A', 40)
+            worksheet.set_column('B:B', 15, fmt_moeda)
+            worksheet.set_column('J:J', 60)
+
+class ExportadorCSV(Exportador):
+    extensao = "csv"
+
+    def _escrever(self, anuncios: Sequence, caminho: str):
+        with open(caminho, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerow(self.colunas)
+            for a in anuncios:
+                writer.writerow([", ".join(a.tags) if c == "tags" else getattr(a, c) for c in self.colunas])
+
+class ExportadorArrow(Exportador):
+    """Base colunar: monta uma pyarrow.Table tipada a partir dos anúncios."""
+    def __init__(self, pasta: str = "data", colunas: Optional[Sequence[str]] = None):
+        super().__init__(pasta, colunas or COLUNAS_COMPLETAS)
+
+    @staticmethod
+    def esquema():
+        import pyarrow as pa
+        return {
+            "id": pa.string(), "titulo": pa.string(), "preco": pa.float64(), "ano": pa.int16(),
+            "km": pa.int64(), "cambio": pa.string(), "combustivel": pa.string(), "cidade": pa.string(),
+            "estado": pa.string(), "link": pa.string(), "imagem": pa.string(), "data_publicacao": pa.string(),
+            "descricao": pa.string(), "propriedades": pa.map_(pa.string(), pa.string()),
+            "tags": pa.list_(pa.string()), "score_preco": pa.dictionary(pa.int8(), pa.string()),
+            "km_anual": pa.int32(), "percentil_mercado": pa.float32(), "z_mercado": pa.float32(),
+            "preco_esperado": pa.float64(), "duplicados": pa.int32(), "data_coleta": pa.date32(),
+        }
+
+    def tabela(self, anuncios: Sequence, data_coleta: Optional[date] = None):
+        import pyarrow as pa
+
+        tipos = self.esquema()
+        dados = _colunas(anuncios, self.colunas)
+        arrays = [pa.array(dados[c], type=tipos.get(c)) for c in self.colunas]
+        nomes = list(self.colunas)
+        if "data_coleta" not in nomes:
+            arrays.append(pa.array([data_coleta or date.today()] * len(anuncios), type=pa.date32()))
+            nomes.append("data_coleta")
+        return pa.Table.from_arrays(arrays, names=nomes)
+
+class ExportadorFeather(ExportadorArrow):
+    extensao = "feather"
+
+    def _escrever(self, anuncios: Sequence, caminho: str):
+        import pyarrow.feather as feather
+        feather.write_feather(self.tabela(anuncios), caminho, compression="zstd")
+
+class ExportadorParquet(ExportadorArrow):
+    """Parquet tipado. Com ``particionar=True`` grava um dataset estado=UF/data_coleta=AAAA-MM-DD
+    em ``pasta/anuncios``, acrescentando um arquivo novo por exportação (append)."""
+    extensao = "parquet"
+
+    def __init__(self, pasta: str = "data", colunas: Optional[Sequence[str]] = None, particionar: bool = True):
+        super().__init__(pasta, colunas)
+        self.particionar = particionar
+
+    def exportar(self, anuncios: Sequence, termo: str, uf: Optional[str] = None) -> str:
+        if not self.particionar:
+            return super().exportar(anuncios, termo, uf)
+
+        import pyarrow.dataset as ds
+
+        destino = os.path.join(self.pasta, "anuncios")
+        with metricas.etapa("exportar.parquet_dataset"):
+            ds.write_dataset(
+                self.tabela(anuncios), destino, format="parquet",
+                partitioning=["estado", "data_coleta"], partitioning_flavor="hive",
+                basename_template=f"{termo.replace(' ', '_')}_{uuid.uuid4().hex[:8]}_{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+            )
+        return destino
+
+    def _escrever(self, anuncios: Sequence, caminho: str):
+        import pyarrow.parquet as pq
+        pq.write_table(self.tabela(anuncios), caminho, compression="zstd")
+
+EXPORTADORES: Dict[str, Type[Exportador]] = {
+    "parquet": ExportadorParquet,
+    "feather": ExportadorFeather,
+    "excel": ExportadorExcel,
+    "csv": ExportadorCSV,
+}
+
+def criar_exportador(formato: str, **kwargs) -> Exportador:
+    try:
+        return EXPORTADORES[formato](**kwargs)
+    except KeyError:
+        raise ValueError(f"Formato '{formato}' desconhecido. Use: {', '.join(EXPORTADORES)}")
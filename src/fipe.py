@@ -1,92 +1,264 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 import requests
+from requests.adapters import HTTPAdapter
 from unidecode import unidecode
+from src.cache import CacheFipe
+from src.indice_fipe import IndiceMarcas, IndiceModelos
+from src.metricas import metricas
+
+# Rótulo do endpoint pelo número de segmentos do caminho (/carros/marcas/{m}/modelos/{v}/anos/{a})
+_ENDPOINTS = {2: "fipe.marcas", 4: "fipe.modelos", 6: "fipe.anos", 7: "fipe.preco"}
+
+# Nota do IndiceModelos abaixo da qual a versão escolhida provavelmente não é o carro buscado
+# (o casamento por substring de último recurso vale 0.25)
+CONFIANCA_BAIXA = 0.4
 
 class ConsultorFipe:
-    def __init__(self):
-        self.base_url = "https://parallelum.com.br/fipe/api/v1"
+    def __init__(self, cache: Optional[CacheFipe] = None, usar_cache: bool = True,
+                 concorrencia: int = 8, timeout: float = 10, max_versoes: int = 50,
+                 base_url: str = "https://parallelum.com.br/fipe/api/v1"):
+        self.base_url = base_url
         self.headers = {"User-Agent": "PyMotors/3.0"}
+        self.cache = cache if cache is not None else (CacheFipe() if usar_cache else None)
+        self.concorrencia = max(1, concorrencia)
+        self.timeout = timeout
+        self.max_versoes = max_versoes
+        self.requisicoes = 0
+        self._lock = threading.Lock()
+        self._indices = {}
+
+        # Sessão única com pool de conexões keep-alive, dimensionado para a concorrência
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=self.concorrencia, pool_maxsize=self.concorrencia)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _get_json(self, endpoint: str, chave: Optional[str] = None, cachear: bool = True):
+        """GET na API, passando pelo cache em ``chave`` (o próprio endpoint por padrão); com
+        ``cachear=False`` vai direto à rede e não grava nada."""
+        chave = chave or endpoint
+        if self.cache and cachear:
+            dados = self.cache.obter(chave)
+            if dados is not None:
+                metricas.contar("fipe.cache.hit")
+                return dados
+            metricas.contar("fipe.cache.miss")
+
+        inicio = time.perf_counter()
+        resp = self.session.get(f"{self.base_url}{endpoint}", timeout=self.timeout)
+        metricas.requisicao(_ENDPOINTS.get(endpoint.count("/"), "fipe.outros"), resp.status_code,
+                            len(resp.content), time.perf_counter() - inicio)
+        with self._lock:
+            self.requisicoes += 1
+        dados = resp.json()
+
+        if self.cache and cachear and resp.status_code == 200:
+            self.cache.salvar(chave, dados)
+        return dados
+
+    def _indice(self, chave: str, endpoint: str, classe, extrair=lambda dados: dados):
+        """Índice em memória -> índice persistido no cache -> montado a partir do catálogo.
+
+        Só o índice montado vai para o cache (é o que uma busca quente lê); o catálogo bruto não.
+        """
+        with self._lock:
+            indice = self._indices.get(chave)
+        if indice is not None:
+            return indice
+
+        dados = self.cache.obter(chave) if self.cache else None
+        if dados is not None:
+            metricas.contar("fipe.cache.hit")
+            indice = classe.de_dict(dados)
+        else:
+            if self.cache:
+                metricas.contar("fipe.cache.miss")
+            indice = classe.do_catalogo(extrair(self._get_json(endpoint, cachear=False)))
+            if self.cache:
+                self.cache.salvar(chave, indice.para_dict())
+
+        with self._lock:
+            self._indices[chave] = indice
+        return indice
+
+    def _indice_marcas(self) -> IndiceMarcas:
+        return self._indice("indice/marcas", "/carros/marcas", IndiceMarcas)
+
+    def _indice_modelos(self, id_marca) -> IndiceModelos:
+        return self._indice(f"indice/modelos/{id_marca}", f"/carros/marcas/{id_marca}/modelos",
+                            IndiceModelos, extrair=lambda dados: dados['modelos'])
+
+    def _mapear(self, funcao, itens: list) -> list:
+        # pool.map preserva a ordem dos itens, então o resultado é idêntico ao do modo serial
+        if self.concorrencia > 1 and len(itens) > 1:
+            with ThreadPoolExecutor(max_workers=self.concorrencia) as pool:
+                return list(pool.map(funcao, itens))
+        return [funcao(item) for item in itens]
+
+    def planejar(self, termo_busca: str) -> "PlanoFipe":
+        """Resolve marca e versões uma única vez; o plano devolvido precifica quantos anos forem pedidos."""
+        return PlanoFipe(self, termo_busca)
 
     def obter_preco_medio(self, termo_busca: str, ano: int) -> tuple[float, str]:
-        if not ano: 
+        if not ano:
             return 0.0, "Ano não informado."
-        
-        print(f"\n📊 FIPE: {termo_busca} ({ano})...")
-        
+
+        with metricas.etapa("fipe.preco_medio"):
+            return self.planejar(termo_busca).precos([ano])[ano]
+
+
+class PlanoFipe:
+    """Plano de consulta FIPE compartilhado entre vários anos-modelo do mesmo termo.
+
+    A lista de anos de cada versão é baixada uma vez só, e cada preço (versão, ano) também;
+    pedir novos anos depois (ex.: a cada página da OLX) só busca o que ainda falta.
+    ``ranking`` guarda (versão, nota) dos candidatos e ``confianca`` a nota do melhor deles.
+    Falhas de rede não ficam guardadas: os anos calculados sem alguma versão são refeitos no próximo pedido.
+    """
+    def __init__(self, consultor: ConsultorFipe, termo_busca: str):
+        self.consultor = consultor
+        self.erro: Optional[str] = None
+        self.id_marca = None
+        self.candidatos: list[dict] = []
+        self.ranking: list[tuple[str, float]] = []
+        self.confianca = 0.0
+        self._anos_por_modelo: dict = {}
+        self._precos: dict = {}
+        self._resultados: dict[int, tuple[float, str]] = {}
+        self._incompletos: set = set()
+        self._lock = threading.Lock()
+
         termos = termo_busca.split()
-        if not termos: return 0.0, "Termo inválido."
+        if not termos:
+            self.erro = "Termo inválido."
+            return
         
         provavel_marca = unidecode(termos[0].lower())
         provavel_modelo = unidecode(" ".join(termos[1:]).lower()) if len(termos) > 1 else ""
 
         try:
-            resp = requests.get(f"{self.base_url}/carros/marcas", headers=self.headers)
-            marcas = resp.json()
-            
-            id_marca = None
-            for m in marcas:
-                if provavel_marca == unidecode(m['nome'].lower()):
-                    id_marca = m['codigo']
-                    break
-            if not id_marca:
-                for m in marcas:
-                    if provavel_marca in unidecode(m['nome'].lower()):
-                        id_marca = m['codigo']
-                        break
+            self.id_marca = consultor._indice_marcas().buscar(provavel_marca)
+
+            if not self.id_marca:
+                self.erro = f"Marca '{provavel_marca}' não encontrada."
+                return
+
+            ranking = consultor._indice_modelos(self.id_marca).buscar(provavel_modelo, limite=consultor.max_versoes)
+            self.ranking = [(mod['nome'], nota) for mod, nota in ranking]
+            self.confianca = ranking[0][1] if ranking else 0.0
+            self.candidatos = [mod for mod, _ in ranking]
 
-            if not id_marca:
-                return 0.0, f"Marca '{provavel_marca}' não encontrada."
+            if not self.candidatos:
+                self.erro = f"Modelo '{provavel_modelo}' não existe."
 
-            resp = requests.get(f"{self.base_url}/carros/marcas/{id_marca}/modelos", headers=self.headers)
-            modelos = resp.json()['modelos']
-            
-            modelos_candidatos = []
-            for mod in modelos:
-                nome_mod = unidecode(mod['nome'].lower())
-                if all(parte in nome_mod for parte in provavel_modelo.split()):
-                    modelos_candidatos.append(mod)
+        except Exception:
+            metricas.erro("fipe.plano")
+            self.erro = "Erro de conexão FIPE."
+
+    @property
+    def confianca_baixa(self) -> bool:
+        return not self.erro and self.confianca < CONFIANCA_BAIXA
 
-            if not modelos_candidatos:
-                return 0.0, f"Modelo '{provavel_modelo}' não existe."
+    def aviso(self) -> Optional[str]:
+        """Texto de alerta quando a versão mais próxima casou mal com o termo buscado."""
+        if not self.confianca_baixa or not self.ranking:
+            return None
+        return f"Versão FIPE incerta: '{self.ranking[0][0]}' (confiança {self.confianca:.2f})"
 
+    def precos(self, anos) -> dict[int, tuple[float, str]]:
+        anos = [a for a in anos if a]
+        with self._lock:
+            faltando = sorted((set(anos) - set(self._resultados)) | (set(anos) & self._incompletos))
+            if faltando:
+                if self.erro:
+                    self._resultados.update({a: (0.0, self.erro) for a in faltando})
+                else:
+                    try:
+                        self._precificar(faltando)
+                    except Exception:
+                        metricas.erro("fipe.precificar")
+                        self._resultados.update({a: (0.0, "Erro de conexão FIPE.") for a in faltando})
+            return {a: self._resultados[a] for a in anos}
+
+    def _anos_do_modelo(self, mod: dict) -> Optional[list]:
+        try:
+            anos = self.consultor._get_json(f"/carros/marcas/{self.id_marca}/modelos/{mod['codigo']}/anos")
+        except Exception:
+            anos = None
+        if not isinstance(anos, list):
+            metricas.erro("fipe.anos")
+            return None
+        return anos
+
+    def _preco(self, chave: tuple) -> Optional[float]:
+        cod_modelo, cod_ano = chave
+        try:
+            dados = self.consultor._get_json(
+                f"/carros/marcas/{self.id_marca}/modelos/{cod_modelo}/anos/{cod_ano}",
+                chave=CacheFipe.chave_preco(cod_modelo, cod_ano)
+            )
+            return float(dados['Valor'].replace("R$", "").replace(".", "").replace(",", ".").strip())
+        except Exception:
+            metricas.erro("fipe.preco")
+            return None
+
+    def _precificar(self, anos: list[int]):
+        # 1) Lista de anos de cada versão: baixada uma vez por plano (a que falhar é pedida de novo depois)
+        pendentes = [mod for mod in self.candidatos if mod['codigo'] not in self._anos_por_modelo]
+        for mod, lista in zip(pendentes, self.consultor._mapear(self._anos_do_modelo, pendentes)):
+            if lista is not None:
+                self._anos_por_modelo[mod['codigo']] = lista
+        sem_anos = len(self._anos_por_modelo) < len(self.candidatos)
+
+        # 2) Código (versão, ano) de cada ano pedido, deduplicado entre os anos
+        codigos = {}
+        for ano in anos:
+            for mod in self.candidatos:
+                for a in self._anos_por_modelo.get(mod['codigo'], []):
+                    if str(ano) in a['nome']:
+                        codigos[(ano, mod['codigo'])] = a['codigo']
+                        break
+
+        chaves = sorted({(cod_modelo, cod_ano) for (_, cod_modelo), cod_ano in codigos.items()} - set(self._precos),
+                        key=str)
+        for chave, valor in zip(chaves, self.consultor._mapear(self._preco, chaves)):
+            if valor is not None:
+                self._precos[chave] = valor
+
+        # 3) Média por ano, na ordem dos candidatos (mesma do modo de um ano só)
+        anos_encontrados = set()
+        for lista in self._anos_por_modelo.values():
+            for a in lista:
+                txt_ano = a['nome'].split(" ")[0]
+                if txt_ano.isdigit():
+                    anos_encontrados.add(txt_ano)
+
+        for ano in anos:
             precos = []
-            anos_encontrados = set()
-            
-            for mod in modelos_candidatos[:50]: 
-                cod_modelo = mod['codigo']
-                try:
-                    resp = requests.get(f"{self.base_url}/carros/marcas/{id_marca}/modelos/{cod_modelo}/anos", headers=self.headers)
-                    anos_disponiveis = resp.json()
-                    
-                    for a in anos_disponiveis:
-                        txt_ano = a['nome'].split(" ")[0]
-                        if txt_ano.isdigit():
-                            anos_encontrados.add(txt_ano)
-
-                    cod_ano = None
-                    for a in anos_disponiveis:
-                        if str(ano) in a['nome']:
-                            cod_ano = a['codigo']
-                            break
-                    
-                    if cod_ano:
-                        resp_valor = requests.get(f"{self.base_url}/carros/marcas/{id_marca}/modelos/{cod_modelo}/anos/{cod_ano}", headers=self.headers)
-                        dados = resp_valor.json()
-                        valor = float(dados['Valor'].replace("R$", "").replace(".", "").replace(",", ".").strip())
-                        precos.append(valor)
-                except:
-                    continue
+            incompleto = sem_anos
+            for mod in self.candidatos:
+                cod_ano = codigos.get((ano, mod['codigo']))
+                valor = self._precos.get((mod['codigo'], cod_ano)) if cod_ano else None
+                if valor is not None:
+                    precos.append(valor)
+                elif cod_ano:
+                    incompleto = True
+            if incompleto:
+                self._incompletos.add(ano)
+            else:
+                self._incompletos.discard(ano)
 
             if precos:
                 media = sum(precos) / len(precos)
-                msg = f"Média de {len(precos)} versões."
-                return media, msg
+                self._resultados[ano] = (media, f"Média de {len(precos)} versões.")
             else:
                 lista_anos = sorted(list(anos_encontrados), reverse=True)[:5]
                 dica = ", ".join(lista_anos)
                 if dica:
-                    return 0.0, f"Não existe em {ano}.\nTente: {dica}..."
+                    self._resultados[ano] = (0.0, f"Não existe em {ano}.\nTente: {dica}...")
                 else:
-                    return 0.0, f"Ano {ano} indisponível."
-
-        except Exception:
-            return 0.0, "Erro de conexão FIPE."
\ No newline at end of file
+                    self._resultados[ano] = (0.0, f"Ano {ano} indisponível.")
@@ -0,0 +1,128 @@
+import re
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+from unidecode import unidecode
+
+_RE_TOKEN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+
+def normalizar(texto: str) -> str:
+    return unidecode(texto.lower())
+
+def tokenizar(texto: str) -> List[str]:
+    return _RE_TOKEN.findall(normalizar(texto))
+
+class IndiceMarcas:
+    """Nomes de marca normalizados uma única vez; busca exata por dict, depois por substring."""
+    def __init__(self, nomes: List[str], codigos: List):
+        self.nomes = nomes
+        self.codigos = codigos
+        self._exato = {nome: cod for nome, cod in zip(nomes, codigos)}
+
+    @classmethod
+    def do_catalogo(cls, marcas: List[dict]) -> "IndiceMarcas":
+        return cls([normalizar(m['nome']) for m in marcas], [m['codigo'] for m in marcas])
+
+    def buscar(self, marca: str) -> Optional[str]:
+        marca = normalizar(marca)
+        if marca in self._exato:
+            return self._exato[marca]
+        for nome, cod in zip(self.nomes, self.codigos):
+            if marca in nome:
+                return cod
+        return None
+
+    def para_dict(self) -> dict:
+        return {"nomes": self.nomes, "codigos": self.codigos}
+
+    @classmethod
+    def de_dict(cls, dados: dict) -> "IndiceMarcas":
+        return cls(dados["nomes"], dados["codigos"])
+
+class IndiceModelos:
+    """Índice invertido token -> modelos de uma marca, com ranking por similaridade.
+
+    Cada token da consulta casa com os tokens do catálogo que começam por ele ("lx" casa
+    "lx" e "lxr"); os candidatos são a interseção das listas e a nota combina quanto do
+    nome foi coberto e quão exatos foram os casamentos (1.0 = nome idêntico à consulta).
+    """
+    def __init__(self, modelos: List[dict], tokens: List[List[str]]):
+        self.modelos = modelos
+        self.tokens = tokens
+        self._postings: Dict[str, List[int]] = {}
+        for i, toks in enumerate(tokens):
+            for t in set(toks):
+                self._postings.setdefault(t, []).append(i)
+        self._vocabulario = sorted(self._postings)
+        self._normalizados = [" ".join(t) for t in tokens]
+        self._conjuntos = [set(t) for t in tokens]
+        self._memo: Dict[Tuple[str, int], List[Tuple[dict, float]]] = {}
+
+    @classmethod
+    def do_catalogo(cls, modelos: List[dict]) -> "IndiceModelos":
+        return cls(modelos, [tokenizar(m['nome']) for m in modelos])
+
+    def _com_prefixo(self, prefixo: str) -> List[str]:
+        i = bisect_left(self._vocabulario, prefixo)
+        achados = []
+        while i < len(self._vocabulario) and self._vocabulario[i].startswith(prefixo):
+            achados.append(self._vocabulario[i])
+            i += 1
+        return achados
+
+    def buscar(self, consulta: str, limite: int = 50) -> List[Tuple[dict, float]]:
+        chave = (consulta, limite)
+        if chave not in self._memo:
+            if len(self._memo) >= 1024: self._memo.clear()
+            self._memo[chave] = self._buscar(consulta, limite)
+        return self._memo[chave]
+
+    def _buscar(self, consulta: str, limite: int) -> List[Tuple[dict, float]]:
+        termos = tokenizar(consulta)
+        if not termos:
+            ranking = [(i, 1.0 / max(len(toks), 1)) for i, toks in enumerate(self.tokens)]
+        else:
+            ranking = self._ranquear(termos)
+            if not ranking:
+                # Último recurso: substring no nome inteiro (comportamento antigo), com nota reduzida
+                partes = normalizar(consulta).split()
+                ranking = [(i, 0.25) for i, nome in enumerate(self._normalizados)
+                           if all(p in nome for p in partes)]
+
+        ranking.sort(key=lambda x: (-x[1], x[0]))
+        return [(self.modelos[i], nota) for i, nota in ranking[:limite]]
+
+    def _ranquear(self, termos: List[str]) -> List[Tuple[int, float]]:
+        # Razão len(termo)/len(token) de cada token do vocabulário que casa com cada termo
+        razoes = []
+        candidatos = None
+        for termo in termos:
+            vocab = self._com_prefixo(termo)
+            if not vocab:
+                return []
+            razoes.append({t: len(termo) / len(t) for t in vocab})
+            ids = set()
+            for t in vocab:
+                ids.update(self._postings[t])
+            candidatos = ids if candidatos is None else candidatos & ids
+            if not candidatos:
+                return []
+
+        ranking = []
+        for i in candidatos:
+            toks = self._conjuntos[i]
+            cobertos = set()
+            exatidao = 0.0
+            for razao in razoes:
+                casados = toks.intersection(razao)
+                cobertos |= casados
+                exatidao += max(razao[t] for t in casados)
+            cobertura = len(cobertos) / len(toks)
+            ranking.append((i, round(0.5 * cobertura + 0.5 * exatidao / len(razoes), 4)))
+        return ranking
+
+    def para_dict(self) -> dict:
+        return {"modelos": self.modelos, "tokens": self.tokens}
+
+    @classmethod
+    def de_dict(cls, dados: dict) -> "IndiceModelos":
+        return cls(dados["modelos"], dados["tokens"])
@@ -0,0 +1,101 @@
+import math
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+class Cadencia:
+    """Limita requisições simultâneas e impõe um intervalo mínimo entre o início de cada uma."""
+    def __init__(self, max_simultaneas: int = 4, intervalo_minimo: float = 0.0):
+        self.max_simultaneas = max(1, max_simultaneas)
+        self.intervalo_minimo = intervalo_minimo
+        self._semaforo = threading.BoundedSemaphore(self.max_simultaneas)
+        self._lock = threading.Lock()
+        self._proximo_inicio = 0.0
+
+    def __enter__(self):
+        self._semaforo.acquire()
+        with self._lock:
+            agora = time.monotonic()
+            inicio = max(agora, self._proximo_inicio)
+            self._proximo_inicio = inicio + self.intervalo_minimo
+        if inicio > agora:
+            time.sleep(inicio - agora)
+        return self
+
+    def __exit__(self, *exc):
+        self._semaforo.release()
+        return False
+
+class BaldeFichas:
+    """Token bucket adaptativo: ``taxa`` fichas/s com rajada de até ``capacidade`` requisições.
+
+    ``penalizar`` (429/5xx) corta pela metade o ritmo em vigor — o menor entre a taxa e o ritmo
+    observado nas últimas requisições, de modo que um balde sem limite (``taxa`` infinita) cai para
+    metade do que estava de fato usando — e pode segurar todo mundo por um tempo (Retry-After).
+    ``aliviar`` (sucesso) sobe a taxa 10% por vez até ``taxa_maxima`` (por padrão, a configurada);
+    sem teto, o limite é retirado quando passa a folgar o dobro do ritmo observado.
+    """
+    def __init__(self, taxa: float = 2.0, capacidade: float = 1.0, taxa_minima: float = 0.1,
+                 taxa_maxima: Optional[float] = None, janela: float = 10.0):
+        self.taxa_maxima = taxa if taxa_maxima is None else max(taxa, taxa_maxima)
+        self.taxa = taxa
+        self.capacidade = max(1.0, capacidade)
+        self.taxa_minima = min(taxa_minima, taxa)
+        self.janela = janela
+        self._fichas = self.capacidade
+        self._atualizado = time.monotonic()
+        self._pausa_ate = 0.0
+        self._inicios: deque = deque(maxlen=32)
+        self._lock = threading.Lock()
+
+    def _reabastecer(self, agora: float):
+        if math.isinf(self.taxa):
+            self._fichas = self.capacidade
+        else:
+            self._fichas = min(self.capacidade, self._fichas + (agora - self._atualizado) * self.taxa)
+        self._atualizado = agora
+
+    def _ritmo_observado(self, agora: float) -> Optional[float]:
+        """Requisições/s nas fichas entregues dentro da ``janela``; None sem nenhuma."""
+        while self._inicios and self._inicios[0] < agora - self.janela:
+            self._inicios.popleft()
+        if not self._inicios:
+            return None
+        return len(self._inicios) / max(agora - self._inicios[0], 1e-3)
+
+    def adquirir(self) -> float:
+        """Reserva uma ficha e dorme o necessário; devolve quantos segundos esperou."""
+        with self._lock:
+            agora = time.monotonic()
+            self._reabastecer(agora)
+            # Fichas negativas são reservas já feitas por outras threads: cada uma espera a sua vez
+            self._fichas -= 1
+            espera = -self._fichas / self.taxa if self._fichas < 0 else 0.0
+            espera = max(espera, self._pausa_ate - agora)
+            self._inicios.append(agora + max(espera, 0.0))
+        if espera > 0:
+            time.sleep(espera)
+        return max(espera, 0.0)
+
+    def penalizar(self, pausa: float = 0.0):
+        with self._lock:
+            agora = time.monotonic()
+            observado = self._ritmo_observado(agora)
+            ritmo = min(self.taxa, observado) if observado else self.taxa
+            # Sem limite e sem nada observado ainda, o primeiro bloqueio começa em 1 req/s
+            self.taxa = max(self.taxa_minima, 1.0 if math.isinf(ritmo) else ritmo / 2)
+            if self._fichas > self.capacidade:
+                self._fichas = self.capacidade
+            if pausa > 0:
+                self._pausa_ate = max(self._pausa_ate, agora + pausa)
+
+    def aliviar(self):
+        with self._lock:
+            if self.taxa >= self.taxa_maxima:
+                return
+            self.taxa = min(self.taxa_maxima, self.taxa + max(self.taxa_minima, self.taxa * 0.1))
+            if math.isinf(self.taxa_maxima):
+                observado = self._ritmo_observado(time.monotonic())
+                if observado is not None and self.taxa >= 2 * observado:
+                    self.taxa = self.taxa_maxima
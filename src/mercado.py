@@ -0,0 +1,305 @@
+"""Estatísticas de mercado a partir dos próprios anúncios raspados: distribuição de preço por
+(modelo, ano, UF), regressão de preço por km e posição de cada anúncio no seu grupo."""
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.indice_fipe import tokenizar
+from src.metricas import metricas
+from src.models import Anuncio, AnuncioLeve
+
+# Histograma de log(preço) por grupo: 256 faixas de ~3,4% entre R$ 1 mil e R$ 5 mi
+PRECO_MINIMO, PRECO_MAXIMO, N_FAIXAS = 1_000.0, 5_000_000.0, 256
+_BORDAS = np.linspace(np.log(PRECO_MINIMO), np.log(PRECO_MAXIMO), N_FAIXAS + 1)
+_LARGURA = _BORDAS[1] - _BORDAS[0]
+
+# Colunas dos momentos por grupo. y = log(preço) de todos os anúncios; o sufixo K é o subconjunto
+# com km informado (x = km em dezenas de milhar), que alimenta a regressão log(preço) ~ km
+N, MY, M2Y, NK, MKX, MKY, MKXX, MKXY, MKYY = range(9)
+
+def chave_modelo(texto: str) -> str:
+    return " ".join(tokenizar(texto))
+
+def _momentos(grupos: np.ndarray, x: np.ndarray, y: np.ndarray):
+    """Contagem, médias e somas de produtos centrados de cada grupo presente no lote."""
+    u, inv = np.unique(grupos, return_inverse=True)
+    n = np.bincount(inv).astype(np.float64)
+    mx = np.bincount(inv, x) / n
+    my = np.bincount(inv, y) / n
+    dx, dy = x - mx[inv], y - my[inv]
+    return u, n, mx, my, np.bincount(inv, dx * dx), np.bincount(inv, dx * dy), np.bincount(inv, dy * dy)
+
+class EstatisticasMercado:
+    """Distribuições de preço por (modelo, ano, UF), atualizadas de forma incremental.
+
+    Cada grupo guarda só momentos (contagem, médias, somas de quadrados e produtos cruzados) e um
+    histograma de log(preço); um lote novo é resumido com ``bincount`` e mesclado aos momentos
+    existentes (fórmula de Chan), então o custo de ``adicionar`` e ``pontuar`` depende do lote, não
+    do histórico. Os grupos existem em três níveis — (modelo, ano, UF), (modelo, ano) e (modelo) —
+    e a pontuação usa o mais específico com pelo menos ``min_amostras`` anúncios.
+
+    Cada listId entra uma vez por modelo: re-scans que trazem o mesmo anúncio não o contam de novo,
+    e um anúncio que mudou (preço, km...) tem a observação anterior retirada dos momentos antes de
+    a nova entrar. Com ``caminho``, o estado é lido de / gravado em SQLite (``salvar``).
+    """
+    def __init__(self, caminho: Optional[str] = None, min_amostras: int = 10):
+        self.caminho = caminho
+        self.min_amostras = min_amostras
+        self._lock = threading.Lock()
+        self._grupos: Dict[Tuple[str, int, str], int] = {}
+        self._chaves: List[Tuple[str, int, str]] = []
+        self._est = np.zeros((64, 9))
+        self._hist = np.zeros((64, N_FAIXAS), dtype=np.int64)
+        self._alterados = set()
+        # (modelo, listId) -> observação que está nas distribuições: (modelo, ano, UF, km, preço)
+        self._vistos: Dict[Tuple[str, str], tuple] = {}
+        self._vistos_alterados = set()
+        self._conn = None
+
+        if caminho:
+            pasta = os.path.dirname(caminho)
+            if pasta and not os.path.exists(pasta): os.makedirs(pasta)
+            self._conn = sqlite3.connect(caminho, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS grupos ("
+                " modelo TEXT NOT NULL, ano INTEGER NOT NULL, estado TEXT NOT NULL,"
+                " momentos BLOB NOT NULL, histograma BLOB NOT NULL, PRIMARY KEY (modelo, ano, estado))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS vistos ("
+                " modelo TEXT NOT NULL, id TEXT NOT NULL, ano INTEGER NOT NULL, estado TEXT NOT NULL,"
+                " km INTEGER NOT NULL, preco REAL NOT NULL, PRIMARY KEY (modelo, id))"
+            )
+            self._conn.commit()
+            for modelo, id_, ano, estado, km, preco in self._conn.execute("SELECT * FROM vistos"):
+                self._vistos[(modelo, id_)] = (modelo, ano, estado, km, preco)
+            for modelo, ano, estado, momentos, histograma in self._conn.execute("SELECT * FROM grupos"):
+                i = self._linha((modelo, ano, estado))
+                self._est[i] = np.frombuffer(momentos, dtype=np.float64)
+                self._hist[i] = np.frombuffer(histograma, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self._chaves)
+
+    def _linha(self, chave: Tuple[str, int, str]) -> int:
+        i = self._grupos.get(chave)
+        if i is None:
+            i = self._grupos[chave] = len(self._chaves)
+            self._chaves.append(chave)
+            if i == len(self._est):
+                self._est = np.concatenate([self._est, np.zeros_like(self._est)])
+                self._hist = np.concatenate([self._hist, np.zeros_like(self._hist)])
+        return i
+
+    @staticmethod
+    def _modelo(anuncio, modelo: Optional[str]) -> str:
+        if modelo:
+            return chave_modelo(modelo)
+        # Sem modelo explícito: o da página do anúncio (se enriquecido) ou marca + modelo do título
+        do_anuncio = anuncio.propriedades.get("vehicle_model")
+        return chave_modelo(do_anuncio) if do_anuncio else " ".join(tokenizar(anuncio.titulo)[:2])
+
+    def _observacao(self, anuncio, modelo: Optional[str]) -> tuple:
+        return (self._modelo(anuncio, modelo), anuncio.ano or 0, anuncio.estado or "", anuncio.km or 0, float(anuncio.preco))
+
+    def _colunas(self, observacoes: Sequence[tuple], criar: bool):
+        """Linhas dos três níveis de grupo (-1 = grupo inexistente), log(preço) e km de cada observação."""
+        n = len(observacoes)
+        linhas = np.full((n, 3), -1, dtype=np.int64)
+        for j, (m, ano, estado, _, _) in enumerate(observacoes):
+            for nivel, chave in enumerate(((m, ano, estado), (m, ano, ""), (m, 0, ""))):
+                i = self._linha(chave) if criar else self._grupos.get(chave)
+                if i is not None:
+                    linhas[j, nivel] = i
+        precos = np.fromiter((o[4] for o in observacoes), dtype=np.float64, count=n)
+        kms = np.fromiter((o[3] for o in observacoes), dtype=np.float64, count=n)
+        with np.errstate(divide="ignore"):
+            y = np.log(np.where(precos > 0, precos, np.nan))
+        return linhas, y, kms / 10_000, (precos >= PRECO_MINIMO) & (precos < PRECO_MAXIMO)
+
+    @staticmethod
+    def _mesclar(est: np.ndarray, u, n_b, mx_b, my_b, mxx_b, mxy_b, myy_b, cols):
+        """Junta os momentos de um lote aos do grupo (Chan et al.), só nas linhas ``u``."""
+        cn, cmx, cmy, cmxx, cmxy, cmyy = cols
+        n_a = est[u, cn]
+        n = n_a + n_b
+        dy = my_b - est[u, cmy]
+        f = n_a * n_b / n
+        if cmx is not None:
+            dx = mx_b - est[u, cmx]
+            est[u, cmxx] += mxx_b + dx * dx * f
+            est[u, cmxy] += mxy_b + dx * dy * f
+            est[u, cmx] += dx * n_b / n
+        est[u, cmyy] += myy_b + dy * dy * f
+        est[u, cmy] += dy * n_b / n
+        est[u, cn] = n
+
+    @staticmethod
+    def _retirar(est: np.ndarray, u, n_b, mx_b, my_b, mxx_b, mxy_b, myy_b, cols):
+        """Inverso de ``_mesclar``: tira dos grupos ``u`` os momentos de um lote que já estava neles."""
+        cn, cmx, cmy, cmxx, cmxy, cmyy = cols
+        n = est[u, cn]
+        n_a = n - n_b
+        resto = np.where(n_a > 0, n_a, 1)
+        my_a = (n * est[u, cmy] - n_b * my_b) / resto
+        dy = my_b - my_a
+        f = n_a * n_b / n
+        if cmx is not None:
+            mx_a = (n * est[u, cmx] - n_b * mx_b) / resto
+            dx = mx_b - mx_a
+            est[u, cmxx] = np.maximum(est[u, cmxx] - mxx_b - dx * dx * f, 0)
+            est[u, cmxy] -= mxy_b + dx * dy * f
+            est[u, cmx] = mx_a
+        est[u, cmyy] = np.maximum(est[u, cmyy] - myy_b - dy * dy * f, 0)
+        est[u, cmy] = my_a
+        est[u, cn] = n_a
+        vazios = u[n_a <= 0]
+        est[np.ix_(vazios, [c for c in cols if c is not None])] = 0
+
+    def _somar(self, observacoes: Sequence[tuple], retirar: bool = False) -> int:
+        linhas, y, x, validos = self._colunas(observacoes, criar=True)
+        if not validos.any():
+            return 0
+        linhas, y, x = linhas[validos], y[validos], x[validos]
+        faixas = np.clip(((y - _BORDAS[0]) / _LARGURA).astype(np.int64), 0, N_FAIXAS - 1)
+        com_km = x > 0
+        self._alterados.update(np.unique(linhas).tolist())
+        combinar = self._retirar if retirar else self._mesclar
+
+        for nivel in range(3):
+            g = linhas[:, nivel]
+            u, n_b, _, my_b, _, _, myy_b = _momentos(g, x, y)
+            combinar(self._est, u, n_b, None, my_b, None, None, myy_b, (N, None, MY, None, None, M2Y))
+            if com_km.any():
+                combinar(self._est, *_momentos(g[com_km], x[com_km], y[com_km]), (NK, MKX, MKY, MKXX, MKXY, MKYY))
+            celulas, contagem = np.unique(g * N_FAIXAS + faixas, return_counts=True)
+            self._hist.reshape(-1)[celulas] += -contagem if retirar else contagem
+        return int(validos.sum())
+
+    @metricas.cronometrado("mercado.adicionar")
+    def adicionar(self, anuncios: Sequence[Union[Anuncio, AnuncioLeve]], modelo: Optional[str] = None) -> int:
+        """Soma os anúncios às distribuições; ``modelo`` (ex.: o termo FIPE da consulta) vale para todos.
+        Preços fora de [PRECO_MINIMO, PRECO_MAXIMO) ficam de fora e listIds já contados com os mesmos
+        dados são ignorados. Devolve quantas observações entraram (novas ou substituídas)."""
+        if not anuncios:
+            return 0
+        with self._lock:
+            novas = {}
+            for a in anuncios:
+                observacao = self._observacao(a, modelo)
+                novas[(observacao[0], a.id)] = observacao
+            anteriores = []
+            for chave, observacao in list(novas.items()):
+                anterior = self._vistos.get(chave)
+                if anterior == observacao:
+                    del novas[chave]
+                elif anterior is not None:
+                    anteriores.append(anterior)
+            if anteriores:
+                self._somar(anteriores, retirar=True)
+            self._vistos.update(novas)
+            self._vistos_alterados.update(novas)
+            entraram = self._somar(list(novas.values()))
+        metricas.contar("mercado.observacoes", entraram)
+        metricas.contar("mercado.repetidos", len(anuncios) - len(novas))
+        return entraram
+
+    @metricas.cronometrado("mercado.pontuar")
+    def pontuar(self, anuncios: Sequence[Union[Anuncio, AnuncioLeve]], modelo: Optional[str] = None):
+        """Preenche ``percentil_mercado``, ``z_mercado`` e ``preco_esperado`` de cada anúncio contra o
+        grupo mais específico com amostras suficientes (anúncios sem grupo ficam com None).
+
+        ``preco_esperado`` vem da regressão log(preço) ~ km do grupo e ``z_mercado`` é o resíduo
+        padronizado dela; grupos sem variação de km usam a média e o desvio do log(preço).
+        """
+        if not anuncios:
+            return anuncios
+        with self._lock:
+            linhas, y, x, validos = self._colunas([self._observacao(a, modelo) for a in anuncios], criar=False)
+            est, hist = self._est, self._hist
+
+            # Nível mais específico com min_amostras
+            contagens = np.where(linhas >= 0, est[linhas, N], 0)
+            suficiente = contagens >= self.min_amostras
+            nivel = np.argmax(suficiente, axis=1)
+            com_grupo = suficiente.any(axis=1) & validos
+            linha = np.where(com_grupo, linhas[np.arange(len(anuncios)), nivel], 0)
+
+            e = est[linha]
+            n = e[:, N]
+            # Percentil: posição no histograma do grupo, interpolada dentro da faixa
+            faixas = np.clip(((np.nan_to_num(y) - _BORDAS[0]) / _LARGURA).astype(np.int64), 0, N_FAIXAS - 1)
+            u, inv = np.unique(linha, return_inverse=True)
+            acumulado = np.cumsum(hist[u], axis=1)
+            na_faixa = hist[u][inv, faixas]
+            fracao = np.clip((np.nan_to_num(y) - _BORDAS[faixas]) / _LARGURA, 0, 1)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                percentil = (acumulado[inv, faixas] - na_faixa + fracao * na_faixa) / n * 100
+
+                # Regressão log(preço) = a + b·km, ajustada pelos momentos do subconjunto com km
+                nk = e[:, NK]
+                regressao = (nk >= self.min_amostras) & (e[:, MKXX] > 0) & (x > 0)
+                b = np.where(regressao, e[:, MKXY] / e[:, MKXX], 0.0)
+                esperado = np.where(regressao, e[:, MKY] + b * (x - e[:, MKX]), e[:, MY])
+                var_residuo = np.where(regressao, (e[:, MKYY] - b * e[:, MKXY]) / (nk - 2), e[:, M2Y] / (n - 1))
+                z = (y - esperado) / np.sqrt(var_residuo)
+
+            percentil = np.round(percentil, 1).tolist()
+            z = np.round(np.where(np.isfinite(z), z, 0.0), 2).tolist()
+            esperado = np.round(np.exp(esperado), -2).tolist()
+            com_grupo = com_grupo.tolist()
+
+        for i, anuncio in enumerate(anuncios):
+            if com_grupo[i]:
+                anuncio.percentil_mercado, anuncio.z_mercado, anuncio.preco_esperado = percentil[i], z[i], esperado[i]
+                if percentil[i] <= 10:
+                    anuncio.tags = anuncio.tags + [f"📊 Entre os 10% mais baratos do mercado (P{percentil[i]:.0f})"]
+        return anuncios
+
+    def resumo(self, modelo: str, ano: int = 0, estado: str = "") -> Optional[dict]:
+        """Quantidade, mediana, quartis, P10/P90 e a variação de preço por 10 mil km de um grupo."""
+        with self._lock:
+            i = self._grupos.get((chave_modelo(modelo), ano or 0, estado or ""))
+            if i is None or not self._est[i, N]:
+                return None
+            e, h = self._est[i].copy(), self._hist[i].copy()
+
+        acumulado = np.cumsum(h)
+        def quantil(q: float) -> float:
+            alvo = q * acumulado[-1]
+            f = int(np.searchsorted(acumulado, alvo))
+            antes = acumulado[f - 1] if f else 0
+            return round(float(np.exp(_BORDAS[f] + (alvo - antes) / h[f] * _LARGURA)), -2)
+
+        b = e[MKXY] / e[MKXX] if e[NK] >= self.min_amostras and e[MKXX] > 0 else 0.0
+        return {
+            "anuncios": int(e[N]), "media_geometrica": round(float(np.exp(e[MY])), -2),
+            "p10": quantil(0.10), "p25": quantil(0.25), "mediana": quantil(0.5), "p75": quantil(0.75), "p90": quantil(0.90),
+            "variacao_por_10k_km": round(float(np.expm1(b)) * 100, 2),
+        }
+
+    def salvar(self):
+        """Grava os grupos alterados desde o último ``salvar``."""
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO grupos (modelo, ano, estado, momentos, histograma) VALUES (?, ?, ?, ?, ?)",
+                [(*self._chaves[i], self._est[i].tobytes(), self._hist[i].tobytes()) for i in self._alterados]
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO vistos (modelo, id, ano, estado, km, preco) VALUES (?, ?, ?, ?, ?, ?)",
+                [(chave[0], chave[1], *self._vistos[chave][1:]) for chave in self._vistos_alterados]
+            )
+            self._conn.commit()
+            self._alterados.clear()
+            self._vistos_alterados.clear()
+
+    def fechar(self):
+        self.salvar()
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
@@ -0,0 +1,173 @@
+"""Métricas de execução: tempos por etapa, requisições HTTP por endpoint, cache e erros engolidos.
+
+Todos os módulos registram no objeto global ``metricas``; o resumo sai ao fim de cada execução
+(``metricas.imprimir()``) e pode ser salvo em JSON. ``perfil()`` embrulha um trecho no cProfile.
+"""
+import cProfile
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Optional
+
+# Limites superiores dos baldes, em milissegundos (o último balde é "acima de 60 s")
+LIMITES_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+class Histograma:
+    """Histograma de latência com baldes fixos; percentis estimados pelo limite do balde."""
+    def __init__(self):
+        self.baldes = [0] * (len(LIMITES_MS) + 1)
+        self.contagem = 0
+        self.total = 0.0
+        self.minimo = float("inf")
+        self.maximo = 0.0
+
+    def registrar(self, ms: float):
+        self.baldes[bisect_left(LIMITES_MS, ms)] += 1
+        self.contagem += 1
+        self.total += ms
+        self.minimo = min(self.minimo, ms)
+        self.maximo = max(self.maximo, ms)
+
+    def percentil(self, p: float) -> float:
+        if not self.contagem:
+            return 0.0
+        alvo = p / 100 * self.contagem
+        acumulado = 0
+        for i, n in enumerate(self.baldes):
+            acumulado += n
+            if acumulado >= alvo:
+                return round(min(LIMITES_MS[i], self.maximo) if i < len(LIMITES_MS) else self.maximo, 2)
+        return round(self.maximo, 2)
+
+    def resumo(self) -> dict:
+        return {
+            "n": self.contagem,
+            "total_ms": round(self.total, 2),
+            "media_ms": round(self.total / self.contagem, 2) if self.contagem else 0.0,
+            "min_ms": round(self.minimo, 2) if self.contagem else 0.0,
+            "p50_ms": self.percentil(50),
+            "p95_ms": self.percentil(95),
+            "max_ms": round(self.maximo, 2),
+            "baldes": {(f"<={l}" if i < len(LIMITES_MS) else f">{LIMITES_MS[-1]}"): n
+                       for i, (l, n) in enumerate(zip(LIMITES_MS + (None,), self.baldes)) if n},
+        }
+
+class Metricas:
+    """Registro thread-safe. Com ``ativo=False`` todas as chamadas viram no-op."""
+    def __init__(self, ativo: bool = True):
+        self.ativo = ativo
+        self._lock = threading.Lock()
+        self.zerar()
+
+    def zerar(self):
+        with self._lock:
+            self.tempos: Dict[str, Histograma] = {}
+            self.http: Dict[str, dict] = {}
+            self.contadores: Dict[str, int] = {}
+            self.erros: Dict[str, int] = {}
+            self.inicio = time.time()
+
+    def tempo(self, etapa: str, segundos: float):
+        if not self.ativo: return
+        with self._lock:
+            self.tempos.setdefault(etapa, Histograma()).registrar(segundos * 1000)
+
+    @contextmanager
+    def etapa(self, nome: str):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.tempo(nome, time.perf_counter() - inicio)
+
+    def cronometrado(self, nome: str):
+        """Decorador: registra a duração de cada chamada da função na etapa ``nome``."""
+        def decorador(funcao):
+            @wraps(funcao)
+            def embrulho(*args, **kwargs):
+                with self.etapa(nome):
+                    return funcao(*args, **kwargs)
+            return embrulho
+        return decorador
+
+    def requisicao(self, endpoint: str, status: Optional[int], n_bytes: int, segundos: float):
+        if not self.ativo: return
+        with self._lock:
+            r = self.http.setdefault(endpoint, {"requisicoes": 0, "bytes": 0, "status": {}})
+            r["requisicoes"] += 1
+            r["bytes"] += n_bytes
+            r["status"][str(status)] = r["status"].get(str(status), 0) + 1
+            self.tempos.setdefault(f"http.{endpoint}", Histograma()).registrar(segundos * 1000)
+
+    def contar(self, nome: str, n: int = 1):
+        if not self.ativo: return
+        with self._lock:
+            self.contadores[nome] = self.contadores.get(nome, 0) + n
+
+    def erro(self, origem: str):
+        """Conta um erro tratado silenciosamente (os ``except`` que só seguem em frente)."""
+        if not self.ativo: return
+        with self._lock:
+            self.erros[origem] = self.erros.get(origem, 0) + 1
+
+    def resumo(self) -> dict:
+        with self._lock:
+            contadores = dict(self.contadores)
+            # Taxas de acerto derivadas de pares <prefixo>.hit / <prefixo>.miss
+            taxas = {}
+            for prefixo in {n.rsplit(".", 1)[0] for n in contadores if n.endswith((".hit", ".miss"))}:
+                hits = contadores.get(prefixo + ".hit", 0)
+                total = hits + contadores.get(prefixo + ".miss", 0)
+                taxas[prefixo] = round(hits / total, 4) if total else 0.0
+            return {
+                "duracao_s": round(time.time() - self.inicio, 3),
+                "etapas": {nome: h.resumo() for nome, h in sorted(self.tempos.items())},
+                "http": {nome: {**r, "status": dict(r["status"])} for nome, r in sorted(self.http.items())},
+                "contadores": contadores,
+                "taxa_acerto": taxas,
+                "erros": dict(self.erros),
+            }
+
+    def imprimir(self):
+        r = self.resumo()
+        print(f"\n⏱️ Métricas ({r['duracao_s']:.1f} s)")
+        for nome, h in r["etapas"].items():
+            print(f"   {nome:<28} n={h['n']:<6} média={h['media_ms']:>9.1f} ms  p95≤{h['p95_ms']:>7} ms  máx={h['max_ms']:>9.1f} ms")
+        for nome, h in r["http"].items():
+            print(f"   🌐 {nome:<25} {h['requisicoes']} req, {h['bytes'] / 1024:.0f} KB, status {h['status']}")
+        for nome, taxa in r["taxa_acerto"].items():
+            print(f"   💾 {nome:<25} acerto {taxa:.0%}")
+        for nome, n in r["erros"].items():
+            print(f"   ⚠️ {nome:<25} {n} erros ignorados")
+
+    def salvar_json(self, caminho: str) -> str:
+        pasta = os.path.dirname(caminho)
+        if pasta and not os.path.exists(pasta): os.makedirs(pasta)
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(self.resumo(), f, indent=2, ensure_ascii=False)
+        return caminho
+
+metricas = Metricas()
+
+@contextmanager
+def perfil(caminho: Optional[str]):
+    """Roda o bloco sob cProfile e grava as estatísticas (abrir com ``python -m pstats`` ou snakeviz).
+
+    O cProfile só enxerga a thread que chamou; para perfilar a coleta inteira, rode com uma página por vez.
+    """
+    if not caminho:
+        yield
+        return
+    pasta = os.path.dirname(caminho)
+    if pasta and not os.path.exists(pasta): os.makedirs(pasta)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(caminho)
@@ -1,6 +1,16 @@
-from typing import List, Optional
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field, field_validator
 
+def limpar_preco(v) -> float:
+    if isinstance(v, (int, float)):
+        return v
+    if isinstance(v, str):
+        clean_value = v.replace("R$", "").replace(".", "").replace(",", ".").strip()
+        return float(clean_value) if clean_value else 0.0
+    return 0.0
+
 class Anuncio(BaseModel):
     id: str = Field(alias="listId")
     titulo: str = Field(alias="subject")
@@ -14,20 +24,114 @@ class Anuncio(BaseModel):
     link: str = Field(alias="url", default="")
     imagem: Optional[str] = Field(default=None)
     data_publicacao: Optional[str] = Field(alias="listTime", default=None)
+    # Preenchidos só pelo enriquecimento (página do anúncio); None = ainda não enriquecido
+    descricao: Optional[str] = Field(default=None)
+    propriedades: Dict[str, str] = Field(default_factory=dict)
     
     tags: List[str] = Field(default_factory=list)
     score_preco: str = Field(default="Neutro")
     km_anual: int = Field(default=0)
+    # Posição no grupo (modelo, ano, UF) das EstatisticasMercado; None = sem grupo com amostras suficientes
+    percentil_mercado: Optional[float] = Field(default=None)
+    z_mercado: Optional[float] = Field(default=None)
+    preco_esperado: Optional[float] = Field(default=None)
+    # Outras cópias do mesmo carro (outros listIds) agrupadas neste anúncio pelo IndiceDuplicados
+    duplicados: int = Field(default=0)
 
     @field_validator('preco', mode='before')
     def limpar_preco(cls, v):
-        if isinstance(v, (int, float)):
-            return v
-        if isinstance(v, str):
-            clean_value = v.replace("R$", "").replace(".", "").replace(",", ".").strip()
-            return float(clean_value) if clean_value else 0.0
-        return 0.0
+        return limpar_preco(v)
 
     class Config:
         populate_by_name = True
-        extra = "ignore"
\ No newline at end of file
+        extra = "ignore"
+
+
+CAMPOS_ANUNCIO = tuple(Anuncio.model_fields)
+
+
+@dataclass(slots=True)
+class AnuncioLeve:
+    """Gêmeo de Anuncio com __slots__ e sem validação, para ingestão em massa de dados já normalizados.
+
+    Tem os mesmos campos (pelos nomes, não aliases) e serve ao analisador e aos exportadores;
+    a conversão validada acontece só nas bordas, via ``para_anuncio``.
+    """
+    id: str
+    titulo: str
+    preco: float = 0.0
+    ano: Optional[int] = None
+    km: Optional[int] = None
+    cambio: Optional[str] = "N/A"
+    combustivel: Optional[str] = "N/A"
+    cidade: str = ""
+    estado: str = ""
+    link: str = ""
+    imagem: Optional[str] = None
+    data_publicacao: Optional[str] = None
+    descricao: Optional[str] = None
+    propriedades: Dict[str, str] = field(default_factory=dict)
+    tags: List[str] = field(default_factory=list)
+    score_preco: str = "Neutro"
+    km_anual: int = 0
+    percentil_mercado: Optional[float] = None
+    z_mercado: Optional[float] = None
+    preco_esperado: Optional[float] = None
+    duplicados: int = 0
+
+    @classmethod
+    def de_anuncio(cls, anuncio: Anuncio) -> "AnuncioLeve":
+        leve = cls(**{c: getattr(anuncio, c) for c in CAMPOS_ANUNCIO})
+        leve.tags = list(leve.tags)
+        leve.propriedades = dict(leve.propriedades)
+        return leve
+
+    def para_anuncio(self) -> Anuncio:
+        return Anuncio(**{c: getattr(self, c) for c in CAMPOS_ANUNCIO})
+
+class Consulta(BaseModel):
+    """Parâmetros de uma busca completa (OLX + FIPE), usados pelo pipeline headless."""
+    termo: str
+    termo_fipe: Optional[str] = None
+    paginas: int = 1
+    min_price: Optional[int] = None
+    max_price: Optional[int] = None
+    min_year: Optional[int] = None
+    max_year: Optional[int] = None
+    estado: Optional[str] = None
+    detalhes: bool = False
+
+    @property
+    def nome(self) -> str:
+        partes = [self.estado or "BR", self.termo, str(self.min_year or "")]
+        return "_".join(p.replace(" ", "-") for p in partes if p)
+
+
+class BuscaVigiada(Consulta):
+    """Consulta salva do modo vigia: reexecutada a cada ``intervalo`` segundos (± ``jitter``, fração)."""
+    intervalo: float = 600.0
+    jitter: float = 0.2
+
+
+class ResultadoConsulta(BaseModel):
+    consulta: Consulta
+    fipe_valor: float = 0.0
+    fipe_msg: str = ""
+    fipe_por_ano: Dict[int, float] = Field(default_factory=dict)
+    # Nota (0-1) da versão FIPE escolhida para o termo; None = FIPE não consultada
+    fipe_confianca: Optional[float] = None
+    # Explicação da escolha quando a confiança é baixa (ver PlanoFipe.aviso)
+    fipe_aviso: Optional[str] = None
+    anuncios: List[Anuncio] = Field(default_factory=list)
+    novos: int = 0
+    ids_novos: List[str] = Field(default_factory=list)
+    # Anúncios da busca que o armazém já tinha antes desta execução (0 sem armazém)
+    conhecidos: int = 0
+    erro: Optional[str] = None
+
+
+class Alerta(BaseModel):
+    busca: str
+    anuncio: Anuncio
+    fipe_valor: float = 0.0
+    emitido_em: datetime = Field(default_factory=datetime.now)
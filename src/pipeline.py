@@ -0,0 +1,189 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Iterable, List, Optional, Type
+
+from src.analyser import AnalisadorVeiculo
+from src.armazem import ArmazemAnuncios
+from src.detalhes import EnriquecedorAnuncios
+from src.duplicados import IndiceDuplicados
+from src.fipe import ConsultorFipe
+from src.mercado import EstatisticasMercado
+from src.metricas import metricas
+from src.models import Anuncio, Consulta, ResultadoConsulta
+from src.scraper import OLXScraper
+from src.varredura import Varredura
+
+def ordenar_por_score(anuncios: List[Anuncio]) -> List[Anuncio]:
+    return sorted(anuncios, key=lambda x: (x.score_preco != "Excelente", x.score_preco != "Bom"))
+
+def executar_consulta(consulta: Consulta, scraper: Optional[OLXScraper] = None,
+                      consultor: Optional[ConsultorFipe] = None,
+                      armazem: Optional[ArmazemAnuncios] = None,
+                      enriquecedor: Optional[EnriquecedorAnuncios] = None,
+                      paginas: Optional[Iterable[List[Anuncio]]] = None,
+                      mercado: Optional[EstatisticasMercado] = None,
+                      duplicados: Optional[IndiceDuplicados] = None) -> ResultadoConsulta:
+    """Roda OLX -> FIPE -> análise para uma consulta. Não depende de Tk.
+
+    Com ``armazem``, a busca é incremental: a paginação para na primeira página só de anúncios
+    conhecidos e apenas os novos (ou com preço alterado) passam pela FIPE e pelo analisador.
+    Com ``enriquecedor`` (ou ``consulta.detalhes``), os anúncios novos ganham a descrição completa
+    antes da análise; sem ``enriquecedor``, um é aberto só para esta consulta e fechado no fim. ``paginas`` substitui a busca simples por outra fonte de lotes (ex.: varredura).
+    Com ``mercado``, os novos entram nas distribuições de preço e todos recebem percentil e z-score.
+    Com ``duplicados``, cópias do mesmo carro viram um anúncio só (com a contagem) antes da análise.
+    """
+    scraper = scraper or OLXScraper(max_paralelo=4)
+    consultor = consultor or ConsultorFipe()
+    resultado = ResultadoConsulta(consulta=consulta)
+    proprio = None
+    if enriquecedor is None and consulta.detalhes:
+        enriquecedor = proprio = EnriquecedorAnuncios(scraper)
+
+    inicio = time.perf_counter()
+    try:
+        novos, inalterados, conhecidos = [], [], set()
+        if paginas is None:
+            paginas = scraper.iterar_paginas(consulta.termo, consulta.paginas, consulta.min_price, consulta.max_price,
+                                             consulta.min_year, consulta.max_year, consulta.estado,
+                                             parar_quando=armazem.todos_conhecidos if armazem is not None else None)
+        with metricas.etapa("pipeline.olx"):
+            for pagina in paginas:
+                if armazem is not None:
+                    n, i = armazem.classificar(pagina, conhecidos)
+                    novos.extend(n)
+                    inalterados.extend(i)
+                else:
+                    novos.extend(pagina)
+
+        copias = []
+        if duplicados is not None:
+            novos, copias = duplicados.colapsar(novos)
+
+        if novos and enriquecedor is not None:
+            enriquecedor.enriquecer(novos)
+
+        # Um único plano FIPE precifica, de uma vez, todos os anos-modelo presentes nos anúncios
+        anos = {a.ano for a in novos if a.ano}
+        if consulta.min_year and novos:
+            anos.add(consulta.min_year)
+        if anos:
+            with metricas.etapa("pipeline.fipe"):
+                plano = consultor.planejar(consulta.termo_fipe or consulta.termo)
+                precos = plano.precos(anos)
+            resultado.fipe_confianca = plano.confianca
+            resultado.fipe_aviso = plano.aviso()
+            resultado.fipe_por_ano = {ano: valor for ano, (valor, _) in precos.items() if valor > 0}
+
+        if not consulta.min_year:
+            resultado.fipe_msg = "Ano não informado."
+        elif novos:
+            resultado.fipe_valor, resultado.fipe_msg = precos[consulta.min_year]
+        else:
+            resultado.fipe_msg = "Nenhum anúncio novo; FIPE não consultada."
+
+        if scraper.acervo is not None and novos:
+            # Guarda as referências usadas, para o reprocessamento do acervo reanalisar offline
+            scraper.acervo.anotar_fipe(consulta.termo, resultado.fipe_valor, resultado.fipe_por_ano)
+
+        analisador = AnalisadorVeiculo(fipe_referencia=resultado.fipe_valor, fipe_por_ano=resultado.fipe_por_ano)
+        analisador.analisar_lote(novos)
+
+        anteriores = []
+        if armazem is not None:
+            # As cópias descartadas também entram no armazém; senão voltariam como novas a cada re-scan
+            # (e a paginação incremental nunca pararia)
+            analisador.analisar_lote(copias)
+            with metricas.etapa("pipeline.armazem"):
+                armazem.registrar(novos + copias)
+                armazem.tocar([a.id for a in inalterados])
+                anteriores = armazem.carregar([a.id for a in inalterados])
+
+        todos = novos + anteriores
+        if duplicados is not None and anteriores:
+            # Cópia nova de um carro que já estava no armazém: fica só uma das duas
+            todos, _ = duplicados.colapsar(todos)
+        if mercado is not None:
+            modelo = consulta.termo_fipe or consulta.termo
+            with metricas.etapa("pipeline.mercado"):
+                mercado.adicionar(novos, modelo)
+                mercado.pontuar(todos, modelo)
+
+        resultado.novos = len(novos)
+        resultado.conhecidos = len(conhecidos)
+        resultado.ids_novos = [a.id for a in novos]
+        resultado.anuncios = ordenar_por_score(todos)
+        metricas.contar("pipeline.anuncios", len(resultado.anuncios))
+    except Exception as e:
+        metricas.erro("pipeline.consulta")
+        resultado.erro = str(e)
+    finally:
+        if proprio is not None:
+            proprio.fechar()
+
+    metricas.tempo("pipeline.consulta", time.perf_counter() - inicio)
+    return resultado
+
+def executar_lote(consultas: Iterable[Consulta], workers: int = 4, pasta_saida: Optional[str] = "data/lote",
+                  scraper: Optional[OLXScraper] = None, consultor: Optional[ConsultorFipe] = None,
+                  armazem: Optional[ArmazemAnuncios] = None,
+                  enriquecedor: Optional[EnriquecedorAnuncios] = None,
+                  mercado: Optional[EstatisticasMercado] = None,
+                  duplicados: Optional[IndiceDuplicados] = None) -> List[ResultadoConsulta]:
+    """Executa várias consultas em paralelo, compartilhando o cache FIPE, as sessões HTTP e o
+    enriquecedor (um só para o lote quando alguma consulta pede ``detalhes``)."""
+    scraper = scraper or OLXScraper(max_paralelo=4)
+    consultor = consultor or ConsultorFipe()
+    consultas = list(consultas)
+    proprio = None
+    if enriquecedor is None and any(c.detalhes for c in consultas):
+        enriquecedor = proprio = EnriquecedorAnuncios(scraper)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            # O enriquecedor aberto aqui só atende as consultas que pediram detalhes
+            resultados = list(pool.map(lambda c: executar_consulta(c, scraper, consultor, armazem,
+                                                                     enriquecedor if c.detalhes or proprio is None else None,
+                                                                     mercado=mercado, duplicados=duplicados),
+                                      consultas))
+    finally:
+        if proprio is not None:
+            proprio.fechar()
+
+    if pasta_saida:
+        for resultado in resultados:
+            salvar_resultado(resultado, pasta_saida)
+    return resultados
+
+def executar_varredura(consulta: Consulta, scraper: Optional[OLXScraper] = None,
+                       consultor: Optional[ConsultorFipe] = None, armazem: Optional[ArmazemAnuncios] = None,
+                       enriquecedor: Optional[EnriquecedorAnuncios] = None,
+                       varredura: Optional[Varredura] = None,
+                       mercado: Optional[EstatisticasMercado] = None,
+                       duplicados: Optional[IndiceDuplicados] = None) -> ResultadoConsulta:
+    """``executar_consulta`` sobre todas as UFs: as fatias da varredura viram um único resultado."""
+    scraper = scraper or OLXScraper(max_paralelo=2)
+    varredura = varredura or Varredura(scraper)
+    consulta = consulta.model_copy(update={"estado": None})
+    return executar_consulta(consulta, scraper, consultor, armazem, enriquecedor, paginas=varredura.paginas(consulta),
+                             mercado=mercado, duplicados=duplicados)
+
+def salvar_resultado(resultado: ResultadoConsulta, pasta: str = "data/lote") -> str:
+    if not os.path.exists(pasta): os.makedirs(pasta)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M")
+    caminho = os.path.join(pasta, f"analise_{resultado.consulta.nome}_{timestamp}.json")
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write(resultado.model_dump_json(indent=2))
+    return caminho
+
+def ler_consultas(caminho: str, modelo: Type[Consulta] = Consulta) -> List[Consulta]:
+    """Lê um arquivo de lote: JSON Lines (uma consulta por linha) ou CSV com cabeçalho."""
+    with open(caminho, encoding="utf-8") as f:
+        if caminho.lower().endswith(".csv"):
+            linhas = [{k: v for k, v in row.items() if v not in (None, "")} for row in csv.DictReader(f)]
+        else:
+            linhas = [json.loads(l) for l in f if l.strip()]
+    return [modelo(**linha) for linha in linhas]
@@ -1,109 +1,394 @@
 import json
-from typing import List, Optional
+import random
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Iterator, List, Optional, Sequence, Union
 from curl_cffi import requests
-from bs4 import BeautifulSoup
-from src.models import Anuncio
+from src.acervo import AcervoPaginas
+from src.limitador import BaldeFichas, Cadencia
+from src.metricas import metricas
+from src.models import Anuncio, AnuncioLeve, limpar_preco
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+_RE_NEXT_DATA = re.compile(r'<script\b[^>]*\bid\s*=\s*["\']?__NEXT_DATA__["\']?[^>]*>(.*?)</script\s*>', re.S | re.I)
+_RE_NEXT_DATA_BYTES = re.compile(_RE_NEXT_DATA.pattern.encode(), re.S | re.I)
+
+def extrair_next_data(html: Union[str, bytes]) -> Optional[dict]:
+    """Localiza o JSON de <script id="__NEXT_DATA__"> por varredura direta, sem montar a árvore HTML."""
+    if isinstance(html, bytes):
+        marcador, fim_abertura, fim_tag, regex = b'id="__NEXT_DATA__"', b">", b"</script>", _RE_NEXT_DATA_BYTES
+    else:
+        marcador, fim_abertura, fim_tag, regex = 'id="__NEXT_DATA__"', ">", "</script>", _RE_NEXT_DATA
+
+    payload = None
+    inicio = html.find(marcador)
+    if inicio != -1:
+        abre = html.find(fim_abertura, inicio)
+        fecha = html.find(fim_tag, abre)
+        if abre != -1 and fecha != -1:
+            payload = html[abre + 1:fecha]
+
+    if payload is None:
+        # Atributos fora do formato usual (aspas simples, espaços, maiúsculas)
+        m = regex.search(html)
+        if not m: return None
+        payload = m.group(1)
+
+    try:
+        return _json_loads(payload)
+    except ValueError:
+        return None
+
+def extrair_next_data_soup(html: Union[str, bytes]) -> Optional[dict]:
+    from bs4 import BeautifulSoup  # só o caminho lento usa; fica fora da inicialização
+
+    soup = BeautifulSoup(html, 'html.parser')
+    script = soup.find("script", {"id": "__NEXT_DATA__"})
+    if not script: return None
+    return json.loads(script.string)
+
+def extrair_anuncios(html: Union[str, bytes], rapido: bool = True,
+                     validar: bool = True) -> tuple[List[Union[Anuncio, AnuncioLeve]], Optional[int]]:
+    """Anúncios de uma página de busca e o ``totalOfAds`` informado pela OLX (None quando não vem).
+    Não depende do ``OLXScraper``: o reprocessamento do acervo chama direto."""
+    try:
+        data = extrair_next_data(html) if rapido else None
+        if data is None:
+            # Caminho lento: árvore completa do BeautifulSoup, só quando a varredura direta falha
+            metricas.contar("olx.next_data_soup")
+            data = extrair_next_data_soup(html)
+        if data is None: return [], None
+
+        try:
+            page_props = data["props"]["pageProps"]
+            ads_list = page_props["ads"]
+        except KeyError:
+            return [], None
+        total = page_props.get("totalOfAds")
+        total = total if isinstance(total, int) else None
+
+        resultados = []
+        for item in ads_list:
+            if not isinstance(item, dict) or "subject" not in item:
+                continue
+
+            try:
+                props_raw = item.get("properties") or []
+                mapa_props = {p.get("name"): p.get("value") for p in props_raw if isinstance(p, dict)}
+
+                imgs = item.get("images")
+                img_url = imgs[0].get("url") if (isinstance(imgs, list) and len(imgs) > 0) else None
+
+                loc = item.get("location", {})
+                cidade = loc.get("municipality", "")
+                estado = loc.get("uf", "")
+                
+                if not cidade:
+                    loc_det = item.get("locationDetails", {})
+                    cidade = loc_det.get("municipality", "")
+                    estado = loc_det.get("uf", "")
+
+                # Sem validação, o preço é normalizado aqui e o anúncio vira um AnuncioLeve (ingestão em massa)
+                fabrica = Anuncio if validar else AnuncioLeve
+                anuncio = fabrica(
+                    id=str(item.get("listId", "")),
+                    titulo=item.get("subject", ""),
+                    preco=item.get("price", "0") if validar else float(limpar_preco(item.get("price", "0"))),
+                    ano=int(mapa_props.get("regdate", 0)), 
+                    km=int(mapa_props.get("mileage", 0)),
+                    cambio=mapa_props.get("gearbox", "N/A"),
+                    combustivel=mapa_props.get("fuel", "N/A"),
+                    cidade=cidade,
+                    estado=estado,
+                    link=item.get("url", ""),
+                    imagem=img_url,
+                    data_publicacao=item.get("listTime", "")
+                )
+                resultados.append(anuncio)
+            except Exception:
+                metricas.erro("olx.anuncio_invalido")
+                continue
+        return resultados, total
+    except Exception:
+        metricas.erro("olx.parse_pagina")
+        return [], None
+
+# Perfis de TLS/HTTP2 do curl_cffi usados em rodízio quando a OLX devolve uma página de desafio
+PERFIS_IMPERSONATE = ("chrome120", "chrome124", "chrome131", "edge101", "safari17_0", "firefox133")
+_MARCADORES_DESAFIO = (b"challenge-platform", b"cf-chl", b"Just a moment", b"px-captcha",
+                       b"captcha-delivery", b"Access Denied", b"Attention Required")
+
+def eh_desafio(status: int, conteudo: bytes) -> bool:
+    """Página de bloqueio/captcha (403, ou 200/503 sem __NEXT_DATA__ e com marcador de desafio)."""
+    if status == 403:
+        return True
+    if status in (200, 503) and b"__NEXT_DATA__" not in conteudo:
+        trecho = conteudo[:20000]
+        return any(m in trecho for m in _MARCADORES_DESAFIO)
+    return False
+
+def retry_after(valor: Optional[str]) -> Optional[float]:
+    """Segundos pedidos pelo cabeçalho Retry-After (número ou data HTTP)."""
+    if not valor:
+        return None
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(valor) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
 
 class OLXScraper:
-    def __init__(self):
+    def __init__(self, max_paralelo: int = 1, intervalo_minimo: float = 0.5,
+                 impersonate: str = "chrome120", timeout: float = 15,
+                 base_url: str = "https://www.olx.com.br/autos-e-pecas/carros-vans-e-utilitarios",
+                 rajada: int = 1, max_tentativas: int = 4, backoff_base: float = 1.0, backoff_teto: float = 60.0,
+                 perfis: Sequence[str] = PERFIS_IMPERSONATE, acervo: Optional[AcervoPaginas] = None):
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
             "Referer": "https://www.olx.com.br/"
         }
+        self.base_url = base_url
+        self.max_paralelo = max(1, max_paralelo)
+        self.timeout = timeout
+        self.impersonate = impersonate
+        self.cadencia = Cadencia(max_simultaneas=self.max_paralelo)
+        # Ritmo médio de 1/intervalo_minimo req/s, com rajadas de até ``rajada``; em 429/5xx cai para metade
+        # do ritmo observado e volta a subir com os sucessos até o teto configurado (sem teto se intervalo 0)
+        taxa = 1 / intervalo_minimo if intervalo_minimo > 0 else float("inf")
+        self.balde = BaldeFichas(taxa=taxa, capacidade=rajada, taxa_maxima=taxa)
+        self.max_tentativas = max_tentativas
+        self.backoff_base = backoff_base
+        self.backoff_teto = backoff_teto
+        # Com acervo, cada página de busca recebida é arquivada antes do parse (ver src.acervo)
+        self.acervo = acervo
+
+        # Sessão compartilhada: cada thread reaproveita o próprio handle curl (conexões keep-alive)
+        self.session = requests.Session(impersonate=impersonate, headers=self.headers)
+        self.perfis = [impersonate] + [p for p in perfis if p != impersonate]
+        self._perfil = 0
+        self._sessoes = {impersonate: self.session}
+        self._lock = threading.Lock()
+        self.estatisticas = {"requisicoes": 0, "retentativas": 0, "limitadas_429": 0, "erros_5xx": 0,
+                             "desafios": 0, "rotacoes": 0, "falhas_conexao": 0, "erros_http": 0,
+                             "paradas": 0, "espera_s": 0.0}
 
     def buscar(self, termo: str, paginas: int = 1, 
                min_price: Optional[int] = None, max_price: Optional[int] = None,
                min_year: Optional[int] = None, max_year: Optional[int] = None,
-               estado: Optional[str] = None) -> List[Anuncio]:
-        
-        todos_anuncios = []
-        base_url = "https://www.olx.com.br/autos-e-pecas/carros-vans-e-utilitarios"
+               estado: Optional[str] = None,
+               parar_quando: Optional[Callable[[List[Anuncio]], bool]] = None) -> List[Anuncio]:
+        return list(self.buscar_stream(termo, paginas, min_price, max_price, min_year, max_year, estado, parar_quando))
+
+    def buscar_stream(self, termo: str, paginas: int = 1,
+                      min_price: Optional[int] = None, max_price: Optional[int] = None,
+                      min_year: Optional[int] = None, max_year: Optional[int] = None,
+                      estado: Optional[str] = None,
+                      parar_quando: Optional[Callable[[List[Anuncio]], bool]] = None) -> Iterator[Anuncio]:
+        for novos in self.iterar_paginas(termo, paginas, min_price, max_price, min_year, max_year, estado, parar_quando):
+            yield from novos
+
+    def iterar_paginas(self, termo: str, paginas: int = 1,
+                       min_price: Optional[int] = None, max_price: Optional[int] = None,
+                       min_year: Optional[int] = None, max_year: Optional[int] = None,
+                       estado: Optional[str] = None,
+                       parar_quando: Optional[Callable[[List[Anuncio]], bool]] = None,
+                       totais: Optional[dict] = None, primeira: int = 1) -> Iterator[List[Anuncio]]:
+        """Entrega os anúncios das páginas ``primeira``..``paginas``, em ordem e sem listIds repetidos,
+        assim que cada uma chega.
+
+        ``parar_quando(pagina)`` permite encerrar a paginação depois de uma página (ex.: já toda conhecida).
+        Com ``totais``, cada página recebida grava ali ``{pagina: totalOfAds}`` antes de ``parar_quando``.
+        """
+        base_url = self.base_url
         
         if estado and len(estado) == 2 and estado.upper() != "BR":
             base_url = f"{base_url}/estado-{estado.lower()}"
 
-        print(f"🌍 Região da busca: {estado if estado else 'Brasil'}")
+        params = {"q": termo}
+        if min_price: params["ps"] = min_price
+        if max_price: params["pe"] = max_price
+        if min_year:  params["rs"] = min_year
+        if max_year:  params["re"] = max_year
+
+        if self.max_paralelo > 1 and paginas > primeira:
+            resultados = self._buscar_paralelo(base_url, params, termo, paginas, parar_quando, totais, primeira)
+        else:
+            resultados = self._buscar_serial(base_url, params, termo, paginas, parar_quando, totais, primeira)
+
+        vistos = set()
+        for novos in resultados:
+            unicos = []
+            for anuncio in novos:
+                if anuncio.id not in vistos:
+                    vistos.add(anuncio.id)
+                    unicos.append(anuncio)
+            if unicos:
+                yield unicos
+
+    def _buscar_serial(self, base_url: str, params: dict, termo: str, paginas: int,
+                       parar_quando: Optional[Callable] = None, totais: Optional[dict] = None,
+                       primeira: int = 1) -> Iterator[List[Anuncio]]:
+        for page in range(primeira, paginas + 1):
+            novos, continuar = self._buscar_pagina(base_url, params, termo, page, parar_quando, totais)
+            yield novos
+            if not continuar:
+                break
+
+    def _buscar_paralelo(self, base_url: str, params: dict, termo: str, paginas: int,
+                         parar_quando: Optional[Callable] = None, totais: Optional[dict] = None,
+                         primeira: int = 1) -> Iterator[List[Anuncio]]:
+        por_pagina = {}
+        ultima_pagina = paginas
+        proxima = primeira
+        proxima_entrega = primeira
+
+        with ThreadPoolExecutor(max_workers=self.max_paralelo) as pool:
+            pendentes = {}
+            while proxima <= ultima_pagina and len(pendentes) < self.max_paralelo:
+                pendentes[pool.submit(self._buscar_pagina, base_url, params, termo, proxima, parar_quando, totais)] = proxima
+                proxima += 1
+
+            while pendentes:
+                prontos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+                for fut in prontos:
+                    page = pendentes.pop(fut)
+                    novos, continuar = fut.result()
+                    por_pagina[page] = novos
+                    if not continuar:
+                        # Mesma regra do modo serial: nada depois de uma página vazia, com erro HTTP ou de parada
+                        ultima_pagina = min(ultima_pagina, page)
+
+                while proxima <= ultima_pagina and len(pendentes) < self.max_paralelo:
+                    pendentes[pool.submit(self._buscar_pagina, base_url, params, termo, proxima, parar_quando, totais)] = proxima
+                    proxima += 1
+
+                # Entrega em ordem: só libera a página N quando todas as anteriores chegaram
+                while proxima_entrega <= ultima_pagina and proxima_entrega in por_pagina:
+                    yield por_pagina.pop(proxima_entrega)
+                    proxima_entrega += 1
+
+    def _contar(self, chave: str, n=1):
+        with self._lock:
+            self.estatisticas[chave] += n
+        if chave != "espera_s":
+            metricas.contar(f"olx.{chave}", n)
+
+    def _sessao_atual(self) -> tuple:
+        with self._lock:
+            perfil = self.perfis[self._perfil]
+            if perfil not in self._sessoes:
+                # Perfis trocados usam o User-Agent e os cabeçalhos do próprio navegador imitado
+                cabecalhos = {k: v for k, v in self.headers.items() if k != "User-Agent"}
+                self._sessoes[perfil] = requests.Session(impersonate=perfil, headers=cabecalhos)
+            return perfil, self._sessoes[perfil]
 
-        for page in range(1, paginas + 1):
-            print(f"🔎 Buscando '{termo}' (Página {page})...")
-            
-            params = {"q": termo, "o": page}
-            if min_price: params["ps"] = min_price
-            if max_price: params["pe"] = max_price
-            if min_year:  params["rs"] = min_year
-            if max_year:  params["re"] = max_year
+    def _rodar_perfil(self, perfil_usado: str):
+        with self._lock:
+            # Várias threads podem bater no desafio ao mesmo tempo: só a primeira troca o perfil
+            if self.perfis[self._perfil] == perfil_usado and len(self.perfis) > 1:
+                self._perfil = (self._perfil + 1) % len(self.perfis)
+                self.estatisticas["rotacoes"] += 1
+                metricas.contar("olx.rotacoes")
 
+    def _backoff(self, tentativa: int) -> float:
+        # "Full jitter": espera aleatória até o teto exponencial, para as threads não voltarem juntas
+        return random.uniform(0, min(self.backoff_teto, self.backoff_base * 2 ** tentativa))
+
+    def requisitar(self, url: str, params: Optional[dict] = None, endpoint: str = "olx.busca"):
+        """GET com token bucket, retentativas com backoff exponencial + jitter em 429/5xx/desafio/conexão,
+        respeito ao Retry-After e rodízio de perfil de navegador. Devolve a última resposta obtida
+        (que pode não ser 200) ou relança o erro de conexão depois de esgotar as tentativas."""
+        for tentativa in range(self.max_tentativas + 1):
+            if tentativa:
+                self._contar("retentativas")
+            self._contar("espera_s", self.balde.adquirir())
+            perfil, sessao = self._sessao_atual()
             try:
-                response = requests.get(
-                    base_url, params=params, headers=self.headers, 
-                    impersonate="chrome120", timeout=15
-                )
+                with self.cadencia:
+                    inicio = time.perf_counter()
+                    response = sessao.get(url, params=params, impersonate=perfil, timeout=self.timeout)
+            except Exception:
+                self._contar("falhas_conexao")
+                if tentativa == self.max_tentativas:
+                    raise
+                self._esperar(self._backoff(tentativa))
+                continue
+
+            self._contar("requisicoes")
+            metricas.requisicao(endpoint, response.status_code, len(response.content), time.perf_counter() - inicio)
+            status = response.status_code
+
+            if eh_desafio(status, response.content):
+                self._contar("desafios")
+                self._rodar_perfil(perfil)
+                self.balde.penalizar()
+                espera = self._backoff(tentativa)
+            elif status == 429 or status >= 500:
+                self._contar("limitadas_429" if status == 429 else "erros_5xx")
+                pedida = retry_after(response.headers.get("Retry-After"))
+                if pedida is not None:
+                    # Um Retry-After absurdo (ou uma data distante) não pode travar a busca por horas
+                    pedida = min(pedida, self.backoff_teto)
+                # Retry-After vale para todas as threads: o balde segura a próxima ficha de todo mundo
+                self.balde.penalizar(pedida or 0.0)
+                espera = pedida if pedida is not None else self._backoff(tentativa)
+            else:
+                if status == 200:
+                    self.balde.aliviar()
+                return response
+
+            if tentativa < self.max_tentativas:
+                self._esperar(espera)
+        return response
+
+    def _esperar(self, segundos: float):
+        self._contar("espera_s", segundos)
+        time.sleep(segundos)
 
-                if response.status_code == 200:
-                    novos = self._parse_html(response.text)
-                    todos_anuncios.extend(novos)
-                    if not novos:
-                        break
-                else:
-                    print(f"❌ Erro HTTP {response.status_code}")
-                    break
-                    
-            except Exception as e:
-                print(f"❌ Erro de Conexão: {e}")
-
-        return todos_anuncios
-
-    def _parse_html(self, html: str) -> List[Anuncio]:
+    def resumo_requisicoes(self) -> dict:
+        with self._lock:
+            return {**self.estatisticas, "espera_s": round(self.estatisticas["espera_s"], 2),
+                    "taxa_atual": round(self.balde.taxa, 3), "perfil": self.perfis[self._perfil]}
+
+    def _buscar_pagina(self, base_url: str, params: dict, termo: str, page: int,
+                       parar_quando: Optional[Callable] = None, totais: Optional[dict] = None) -> tuple[List[Anuncio], bool]:
         try:
-            soup = BeautifulSoup(html, 'html.parser')
-            script = soup.find("script", {"id": "__NEXT_DATA__"})
-            if not script: return []
+            response = self.requisitar(base_url, {**params, "o": page})
+
+            if response.status_code == 200 and not eh_desafio(200, response.content):
+                if self.acervo is not None:
+                    self.acervo.gravar(response.content, termo=termo, url=base_url, params=params, pagina=page)
+                with metricas.etapa("olx.parse_pagina"):
+                    novos, total = extrair_anuncios(response.content)
+                if totais is not None and total is not None:
+                    totais[page] = total
+                if novos and parar_quando and parar_quando(novos):
+                    self._contar("paradas")
+                    return novos, False
+                return novos, bool(novos)
+
+            # Desafios já foram contados em requisitar(); aqui fica só o status que encerrou a paginação
+            self._contar("erros_http")
+            metricas.erro(f"olx.http_{response.status_code}")
+            return [], False
 
-            data = json.loads(script.string)
-            try:
-                ads_list = data["props"]["pageProps"]["ads"]
-            except KeyError:
-                return []
-
-            resultados = []
-            for item in ads_list:
-                if not isinstance(item, dict) or "subject" not in item:
-                    continue
-
-                try:
-                    props_raw = item.get("properties") or []
-                    mapa_props = {p.get("name"): p.get("value") for p in props_raw if isinstance(p, dict)}
-
-                    imgs = item.get("images")
-                    img_url = imgs[0].get("url") if (isinstance(imgs, list) and len(imgs) > 0) else None
-
-                    loc = item.get("location", {})
-                    cidade = loc.get("municipality", "")
-                    estado = loc.get("uf", "")
-                    
-                    if not cidade:
-                        loc_det = item.get("locationDetails", {})
-                        cidade = loc_det.get("municipality", "")
-                        estado = loc_det.get("uf", "")
-
-                    anuncio = Anuncio(
-                        id=str(item.get("listId", "")),
-                        titulo=item.get("subject", ""),
-                        preco=item.get("price", "0"),
-                        ano=int(mapa_props.get("regdate", 0)), 
-                        km=int(mapa_props.get("mileage", 0)),
-                        cambio=mapa_props.get("gearbox", "N/A"),
-                        combustivel=mapa_props.get("fuel", "N/A"),
-                        cidade=cidade,
-                        estado=estado,
-                        link=item.get("url", ""),
-                        imagem=img_url,
-                        data_publicacao=item.get("listTime", "")
-                    )
-                    resultados.append(anuncio)
-                except Exception:
-                    continue
-            return resultados
         except Exception:
-            return []
\ No newline at end of file
+            metricas.erro("olx.conexao")
+            return [], True
+
+    def _parse_html(self, html: Union[str, bytes], rapido: bool = True,
+                    validar: bool = True) -> List[Union[Anuncio, AnuncioLeve]]:
+        return extrair_anuncios(html, rapido, validar)[0]
\ No newline at end of file
@@ -0,0 +1,157 @@
+"""Varredura nacional: divide uma consulta por UF (e por faixas de ano/preço quando uma fatia bate no
+limite de páginas), busca as fatias em paralelo sob o limite global do scraper e junta tudo por listId."""
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Iterator, List, Optional, Sequence
+
+from src.metricas import metricas
+from src.models import Anuncio, Consulta
+from src.scraper import OLXScraper
+
+UFS = ("AC", "AL", "AP", "AM", "BA", "CE", "DF", "ES", "GO", "MA", "MT", "MS", "MG", "PA",
+       "PB", "PR", "PE", "PI", "RJ", "RN", "RS", "RO", "RR", "SC", "SP", "SE", "TO")
+
+ANO_MAIS_ANTIGO = 1970
+
+def _corte(valores: List[float], inicio: float, fim: Optional[float]) -> Optional[int]:
+    """Mediana dos valores vistos na fatia, ajustada para cair dentro de [inicio, fim) — assim as
+    duas metades ficam com volumes parecidos, em vez de cortar faixas vazias pelo meio."""
+    dentro = sorted(v for v in valores if v and v >= inicio and (fim is None or v <= fim))
+    if dentro:
+        meio = int(dentro[len(dentro) // 2])
+        if fim is not None and meio >= fim:
+            meio = fim - 1
+        if meio < inicio:
+            meio = inicio
+        if fim is None or meio < fim:
+            return meio
+    if fim is not None and fim > inicio:
+        return (inicio + fim) // 2
+    return None
+
+def _dividir_ano(fatia: Consulta, anuncios: List[Anuncio]) -> Optional[List[Consulta]]:
+    inicio = fatia.min_year or ANO_MAIS_ANTIGO
+    fim = fatia.max_year or datetime.now().year + 1
+    meio = _corte([a.ano for a in anuncios], inicio, fim) if fim > inicio else None
+    if meio is None:
+        return None
+    return [fatia.model_copy(update={"min_year": inicio, "max_year": meio}),
+            fatia.model_copy(update={"min_year": meio + 1, "max_year": fim})]
+
+def _dividir_preco(fatia: Consulta, anuncios: List[Anuncio]) -> Optional[List[Consulta]]:
+    inicio = fatia.min_price or 0
+    fim = fatia.max_price
+    if fim is not None and fim - inicio < 1_000:
+        return None
+    meio = _corte([a.preco for a in anuncios], inicio, fim)
+    if meio is None:
+        return None
+    return [fatia.model_copy(update={"min_price": inicio or None, "max_price": meio}),
+            fatia.model_copy(update={"min_price": meio + 1, "max_price": fim})]
+
+DIVISORES = {"ano": _dividir_ano, "preco": _dividir_preco}
+
+class Varredura:
+    """Divide uma consulta em fatias (uma por UF, subdivididas por ``dividir_por`` quando batem no
+    limite de ``consulta.paginas``) e entrega os anúncios de cada fatia, sem repetir listIds,
+    conforme elas terminam. Todas as fatias usam o mesmo ``OLXScraper``: o balde de fichas dele
+    é o limite global de requisições.
+    """
+    def __init__(self, scraper: Optional[OLXScraper] = None, workers: int = 6, ufs: Sequence[str] = UFS,
+                 dividir_por: Sequence[str] = ("ano", "preco"), max_profundidade: int = 6):
+        self.scraper = scraper or OLXScraper(max_paralelo=2)
+        self.workers = max(1, workers)
+        self.ufs = list(ufs)
+        self.dividir_por = [DIVISORES[d] for d in dividir_por]
+        self.max_profundidade = max_profundidade
+        self.estatisticas = {"fatias": 0, "divididas": 0, "truncadas": 0, "repetidos": 0}
+
+    def _contar(self, chave: str, n: int = 1):
+        self.estatisticas[chave] += n
+        metricas.contar(f"varredura.{chave}", n)
+
+    def fatias(self, consulta: Consulta) -> List[Consulta]:
+        return [consulta.model_copy(update={"estado": uf}) for uf in self.ufs]
+
+    def _dividir(self, fatia: Consulta, anuncios: List[Anuncio]) -> Optional[List[Consulta]]:
+        for divisor in self.dividir_por:
+            filhas = divisor(fatia, anuncios)
+            if filhas:
+                return filhas
+        return None
+
+    def _buscar(self, fatia: Consulta, amostrar: bool = True) -> tuple:
+        """(anúncios, bateu no limite, parou na amostra). Com ``amostrar``, a primeira página vem sozinha:
+        se o totalOfAds dela mostra que a fatia não cabe em ``fatia.paginas``, nenhuma outra é pedida (a
+        fatia vai ser dividida e as filhas refazem a busca); senão, as demais seguem em paralelo."""
+        totais = {}
+        tamanho = [0]
+        lock = threading.Lock()
+
+        def alem_do_limite(pagina: List[Anuncio]) -> bool:
+            with lock:
+                tamanho[0] = max(tamanho[0], len(pagina))
+                total = next(iter(totais.values()), None)
+                return total is not None and total > fatia.paginas * tamanho[0]
+
+        def buscar(ate: int, primeira: int = 1) -> List[List[Anuncio]]:
+            return list(self.scraper.iterar_paginas(fatia.termo, ate, fatia.min_price, fatia.max_price,
+                                                    fatia.min_year, fatia.max_year, fatia.estado,
+                                                    parar_quando=alem_do_limite if amostrar else None,
+                                                    totais=totais, primeira=primeira))
+
+        if amostrar:
+            paginas = buscar(1)
+            if paginas and not alem_do_limite(paginas[0]):
+                paginas += buscar(fatia.paginas, primeira=2)
+        else:
+            paginas = buscar(fatia.paginas)
+        anuncios = [a for p in paginas for a in p]
+        if not totais:
+            # Sem totalOfAds: todas as páginas até o limite vieram cheias, provavelmente há mais além dele
+            return anuncios, len(paginas) >= fatia.paginas, False
+        no_limite = bool(paginas) and alem_do_limite(max(paginas, key=len))
+        return anuncios, no_limite, amostrar and no_limite and len(paginas) < fatia.paginas
+
+    def paginas(self, consulta: Consulta) -> Iterator[List[Anuncio]]:
+        vistos = set()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            amostrar = self.max_profundidade > 0
+            pendentes = {pool.submit(self._buscar, f, amostrar): (f, 0) for f in self.fatias(consulta)}
+            self._contar("fatias", len(pendentes))
+
+            while pendentes:
+                prontos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+                for fut in prontos:
+                    fatia, profundidade = pendentes.pop(fut)
+                    try:
+                        anuncios, no_limite, interrompida = fut.result()
+                    except Exception:
+                        metricas.erro("varredura.fatia")
+                        continue
+
+                    if no_limite:
+                        filhas = self._dividir(fatia, anuncios) if profundidade < self.max_profundidade else None
+                        if filhas:
+                            # A fatia é refeita em faixas menores; a amostra que ela trouxe ainda conta
+                            self._contar("divididas")
+                            self._contar("fatias", len(filhas))
+                            amostrar = profundidade + 1 < self.max_profundidade
+                            for filha in filhas:
+                                pendentes[pool.submit(self._buscar, filha, amostrar)] = (filha, profundidade + 1)
+                        elif interrompida:
+                            # Não dá para dividir mais: busca a fatia inteira, até o limite de páginas
+                            pendentes[pool.submit(self._buscar, fatia, False)] = (fatia, self.max_profundidade)
+                        else:
+                            self._contar("truncadas")
+
+                    unicos = []
+                    for a in anuncios:
+                        if a.id in vistos:
+                            self._contar("repetidos")
+                        else:
+                            vistos.add(a.id)
+                            unicos.append(a)
+                    if unicos:
+                        yield unicos
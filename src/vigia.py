@@ -0,0 +1,212 @@
+"""Modo vigia: reexecuta buscas salvas em intervalos e alerta sobre anúncios novos bem avaliados."""
+import heapq
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Type
+
+import requests
+
+from src.armazem import ArmazemAnuncios
+from src.fipe import ConsultorFipe
+from src.models import Alerta, BuscaVigiada
+from src.detalhes import EnriquecedorAnuncios
+from src.pipeline import executar_consulta
+from src.scraper import OLXScraper
+
+class SaidaAlerta:
+    """Destino dos alertas. Subclasses implementam ``enviar``; precisam ser thread-safe."""
+    def enviar(self, alerta: Alerta):
+        raise NotImplementedError
+
+    def fechar(self):
+        pass
+
+class SaidaTerminal(SaidaAlerta):
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def enviar(self, alerta: Alerta):
+        a = alerta.anuncio
+        with self._lock:
+            print(f"🚨 [{alerta.busca}] {a.score_preco}: {a.titulo} | R$ {a.preco:,.0f} | {a.ano} | {a.km} km | {a.link}")
+
+class SaidaArquivo(SaidaAlerta):
+    """Acrescenta cada alerta como uma linha JSON (JSON Lines)."""
+    def __init__(self, caminho: str = "data/alertas.jsonl"):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        pasta = os.path.dirname(caminho)
+        if pasta and not os.path.exists(pasta): os.makedirs(pasta)
+
+    def enviar(self, alerta: Alerta):
+        linha = alerta.model_dump_json() + "\n"
+        with self._lock:
+            with open(self.caminho, "a", encoding="utf-8") as f:
+                f.write(linha)
+
+class SaidaWebhook(SaidaAlerta):
+    """POST do alerta em JSON para uma URL (Slack, Discord, n8n...). Falhas só geram aviso."""
+    def __init__(self, url: str, timeout: float = 5):
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def enviar(self, alerta: Alerta):
+        try:
+            self.session.post(self.url, data=alerta.model_dump_json(),
+                              headers={"Content-Type": "application/json"}, timeout=self.timeout)
+        except Exception as e:
+            print(f"⚠️ Webhook falhou: {e}")
+
+    def fechar(self):
+        self.session.close()
+
+SAIDAS: Dict[str, Type[SaidaAlerta]] = {
+    "stdout": SaidaTerminal,
+    "arquivo": SaidaArquivo,
+    "webhook": SaidaWebhook,
+}
+
+def criar_saida(especificacao: str) -> SaidaAlerta:
+    """``stdout``, ``arquivo[:caminho]`` ou ``webhook:url``."""
+    tipo, _, argumento = especificacao.partition(":")
+    if tipo not in SAIDAS:
+        raise ValueError(f"Saída '{tipo}' desconhecida. Use: {', '.join(SAIDAS)}")
+    return SAIDAS[tipo](argumento) if argumento else SAIDAS[tipo]()
+
+class Vigia:
+    """Agenda as buscas numa fila de prioridade (próxima execução) atendida por ``workers`` threads.
+
+    Todas as buscas compartilham o mesmo ``OLXScraper`` — e portanto o mesmo balde de fichas e a
+    mesma ``Cadencia`` —, de modo que centenas de buscas num processo respeitam um único limite de
+    requisições à OLX (que ainda se ajusta sozinho quando ela responde 429).
+    Os listIds já vistos ficam no ``ArmazemAnuncios``; só anúncios novos (ou com preço alterado)
+    com score em ``scores`` geram alerta. Uma rodada em que o armazém ainda não conhecia nenhum
+    anúncio da busca (busca nova ou armazém vazio) apenas o alimenta, a menos que
+    ``alertar_na_primeira`` seja verdadeiro; depois de reiniciar o processo, o que foi publicado
+    enquanto o vigia estava parado alerta normalmente. Os últimos ``max_alertados`` pares
+    (listId, preço) já alertados não se repetem entre buscas sobrepostas. Buscas com ``detalhes``
+    dividem um único ``EnriquecedorAnuncios`` (o passado ou um aberto aqui e fechado ao fim de ``rodar``).
+    """
+    def __init__(self, buscas: Sequence[BuscaVigiada], saidas: Sequence[SaidaAlerta],
+                 scraper: Optional[OLXScraper] = None, consultor: Optional[ConsultorFipe] = None,
+                 armazem: Optional[ArmazemAnuncios] = None,
+                 enriquecedor: Optional[EnriquecedorAnuncios] = None, workers: int = 4,
+                 scores: Sequence[str] = ("Excelente", "Bom"), alertar_na_primeira: bool = False,
+                 max_alertados: int = 10_000):
+        self.buscas = list(buscas)
+        self.saidas = list(saidas)
+        self.scraper = scraper or OLXScraper(max_paralelo=4)
+        self.consultor = consultor or ConsultorFipe()
+        self.armazem = armazem if armazem is not None else ArmazemAnuncios()
+        self._enriquecedor_proprio = enriquecedor is None and any(b.detalhes for b in self.buscas)
+        self.enriquecedor = EnriquecedorAnuncios(self.scraper) if self._enriquecedor_proprio else enriquecedor
+        self.workers = max(1, workers)
+        self.scores = set(scores)
+        self.alertar_na_primeira = alertar_na_primeira
+        self.max_alertados = max_alertados
+
+        self.execucoes = 0
+        self.alertas = 0
+        self.erros = 0
+        self._agenda: List[tuple] = []
+        self._alertados: "OrderedDict[tuple, None]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._parar = threading.Event()
+
+    def _proxima(self, busca: BuscaVigiada) -> float:
+        return busca.intervalo * (1 + random.uniform(-busca.jitter, busca.jitter))
+
+    def _agendar(self, quando: float, indice: int):
+        with self._cond:
+            heapq.heappush(self._agenda, (quando, indice))
+            self._cond.notify()
+
+    def _aguardar_vez(self) -> Optional[int]:
+        with self._cond:
+            while not self._parar.is_set():
+                if self._agenda:
+                    espera = self._agenda[0][0] - time.monotonic()
+                    if espera <= 0:
+                        return heapq.heappop(self._agenda)[1]
+                    self._cond.wait(espera)
+                else:
+                    self._cond.wait()
+        return None
+
+    def executar_busca(self, indice: int) -> List[Alerta]:
+        busca = self.buscas[indice]
+        enriquecedor = self.enriquecedor if busca.detalhes or not self._enriquecedor_proprio else None
+        resultado = executar_consulta(busca, self.scraper, self.consultor, self.armazem, enriquecedor)
+
+        with self._cond:
+            self.execucoes += 1
+
+        if resultado.erro:
+            with self._cond:
+                self.erros += 1
+            print(f"⚠️ [{busca.nome}] {resultado.erro}")
+            return []
+        # Nada desta busca no armazém: é a carga inicial dela, não uma leva de novidades
+        if not resultado.conhecidos and not self.alertar_na_primeira:
+            return []
+
+        ids_novos = set(resultado.ids_novos)
+        alertas = []
+        with self._cond:
+            # Buscas sobrepostas rodando ao mesmo tempo podem ver o mesmo anúncio como novo
+            for a in resultado.anuncios:
+                if a.id in ids_novos and a.score_preco in self.scores and (a.id, a.preco) not in self._alertados:
+                    self._alertados[(a.id, a.preco)] = None
+                    if len(self._alertados) > self.max_alertados:
+                        self._alertados.popitem(last=False)
+                    alertas.append(Alerta(busca=busca.nome, anuncio=a, fipe_valor=resultado.fipe_valor))
+            self.alertas += len(alertas)
+
+        for alerta in alertas:
+            for saida in self.saidas:
+                saida.enviar(alerta)
+        return alertas
+
+    def _trabalhar(self):
+        while True:
+            indice = self._aguardar_vez()
+            if indice is None:
+                return
+            try:
+                self.executar_busca(indice)
+            except Exception as e:
+                print(f"⚠️ Vigia: {e}")
+            self._agendar(time.monotonic() + self._proxima(self.buscas[indice]), indice)
+
+    def rodar(self, duracao: Optional[float] = None):
+        """Bloqueia até ``parar()`` (ou Ctrl+C) ou até passar ``duracao`` segundos."""
+        agora = time.monotonic()
+        # A primeira rodada é espalhada pelo jitter de cada busca para não disparar tudo junto
+        for i, busca in enumerate(self.buscas):
+            self._agendar(agora + random.uniform(0, busca.intervalo * busca.jitter), i)
+
+        threads = [threading.Thread(target=self._trabalhar, daemon=True) for _ in range(self.workers)]
+        for t in threads:
+            t.start()
+        print(f"👀 Vigiando {len(self.buscas)} buscas com {self.workers} workers...")
+
+        try:
+            self._parar.wait(duracao)
+        except KeyboardInterrupt:
+            pass
+        self.parar()
+        for t in threads:
+            t.join()
+        for saida in self.saidas:
+            saida.fechar()
+        if self._enriquecedor_proprio:
+            self.enriquecedor.fechar()
+
+    def parar(self):
+        self._parar.set()
+        with self._cond:
+            self._cond.notify_all()
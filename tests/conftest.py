@@ -0,0 +1,9 @@
+import pytest
+
+from benchmarks.servidor_stub import ServidorStub
+
+@pytest.fixture(scope="session")
+def stub():
+    """Stub local da OLX (5 páginas de 50 anúncios) e da API FIPE, sem latência."""
+    with ServidorStub(latencia=0) as servidor:
+        yield servidor
@@ -0,0 +1,75 @@
+import json
+import os
+from datetime import date
+
+import pytest
+
+from benchmarks.fixtures import pagina_olx
+from src.acervo import AcervoPaginas, _zstandard, reprocessar
+from src.cli import main
+from src.scraper import OLXScraper
+
+COMPRESSOES = ["gzip", pytest.param("zstd", marks=pytest.mark.skipif(_zstandard() is None, reason="sem zstandard"))]
+
+@pytest.mark.parametrize("compressao", COMPRESSOES)
+def test_ida_e_volta(tmp_path, compressao):
+    acervo = AcervoPaginas(str(tmp_path), compressao=compressao)
+    paginas = [pagina_olx(p, 5, ruido_kb=1).encode() for p in (1, 2, 3)]
+    for p, conteudo in enumerate(paginas, 1):
+        acervo.gravar(conteudo, termo="civic", params={"q": "civic"}, pagina=p)
+    acervo.fechar()
+
+    segmentos = acervo.segmentos()
+    assert len(segmentos) == 1 and segmentos[0].endswith(".gz" if compressao == "gzip" else ".zst")
+    lidos = list(AcervoPaginas(str(tmp_path), compressao=compressao).ler())
+    assert [conteudo for _, conteudo in lidos] == paginas
+    assert [meta["pagina"] for meta, _ in lidos] == [1, 2, 3]
+    assert lidos[0][0]["params"] == {"q": "civic"} and lidos[0][0]["tamanho"] == len(paginas[0])
+    assert list(acervo.ler(desde=date(2999, 1, 1))) == []
+
+@pytest.mark.parametrize("compressao", COMPRESSOES)
+def test_registro_cortado_so_perde_ele_mesmo(tmp_path, compressao):
+    acervo = AcervoPaginas(str(tmp_path), compressao=compressao)
+    for p in (1, 2):
+        acervo.gravar(pagina_olx(p, 5, ruido_kb=1).encode(), termo="civic", pagina=p)
+    acervo.fechar()
+    caminho = acervo.segmentos()[0]
+    with open(caminho, "r+b") as f:
+        f.truncate(os.path.getsize(caminho) - 50)
+    assert [meta["pagina"] for meta, _ in acervo.ler()] == [1]
+
+def test_compressao_desconhecida(tmp_path):
+    with pytest.raises(ValueError):
+        AcervoPaginas(str(tmp_path), compressao="bzip2")
+
+def test_scraper_arquiva_e_reprocessa_com_a_fipe_da_epoca(stub, tmp_path):
+    acervo = AcervoPaginas(str(tmp_path))
+    scraper = OLXScraper(intervalo_minimo=0, base_url=stub.url_olx, acervo=acervo)
+    assert len(scraper.buscar("civic", paginas=2)) == 100
+    acervo.anotar_fipe("civic", 1.0, {})
+    scraper.buscar("gol", paginas=1)
+    acervo.fechar()
+
+    por_termo = {}
+    for meta, anuncios in reprocessar(acervo):
+        por_termo.setdefault(meta["termo"], []).extend(anuncios)
+    assert len(por_termo["civic"]) == 100 and len(por_termo["gol"]) == 50
+    # "civic" usa a FIPE anotada depois da coleta; "gol" não tem nenhuma
+    sem_alerta = [a for a in por_termo["civic"] if a.score_preco != "Cuidado"]
+    assert sem_alerta and all("📈 Acima da Fipe" in a.tags for a in sem_alerta)
+    assert not any("Fipe" in t for a in por_termo["gol"] for t in a.tags)
+    assert [meta["termo"] for meta, _ in reprocessar(acervo, termo="gol")] == ["gol"]
+
+def test_cli_reprocessar_grava_json(stub, tmp_path):
+    pasta = os.path.join(tmp_path, "acervo")
+    acervo = AcervoPaginas(pasta)
+    OLXScraper(intervalo_minimo=0, base_url=stub.url_olx, acervo=acervo).buscar("civic", paginas=2)
+    acervo.fechar()
+
+    saida = os.path.join(tmp_path, "saida")
+    assert main(["--acervo", pasta, "reprocessar", "--termo", "civic", "--saida", saida]) == 0
+    arquivos = os.listdir(saida)
+    assert len(arquivos) == 1 and arquivos[0].endswith(".json")
+    with open(os.path.join(saida, arquivos[0]), encoding="utf-8") as f:
+        resultado = json.load(f)
+    assert len(resultado["anuncios"]) == 100 and resultado["consulta"]["termo"] == "civic"
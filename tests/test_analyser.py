@@ -0,0 +1,40 @@
+import pytest
+
+from benchmarks.bench_analisador import anuncios_sinteticos
+from src.analyser import AnalisadorVeiculo
+from src.models import Anuncio
+
+def _comparar(analisador: AnalisadorVeiculo, n: int = 2_000):
+    um_a_um = [analisador.analisar(a) for a in anuncios_sinteticos(n)]
+    lote = analisador.analisar_lote(anuncios_sinteticos(n))
+    assert [a.model_dump() for a in lote] == [a.model_dump() for a in um_a_um]
+    assert [a.model_fields_set for a in lote] == [a.model_fields_set for a in um_a_um]
+
+@pytest.mark.parametrize("fipe", [0, 95_000])
+def test_lote_igual_ao_analisar(fipe):
+    _comparar(AnalisadorVeiculo(fipe_referencia=fipe))
+
+def test_alertas_sobrepostos_e_preco_suspeito():
+    anuncio = Anuncio(id="1", titulo="Civic de leilão, sinistro recuperado", preco=50_000, ano=2020, km=10_000)
+    analisado, = AnalisadorVeiculo(fipe_referencia=100_000).analisar_lote([anuncio])
+    assert analisado.score_preco == "Cuidado"
+    assert analisado.tags[:4] == ["⚠️ ALERTA: LEILÃO", "⚠️ ALERTA: SINISTRO", "⚠️ ALERTA: RECUPERADO",
+                                  "💰 50% Abaixo da Fipe"]
+    assert "❓ Preço suspeito" in analisado.tags
+
+def test_lote_vazio():
+    assert AnalisadorVeiculo().analisar_lote([]) == []
+
+@pytest.mark.parametrize("fipe", [0, 95_000])
+def test_lote_igual_ao_analisar_com_fipe_por_ano(fipe):
+    # Anos ímpares sem valor: caem na referência única (ou ficam sem faixa de preço)
+    por_ano = {ano: 40_000 + (ano - 2010) * 6_000 for ano in range(2010, 2025, 2)}
+    _comparar(AnalisadorVeiculo(fipe_referencia=fipe, fipe_por_ano=por_ano))
+
+def test_referencia_por_ano_modelo():
+    analisador = AnalisadorVeiculo(fipe_referencia=100_000, fipe_por_ano={2018: 70_000, 2019: 0.0})
+    assert analisador.referencia(Anuncio(id="1", titulo="x", ano=2018)) == 70_000
+    assert analisador.referencia(Anuncio(id="2", titulo="x", ano=2019)) == 100_000
+    assert analisador.referencia(Anuncio(id="3", titulo="x")) == 100_000
+    barato, = analisador.analisar_lote([Anuncio(id="4", titulo="x", ano=2018, preco=65_000)])
+    assert barato.score_preco == "Bom"
@@ -0,0 +1,69 @@
+import os
+import sqlite3
+
+import pytest
+
+from src.armazem import ArmazemAnuncios
+from src.models import Anuncio, AnuncioLeve
+
+def _anuncio(id_: str, preco: float, **kwargs) -> Anuncio:
+    return Anuncio(id=id_, titulo=f"Honda Civic {id_}", preco=preco, ano=2020, km=30_000, estado="SP", **kwargs)
+
+@pytest.fixture
+def armazem(tmp_path):
+    armazem = ArmazemAnuncios(os.path.join(tmp_path, "anuncios.sqlite"))
+    yield armazem
+    armazem.fechar()
+
+def test_classificar_separa_novos_alterados_e_inalterados(armazem):
+    armazem.registrar([_anuncio("1", 90_000), _anuncio("2", 80_000)])
+    novos, inalterados = armazem.classificar([_anuncio("1", 90_000), _anuncio("2", 75_000), _anuncio("3", 70_000)])
+    assert [a.id for a in novos] == ["2", "3"]
+    assert [a.id for a in inalterados] == ["1"]
+    assert armazem.todos_conhecidos([_anuncio("1", 1), _anuncio("2", 1)])
+    assert not armazem.todos_conhecidos([_anuncio("1", 1), _anuncio("3", 1)])
+    assert not armazem.todos_conhecidos([])
+
+def _linha(armazem, id_: str) -> tuple:
+    return armazem._conn.execute(
+        "SELECT preco, preco_anterior, primeiro_visto, ultimo_visto FROM anuncios WHERE id = ?", (id_,)).fetchone()
+
+def test_upsert_guarda_preco_anterior(armazem):
+    armazem.registrar([_anuncio("1", 90_000)])
+    preco, anterior, primeiro, _ = _linha(armazem, "1")
+    assert (preco, anterior) == (90_000, None)
+
+    armazem.registrar([_anuncio("1", 85_000)])
+    armazem.registrar([_anuncio("1", 85_000)])
+    preco, anterior, primeiro_depois, ultimo = _linha(armazem, "1")
+    assert (preco, anterior) == (85_000, 90_000)
+    assert primeiro_depois == primeiro and ultimo >= primeiro
+    assert len(armazem) == 1
+
+def test_carregar_preserva_analise_e_enriquecimento(armazem):
+    original = _anuncio("1", 90_000, descricao="Único dono", propriedades={"motor": "2.0"}, duplicados=2,
+                        tags=["✅ Abaixo da Fipe"], score_preco="Bom", km_anual=6_000)
+    armazem.registrar([original])
+    assert armazem.carregar(["1"]) == [original]
+    assert armazem.carregar(["1"], leve=True) == [AnuncioLeve.de_anuncio(original)]
+    assert armazem.carregar(["9", "1"]) == [original]
+
+def test_migra_banco_sem_as_colunas_novas(tmp_path):
+    caminho = os.path.join(tmp_path, "antigo.sqlite")
+    conn = sqlite3.connect(caminho)
+    conn.execute(
+        "CREATE TABLE anuncios (id TEXT PRIMARY KEY, titulo TEXT, preco REAL, ano INTEGER, km INTEGER,"
+        " cambio TEXT, combustivel TEXT, cidade TEXT, estado TEXT, link TEXT, imagem TEXT,"
+        " data_publicacao TEXT, tags TEXT, score_preco TEXT, km_anual INTEGER,"
+        " preco_anterior REAL, primeiro_visto REAL NOT NULL, ultimo_visto REAL NOT NULL)")
+    conn.execute("INSERT INTO anuncios VALUES ('1', 'Civic', 90000, 2020, 30000, 'Manual', 'Flex', 'Campinas', 'SP',"
+                 " '', NULL, NULL, '[]', 'Neutro', 0, NULL, 0, 0)")
+    conn.commit()
+    conn.close()
+
+    armazem = ArmazemAnuncios(caminho)
+    antigo, = armazem.carregar(["1"])
+    assert (antigo.descricao, antigo.propriedades, antigo.duplicados) == (None, {}, 0)
+    armazem.registrar([_anuncio("1", 90_000, descricao="Revisado")])
+    assert armazem.carregar(["1"])[0].descricao == "Revisado"
+    armazem.fechar()
@@ -0,0 +1,18 @@
+from benchmarks.suite import comparar, melhor_de
+
+def test_comparar_conta_so_o_que_passou_da_tolerancia():
+    resultados = {"a": (1.5, 10, "x"), "b": (1.1, 10, "x"), "c": (0.5, 10, "x"), "novo": (9.0, 1, "x")}
+    baseline = {"a": 1.0, "b": 1.0, "c": 1.0}
+    assert comparar(resultados, baseline, tolerancia=0.3) == 1
+    assert comparar(resultados, {}, tolerancia=0.3) == 0
+
+def test_melhor_de_deixa_o_preparo_fora_da_medida():
+    preparados = []
+
+    def preparar():
+        preparados.append(1)
+        return len(preparados)
+
+    vistos = []
+    assert melhor_de(3, vistos.append, preparar) >= 0
+    assert vistos == [1, 2, 3]
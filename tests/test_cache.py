@@ -0,0 +1,58 @@
+import os
+
+from src import cache as modulo_cache
+from src.cache import CacheFipe
+
+def _cache(tmp_path, **kwargs) -> CacheFipe:
+    return CacheFipe(os.path.join(tmp_path, "cache.sqlite"), **kwargs)
+
+def test_salvar_e_obter(tmp_path):
+    cache = _cache(tmp_path)
+    cache.salvar("/carros/marcas", [{"codigo": "25", "nome": "Honda"}])
+    assert cache.obter("/carros/marcas") == [{"codigo": "25", "nome": "Honda"}]
+    assert cache.obter("/carros/marcas/25/modelos") is None
+    assert cache.estatisticas() == {"hits": 1, "misses": 1, "taxa_acerto": 0.5}
+    cache.fechar()
+
+def test_ttl_separado_para_catalogo_e_precos(tmp_path, monkeypatch):
+    agora = [1_000_000.0]
+    monkeypatch.setattr(modulo_cache.time, "time", lambda: agora[0])
+    cache = _cache(tmp_path, ttl_catalogo=100, ttl_precos=10, alinhar_mes=False)
+    cache.salvar("/carros/marcas", ["catalogo"])
+    cache.salvar(CacheFipe.chave_preco(1, "2020-1"), {"Valor": "R$ 1,00"})
+
+    agora[0] += 50
+    assert cache.obter(CacheFipe.chave_preco(1, "2020-1")) is None
+    assert cache.obter("/carros/marcas") == ["catalogo"]
+
+    agora[0] += 51
+    assert cache.obter("/carros/marcas") is None
+    cache.fechar()
+
+def test_virada_de_mes_expira_mesmo_dentro_do_ttl(tmp_path, monkeypatch):
+    cache = _cache(tmp_path)
+    monkeypatch.setattr(cache, "_referencia_atual", lambda: "2026-01")
+    cache.salvar(CacheFipe.chave_preco(1, "2020-1"), {"Valor": "R$ 1,00"})
+    assert cache.obter(CacheFipe.chave_preco(1, "2020-1")) is not None
+
+    monkeypatch.setattr(cache, "_referencia_atual", lambda: "2026-02")
+    assert cache.obter(CacheFipe.chave_preco(1, "2020-1")) is None
+    cache.fechar()
+
+def test_virada_de_mes_ignorada_sem_alinhar_mes(tmp_path, monkeypatch):
+    cache = _cache(tmp_path, alinhar_mes=False)
+    monkeypatch.setattr(cache, "_referencia_atual", lambda: "2026-01")
+    cache.salvar("/carros/marcas", ["catalogo"])
+    monkeypatch.setattr(cache, "_referencia_atual", lambda: "2026-02")
+    assert cache.obter("/carros/marcas") == ["catalogo"]
+    cache.fechar()
+
+def test_abrir_remove_linhas_expiradas(tmp_path, monkeypatch):
+    cache = _cache(tmp_path)
+    monkeypatch.setattr(cache, "_referencia_atual", lambda: "2020-01")
+    cache.salvar("/carros/marcas", ["velho"])
+    cache.fechar()
+
+    cache = _cache(tmp_path)
+    assert cache._conn.execute("SELECT COUNT(*) FROM respostas").fetchone()[0] == 0
+    cache.fechar()
@@ -0,0 +1,28 @@
+import os
+
+from benchmarks.fixtures import pagina_detalhe
+from src.detalhes import CacheDetalhes, EnriquecedorAnuncios, extrair_detalhe
+from src.scraper import OLXScraper
+
+def test_extrair_detalhe():
+    detalhe = extrair_detalhe(pagina_detalhe(42).encode())
+    assert detalhe["descricao"] and "<br>" not in detalhe["descricao"]
+    assert set(detalhe["propriedades"]) == {"regdate", "mileage", "car_steering", "end_tag"}
+    assert extrair_detalhe(b"<html>sem dados</html>") is None
+
+def test_enriquece_pelo_scraper_e_reaproveita_o_cache(stub, tmp_path):
+    scraper = OLXScraper(intervalo_minimo=0, base_url=stub.url_olx)
+    anuncios = scraper.buscar("civic", paginas=1)[:10]
+    cache = CacheDetalhes(os.path.join(tmp_path, "detalhes.sqlite"))
+
+    assert EnriquecedorAnuncios(scraper, cache=cache, max_paralelo=4).enriquecer(anuncios) == 10
+    assert all(a.descricao and "car_steering" in a.propriedades for a in anuncios)
+    # Busca e detalhes saem pelo mesmo OLXScraper.requisitar
+    assert scraper.estatisticas["requisicoes"] == 11
+    # Já enriquecidos são pulados; anúncios novos com os mesmos ids vêm do cache, sem rede
+    assert EnriquecedorAnuncios(scraper, cache=cache).enriquecer(anuncios) == 0
+    novos = scraper.buscar("civic", paginas=1)[:10]
+    requisicoes = scraper.estatisticas["requisicoes"]
+    assert EnriquecedorAnuncios(scraper, cache=cache).enriquecer(novos) == 10
+    assert scraper.estatisticas["requisicoes"] == requisicoes
+    cache.fechar()
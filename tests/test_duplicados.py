@@ -0,0 +1,72 @@
+from src.duplicados import IndiceDuplicados, chave_imagem
+from src.models import AnuncioLeve
+
+def _anuncio(id_, titulo="Honda Civic EXL 2.0 Flex Automático", preco=95_000.0, km=60_000, cidade="Campinas",
+             imagem=None, data="2024-05-01T10:00:00"):
+    return AnuncioLeve(id=id_, titulo=titulo, preco=preco, ano=2018, km=km, cidade=cidade, estado="SP",
+                       imagem=imagem, data_publicacao=data)
+
+def test_chave_imagem():
+    assert chave_imagem("https://img.olx.com.br/images/12/abc123.jpg?w=640") == "abc123"
+    assert chave_imagem(None) is None
+
+def test_une_copias_do_mesmo_carro():
+    indice = IndiceDuplicados()
+    assert indice.adicionar(_anuncio("1", imagem="https://img/a/foto.jpg"))[1]
+    # Mesma foto em outro tamanho
+    assert not indice.adicionar(_anuncio("2", titulo="Civic 2018 impecável", km=0, imagem="https://img/b/foto.webp"))[1]
+    # Mesma ficha (ano, km, cidade) e preço próximo
+    assert not indice.adicionar(_anuncio("3", titulo="Vendo carro", preco=99_000))[1]
+    # Título parecido, rodou um pouco e baixou o preço
+    grupo, novo = indice.adicionar(_anuncio("4", km=60_400, preco=92_000, cidade=""))
+    assert not novo
+    assert {indice._raiz(indice._por_id[i]) for i in "1234"} == {grupo}
+    # Reindexar um id conhecido não conta de novo
+    assert indice.adicionar(_anuncio("1")) == (grupo, False)
+    assert indice.estatisticas == {"anuncios": 4, "duplicados": 3, "esquecidos": 0}
+
+def test_nao_une_carros_diferentes():
+    indice = IndiceDuplicados()
+    indice.adicionar(_anuncio("1"))
+    assert indice.adicionar(_anuncio("2", km=90_000))[1]
+    assert indice.adicionar(_anuncio("3", cidade="Santos"))[1]
+    assert indice.adicionar(_anuncio("4", preco=130_000, km=60_500))[1]
+
+def test_grupo_nao_cresce_em_cadeia():
+    # A~B e B~C (rodou 900 km entre cada republicação), mas A e C estão 1.800 km longe
+    indice = IndiceDuplicados()
+    indice.adicionar(_anuncio("A", km=60_000))
+    assert not indice.adicionar(_anuncio("B", km=60_900))[1]
+    c, novo = indice.adicionar(_anuncio("C", km=61_800))
+    assert novo and indice._raiz(indice._por_id["A"]) != c
+    assert indice._raiz(indice._por_id["A"]) == indice._raiz(indice._por_id["B"])
+
+def test_esquece_os_grupos_menos_recentes():
+    indice = IndiceDuplicados(capacidade=3)
+    indice.adicionar(_anuncio("velho", km=10_000))
+    for i in range(3):
+        indice.adicionar(_anuncio(f"novo{i}", km=20_000 + i * 10_000))
+    assert len(indice) == 3 and indice.estatisticas["esquecidos"] == 1
+    # Esquecido por inteiro: volta como carro novo
+    assert indice.adicionar(_anuncio("velho-2", km=10_000))[1]
+
+def test_colapsar_fica_com_a_copia_mais_recente():
+    indice = IndiceDuplicados()
+    assert indice.colapsar([_anuncio("1", data="2024-05-01")])[0][0].duplicados == 0
+    lote = [_anuncio("2", data="2024-05-03", km=60_300), _anuncio("outro", km=150_000), _anuncio("3", data="2024-05-02")]
+    unicos, descartados = indice.colapsar(lote)
+    assert [a.id for a in unicos] == ["2", "outro"] and [a.id for a in descartados] == ["3"]
+    # Conta as cópias de lotes anteriores também
+    assert unicos[0].duplicados == 2 and unicos[1].duplicados == 0
+
+def test_filtrar_conta_na_primeira_copia_ou_avisa():
+    primeira = _anuncio("1")
+    entregues = list(IndiceDuplicados().filtrar([primeira, _anuncio("2"), _anuncio("3")]))
+    assert entregues == [primeira] and primeira.duplicados == 2
+
+    avisos = []
+    primeira = _anuncio("1")
+    indice = IndiceDuplicados()
+    assert list(indice.filtrar([primeira, _anuncio("2")], ao_duplicar=lambda a, n: avisos.append((a.id, n)))) == [primeira]
+    assert list(indice.filtrar([_anuncio("3")], ao_duplicar=lambda a, n: avisos.append((a.id, n)))) == []
+    assert avisos == [("1", 1), ("1", 2)] and primeira.duplicados == 0
@@ -0,0 +1,55 @@
+import csv
+import os
+from datetime import date
+
+import pytest
+
+from benchmarks.bench_analisador import anuncios_sinteticos
+from src.analyser import AnalisadorVeiculo
+from src.exportador import COLUNAS_COMPLETAS, COLUNAS_RELATORIO, criar_exportador
+from src.models import AnuncioLeve
+
+@pytest.fixture
+def anuncios():
+    return AnalisadorVeiculo(fipe_referencia=95_000).analisar_lote(anuncios_sinteticos(40))
+
+def test_formato_desconhecido():
+    with pytest.raises(ValueError, match="desconhecido"):
+        criar_exportador("xml")
+
+def test_csv(tmp_path, anuncios):
+    caminho = criar_exportador("csv", pasta=str(tmp_path)).exportar(anuncios, "Honda Civic", "SP")
+    assert os.path.basename(caminho).startswith("analise_SP_Honda_Civic_")
+    with open(caminho, encoding="utf-8-sig") as f:
+        linhas = list(csv.reader(f, delimiter=";"))
+    assert linhas[0] == COLUNAS_RELATORIO
+    assert len(linhas) == 41
+    assert linhas[1][COLUNAS_RELATORIO.index("tags")] == ", ".join(anuncios[0].tags)
+
+def test_parquet_tipado_e_particionado(tmp_path, anuncios):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    leves = [AnuncioLeve.de_anuncio(a) for a in anuncios]
+    destino = criar_exportador("parquet", pasta=str(tmp_path)).exportar(leves, "civic")
+    tabela = ds.dataset(destino, format="parquet", partitioning="hive").to_table()
+    assert tabela.num_rows == 40
+    assert set(COLUNAS_COMPLETAS) <= set(tabela.column_names)
+    # Uma segunda exportação acrescenta arquivos, sem apagar a primeira
+    criar_exportador("parquet", pasta=str(tmp_path)).exportar(leves, "civic")
+    assert ds.dataset(destino, format="parquet", partitioning="hive").count_rows() == 80
+
+    caminho = criar_exportador("parquet", pasta=str(tmp_path), particionar=False).exportar(anuncios, "civic")
+    esquema = pq.read_schema(caminho)
+    assert esquema.field("ano").type == pa.int16()
+    assert esquema.field("tags").type.value_type == pa.string()
+    assert pq.read_table(caminho).column("data_coleta")[0].as_py() == date.today()
+
+def test_feather(tmp_path, anuncios):
+    import pyarrow.feather as feather
+
+    caminho = criar_exportador("feather", pasta=str(tmp_path)).exportar(anuncios, "civic")
+    tabela = feather.read_table(caminho)
+    assert tabela.column("id").to_pylist() == [a.id for a in anuncios]
+    assert tabela.column("tags").to_pylist() == [a.tags for a in anuncios]
@@ -0,0 +1,76 @@
+from src.fipe import CONFIANCA_BAIXA, ConsultorFipe
+
+def test_concorrente_igual_ao_serial(stub):
+    serial = ConsultorFipe(usar_cache=False, concorrencia=1, base_url=stub.url_fipe)
+    concorrente = ConsultorFipe(usar_cache=False, concorrencia=8, base_url=stub.url_fipe)
+    anos = [2015, 2018, 2020]
+    assert serial.planejar("Honda Civic").precos(anos) == concorrente.planejar("Honda Civic").precos(anos)
+    assert serial.obter_preco_medio("Honda Civic", 2020)[0] > 0
+
+def test_plano_busca_cada_ano_uma_vez(stub):
+    consultor = ConsultorFipe(usar_cache=False, base_url=stub.url_fipe)
+    plano = consultor.planejar("Honda Civic")
+    plano.precos([2020])
+    requisicoes = consultor.requisicoes
+    assert plano.precos([2020]) == plano.precos([2020])
+    assert consultor.requisicoes == requisicoes
+
+def test_sem_ano_nao_consulta(stub):
+    consultor = ConsultorFipe(usar_cache=False, base_url=stub.url_fipe)
+    assert consultor.obter_preco_medio("Honda Civic", 0) == (0.0, "Ano não informado.")
+    assert consultor.requisicoes == 0
+
+def test_confianca_fica_no_plano(stub):
+    consultor = ConsultorFipe(usar_cache=False, base_url=stub.url_fipe)
+    certo = consultor.planejar("Honda Civic Sedan EXL")
+    incerto = consultor.planejar("Honda ivic")
+    assert certo.confianca > CONFIANCA_BAIXA and certo.aviso() is None
+    assert certo.ranking[0][0].startswith("Civic Sedan EXL")
+    # Um segundo plano no mesmo consultor não mexe no primeiro
+    assert incerto.confianca == 0.25 and certo.confianca > 0.25
+    assert incerto.confianca_baixa and "confiança 0.25" in incerto.aviso()
+    assert not hasattr(consultor, "ultima_confianca")
+
+def test_marca_desconhecida(stub):
+    plano = ConsultorFipe(usar_cache=False, base_url=stub.url_fipe).planejar("Ferrari F40")
+    assert plano.erro == "Marca 'ferrari' não encontrada."
+    assert plano.precos([2020]) == {2020: (0.0, plano.erro)}
+    assert plano.aviso() is None
+
+def test_falha_transitoria_nao_fica_guardada(stub, monkeypatch):
+    consultor = ConsultorFipe(usar_cache=False, concorrencia=1, base_url=stub.url_fipe)
+    esperado = ConsultorFipe(usar_cache=False, base_url=stub.url_fipe).planejar("Honda Civic").precos([2020])
+    plano = consultor.planejar("Honda Civic")
+    original = consultor._get_json
+    falhou = []
+
+    def get_json(endpoint, chave=None):
+        if endpoint.endswith("/anos") and not falhou:
+            falhou.append(endpoint)
+            raise ConnectionError("caiu")
+        return original(endpoint, chave)
+
+    monkeypatch.setattr(consultor, "_get_json", get_json)
+    parcial = plano.precos([2020])
+    assert falhou and parcial != esperado
+    # O próximo pedido do mesmo ano busca de novo só a versão que falhou
+    requisicoes = consultor.requisicoes
+    assert plano.precos([2020]) == esperado
+    assert consultor.requisicoes - requisicoes <= 2
+
+def test_indice_conta_uma_falta_e_so_guarda_o_indice(stub, tmp_path):
+    from src.cache import CacheFipe
+    from src.metricas import metricas
+
+    cache = CacheFipe(str(tmp_path / "cache.sqlite"))
+    metricas.zerar()
+    ConsultorFipe(cache=cache, base_url=stub.url_fipe)._indice_marcas()
+    assert cache.estatisticas()["misses"] == 1
+    assert metricas.resumo()["contadores"]["fipe.cache.miss"] == 1
+    assert cache.obter("/carros/marcas") is None and cache.obter("indice/marcas") is not None
+
+    # Consultor novo, mesmo cache: o índice vem pronto, sem rede
+    quente = ConsultorFipe(cache=cache, base_url=stub.url_fipe)
+    quente._indice_marcas()
+    assert quente.requisicoes == 0
+    cache.fechar()
@@ -0,0 +1,142 @@
+import tkinter
+
+import pytest
+
+import main
+import src.fipe
+import src.scraper
+from benchmarks.bench_analisador import anuncios_sinteticos
+from src.analyser import AnalisadorVeiculo
+from src.fipe import ConsultorFipe
+from src.models import Anuncio
+from src.scraper import OLXScraper
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(main, "PREAQUECER", False)
+    try:
+        janela = main.PyMotorsApp()
+    except tkinter.TclError as e:
+        pytest.skip(f"sem display: {e}")
+    janela.update()
+    yield janela
+    janela.destroy()
+
+def _analisados(n: int):
+    return AnalisadorVeiculo(fipe_referencia=95_000).analisar_lote(anuncios_sinteticos(n))
+
+def test_ordem_score():
+    anuncios = sorted(_analisados(300), key=main.ordem_score)
+    scores = [a.score_preco for a in anuncios]
+    n_excelente, n_bom = scores.count("Excelente"), scores.count("Bom")
+    assert set(scores[:n_excelente]) <= {"Excelente"}
+    assert set(scores[n_excelente:n_excelente + n_bom]) <= {"Bom"}
+
+def test_lista_so_materializa_as_linhas_visiveis(app):
+    lista = app.lista_resultados
+    lista.adicionar(_analisados(2_000))
+    app.update()
+    assert len(lista.itens) == 2_000
+    assert lista.itens == sorted(lista.itens, key=main.ordem_score)
+    visiveis = lista.canvas.winfo_height() // main.ALTURA_CARD + 2
+    assert len(lista.cards) == visiveis
+
+    # Rolar recicla os mesmos cards, reapontados para as linhas novas
+    cards = list(lista.cards)
+    lista.canvas.yview_moveto(0.5)
+    app.update()
+    assert lista.cards == cards
+    primeiro = int(lista.canvas.canvasy(0)) // main.ALTURA_CARD
+    assert lista.cards[0].anuncio is lista.itens[primeiro]
+
+def test_fila_entrega_em_blocos(app):
+    app._na_ui("lote", _analisados(main.TAMANHO_BLOCO_UI * 2 + 10))
+    app._na_ui("status", "ok", "green")
+    app._drenar_fila()
+    assert len(app.lista_resultados.itens) == main.TAMANHO_BLOCO_UI
+    assert app.lbl_status.cget("text") == "ok"
+    app._drenar_fila()
+    app._drenar_fila()
+    assert len(app.lista_resultados.itens) == main.TAMANHO_BLOCO_UI * 2 + 10
+    assert not app.pendentes
+
+class _Janela:
+    """Só o que ``rodar_scraper`` usa da janela: a fila de mensagens para a UI."""
+    rodar_scraper = main.PyMotorsApp.rodar_scraper
+
+    def __init__(self):
+        self.mensagens = []
+
+    def _na_ui(self, tipo, *dados):
+        self.mensagens.append((tipo, dados))
+
+    def do_tipo(self, tipo: str) -> list:
+        return [dados for t, dados in self.mensagens if t == tipo]
+
+@pytest.fixture
+def consultores(monkeypatch, stub):
+    """A busca da GUI apontada para o stub; devolve os ConsultorFipe criados por ela."""
+    criados = []
+
+    class Consultor(ConsultorFipe):
+        def __init__(self):
+            super().__init__(usar_cache=False, base_url=stub.url_fipe)
+            criados.append(self)
+
+    monkeypatch.setattr(src.fipe, "ConsultorFipe", Consultor)
+    monkeypatch.setattr(src.scraper, "OLXScraper",
+                        lambda max_paralelo: OLXScraper(max_paralelo=max_paralelo, intervalo_minimo=0,
+                                                        base_url=stub.url_olx))
+    return criados
+
+def test_busca_com_ano_mostra_fipe_e_entrega_as_paginas(consultores):
+    janela = _Janela()
+    janela.rodar_scraper("Honda Civic", "Honda Civic", "BR", (None, None, 2018, None, 3, False))
+    valor, _, cor = janela.do_tipo("fipe")[0]
+    assert valor.startswith("R$ ") and cor == "green"
+    lotes = [dados[0] for dados in janela.do_tipo("lote")]
+    assert sum(len(l) for l in lotes) == 150
+    assert any(a.score_preco in ("Excelente", "Bom", "Caro") for l in lotes for a in l)
+    assert janela.mensagens[-1] == ("fim", ())
+
+def test_sem_anos_nas_paginas_nao_consulta_a_fipe(consultores, monkeypatch):
+    pagina = [Anuncio(id=str(i), titulo="Honda Civic", preco=90_000) for i in range(10)]
+    monkeypatch.setattr(OLXScraper, "iterar_paginas", lambda self, *args: iter([pagina]))
+    janela = _Janela()
+    janela.rodar_scraper("Honda Civic", "Honda Civic", "BR", (None, None, None, None, 1, False))
+    assert consultores[0].requisicoes == 0
+    assert janela.do_tipo("fipe") == [("--", "Ano não informado.", "gray60")]
+    assert len(janela.do_tipo("lote")[0][0]) == 10
+
+def test_erro_da_fipe_aparece_na_ui(consultores):
+    janela = _Janela()
+    janela.rodar_scraper("Ferrari F40", "Ferrari F40", "BR", (None, None, None, None, 1, False))
+    assert ("Não achei", "Marca 'ferrari' não encontrada.", "#D03B3B") in janela.do_tipo("fipe")
+    assert len(janela.do_tipo("lote")[0][0]) == 50
+
+def test_contagem_de_duplicados_vai_pela_fila(consultores, monkeypatch):
+    def carro(id_, foto):
+        return Anuncio(id=id_, titulo="Honda Civic", preco=90_000, imagem=f"https://img/{foto}.jpg")
+    paginas = [[carro("1", "a"), carro("2", "a"), carro("3", "b")], [carro("4", "b")]]
+    monkeypatch.setattr(OLXScraper, "iterar_paginas", lambda self, *args: iter(paginas))
+    janela = _Janela()
+    janela.rodar_scraper("Honda Civic", "Honda Civic", "BR", (None, None, None, None, 2, False))
+
+    primeiro_lote = janela.do_tipo("lote")[0][0]
+    assert [a.id for a in primeiro_lote] == ["1", "3"]
+    # Cópia na mesma página: contada antes do envio. Cópia numa página seguinte: o anúncio já é
+    # da UI, então só a mensagem leva a contagem
+    assert primeiro_lote[0].duplicados == 1
+    assert primeiro_lote[1].duplicados == 0
+    assert janela.do_tipo("duplicados") == [("3", 1)]
+
+def test_card_mostra_duplicados_recebidos(app):
+    anuncio = _analisados(1)[0]
+    app._na_ui("lote", [anuncio])
+    app._drenar_fila()
+    app.update()
+    app._na_ui("duplicados", anuncio.id, 2)
+    app._drenar_fila()
+    assert anuncio.duplicados == 2
+    card = next(c for c in app.lista_resultados.cards if c.anuncio is anuncio)
+    assert "mais 2 anúncios deste carro" in card.lbl_local.cget("text")
@@ -0,0 +1,54 @@
+from src.indice_fipe import IndiceMarcas, IndiceModelos, tokenizar
+
+MARCAS = [{"codigo": "1", "nome": "Acura"}, {"codigo": "25", "nome": "Honda"},
+          {"codigo": "59", "nome": "VW - VolksWagen"}, {"codigo": "21", "nome": "Citroën"}]
+MODELOS = [{"codigo": 1, "nome": "Civic Sedan LX 2.0 Flex Aut."},
+           {"codigo": 2, "nome": "Civic Sedan LXR 2.0 Flex Aut."},
+           {"codigo": 3, "nome": "Civic Sedan EXL 2.0 Flex Aut."},
+           {"codigo": 4, "nome": "Fit LX 1.5 Flex"},
+           {"codigo": 5, "nome": "City"}]
+
+def _codigos(ranking) -> list:
+    return [m["codigo"] for m, _ in ranking]
+
+def test_tokenizar_normaliza_acentos_e_decimais():
+    assert tokenizar("Citroën C4 1.6 16V") == ["citroen", "c4", "1.6", "16v"]
+
+def test_marcas_exata_depois_substring():
+    indice = IndiceMarcas.do_catalogo(MARCAS)
+    assert indice.buscar("HONDA") == "25"
+    assert indice.buscar("citroen") == "21"
+    assert indice.buscar("volks") == "59"
+    assert indice.buscar("ferrari") is None
+    assert IndiceMarcas.de_dict(indice.para_dict()).buscar("vw") == "59"
+
+def test_modelos_nome_identico_vale_um():
+    indice = IndiceModelos.do_catalogo(MODELOS)
+    melhor, nota = indice.buscar("City")[0]
+    assert (melhor["codigo"], nota) == (5, 1.0)
+
+def test_modelos_ranking_por_cobertura_e_exatidao():
+    indice = IndiceModelos.do_catalogo(MODELOS)
+    ranking = indice.buscar("civic lx")
+    # "lx" casa "lx" e, por prefixo, "lxr"; o casamento exato vem antes
+    assert _codigos(ranking) == [1, 2]
+    assert ranking[0][1] > ranking[1][1]
+    assert _codigos(indice.buscar("lx")) == [4, 1, 2]
+    assert indice.buscar("civic", limite=2) == indice.buscar("civic")[:2]
+    assert indice.buscar("corolla") == []
+
+def test_modelos_substring_como_ultimo_recurso():
+    indice = IndiceModelos.do_catalogo(MODELOS)
+    # "ivic" não é prefixo de nenhum token, mas aparece dentro do nome
+    ranking = indice.buscar("ivic")
+    assert _codigos(ranking) == [1, 2, 3]
+    assert {nota for _, nota in ranking} == {0.25}
+
+def test_modelos_consulta_vazia_prefere_nomes_curtos():
+    indice = IndiceModelos.do_catalogo(MODELOS)
+    assert _codigos(indice.buscar(""))[0] == 5
+
+def test_modelos_serializacao():
+    indice = IndiceModelos.do_catalogo(MODELOS)
+    copia = IndiceModelos.de_dict(indice.para_dict())
+    assert copia.buscar("civic exl") == indice.buscar("civic exl")
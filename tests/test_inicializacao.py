@@ -0,0 +1,14 @@
+from benchmarks.inicializacao import PESADOS, diretos, importtime
+
+def test_diretos_pega_so_o_primeiro_nivel():
+    # -X importtime lista os filhos antes do pai
+    linhas = [(1, "os", 50, 900), (2, "neto", 100, 100), (1, "filho", 200, 300),
+              (0, "alvo", 10, 1_500), (0, "depois", 10, 10)]
+    assert diretos(linhas, "alvo") == {"alvo": 1.5, "filho": 0.3, "os": 0.9}
+    assert diretos(linhas, "filho") == {"filho": 0.3, "neto": 0.1}
+
+def test_main_nao_carrega_dependencias_pesadas():
+    linhas = importtime("main")
+    carregados = {nome.split(".")[0] for _, nome, _, _ in linhas}
+    assert "main" in carregados and "customtkinter" in carregados
+    assert not carregados & set(PESADOS)
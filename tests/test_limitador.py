@@ -0,0 +1,60 @@
+import math
+import time
+
+from src.limitador import BaldeFichas
+
+def _ritmo(balde: BaldeFichas, n: int, intervalo: float):
+    for _ in range(n):
+        balde.adquirir()
+        time.sleep(intervalo)
+
+def test_sem_limite_penaliza_pela_metade_do_ritmo_observado():
+    balde = BaldeFichas(taxa=float("inf"))
+    _ritmo(balde, 10, 0.01)
+    balde.penalizar()
+    # ~100 req/s observados: cai para ~50, e não para 1 req/s fixo
+    assert 10 < balde.taxa < 100
+
+def test_sem_observacao_comeca_em_uma_por_segundo():
+    balde = BaldeFichas(taxa=float("inf"))
+    balde.penalizar()
+    assert balde.taxa == 1.0
+
+def test_penaliza_pelo_menor_entre_taxa_e_ritmo():
+    balde = BaldeFichas(taxa=1000.0)
+    _ritmo(balde, 5, 0.02)
+    balde.penalizar()
+    assert balde.taxa < 50
+    balde = BaldeFichas(taxa=2.0, taxa_minima=0.5)
+    balde.penalizar()
+    assert balde.taxa == 1.0
+    balde.penalizar()
+    balde.penalizar()
+    assert balde.taxa == 0.5
+
+def test_recupera_ate_o_teto_configurado():
+    balde = BaldeFichas(taxa=2.0)
+    balde.penalizar()
+    balde.penalizar()
+    for _ in range(50):
+        balde.aliviar()
+    assert balde.taxa == 2.0
+
+    balde = BaldeFichas(taxa=1.0, taxa_maxima=4.0)
+    for _ in range(50):
+        balde.aliviar()
+    assert balde.taxa == 4.0
+
+def test_sem_limite_volta_a_ser_ilimitado():
+    balde = BaldeFichas(taxa=float("inf"))
+    _ritmo(balde, 10, 0.01)
+    balde.penalizar()
+    assert not math.isinf(balde.taxa)
+    for _ in range(20):
+        balde.aliviar()
+    assert math.isinf(balde.taxa)
+
+def test_pausa_segura_a_proxima_ficha():
+    balde = BaldeFichas(taxa=float("inf"))
+    balde.penalizar(pausa=0.1)
+    assert balde.adquirir() > 0.05
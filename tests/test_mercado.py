@@ -0,0 +1,98 @@
+import os
+import random
+from dataclasses import replace
+
+import numpy as np
+
+from src.mercado import M2Y, MKX, MKXX, MY, N, NK, EstatisticasMercado
+from src.models import AnuncioLeve
+
+def _anuncios(n: int, seed: int = 0, estado: str = "SP", ano: int = 2018) -> list:
+    rng = random.Random(seed)
+    anuncios = []
+    for i in range(n):
+        km = rng.randint(10_000, 150_000)
+        preco = 120_000 * (0.97 ** (km / 10_000)) * rng.uniform(0.9, 1.1)
+        anuncios.append(AnuncioLeve(id=f"{seed}-{i}", titulo="Honda Civic EXL", preco=round(preco), ano=ano,
+                                    km=km, estado=estado))
+    return anuncios
+
+def test_lotes_mesclados_igual_a_um_lote_so():
+    anuncios = _anuncios(300)
+    inteiro, em_lotes = EstatisticasMercado(), EstatisticasMercado()
+    assert inteiro.adicionar(anuncios, "Honda Civic") == 300
+    for i in range(0, 300, 70):
+        em_lotes.adicionar(anuncios[i:i + 70], "Honda Civic")
+    np.testing.assert_allclose(em_lotes._est[:len(em_lotes)], inteiro._est[:len(inteiro)])
+    assert (em_lotes._hist == inteiro._hist).all()
+
+    y = np.log([a.preco for a in anuncios])
+    x = np.array([a.km for a in anuncios]) / 10_000
+    e = inteiro._est[inteiro._grupos[("honda civic", 2018, "SP")]]
+    assert e[N] == 300 and e[NK] == 300
+    np.testing.assert_allclose([e[MY], e[M2Y], e[MKX], e[MKXX]],
+                               [y.mean(), ((y - y.mean()) ** 2).sum(), x.mean(), ((x - x.mean()) ** 2).sum()])
+
+def test_percentil_acompanha_a_posicao_no_grupo():
+    anuncios = _anuncios(500)
+    mercado = EstatisticasMercado()
+    mercado.adicionar(anuncios, "Honda Civic")
+    mercado.pontuar(anuncios, "Honda Civic")
+    precos = sorted(a.preco for a in anuncios)
+    for a in anuncios:
+        posicao = sum(p < a.preco for p in precos) / len(precos) * 100
+        assert abs(a.percentil_mercado - posicao) < 5
+    baratos = [a for a in anuncios if a.percentil_mercado <= 10]
+    assert baratos and all("mais baratos do mercado" in a.tags[-1] for a in baratos)
+    # Regressão por km: mais rodado, preço esperado menor
+    por_km = sorted(anuncios, key=lambda a: a.km)
+    assert por_km[0].preco_esperado > por_km[-1].preco_esperado
+    assert mercado.resumo("Honda Civic", 2018, "SP")["variacao_por_10k_km"] < 0
+
+def test_usa_o_grupo_mais_especifico_com_amostras():
+    mercado = EstatisticasMercado(min_amostras=10)
+    mercado.adicionar(_anuncios(50, estado="SP") + _anuncios(3, seed=1, estado="AC"), "Honda Civic")
+    acre = _anuncios(1, seed=2, estado="AC")
+    mercado.pontuar(acre, "Honda Civic")
+    # (modelo, 2018, AC) tem só 3 anúncios: vale o grupo (modelo, 2018), com os 53
+    assert acre[0].percentil_mercado is not None
+    desconhecido = _anuncios(1, seed=3, ano=1990)
+    mercado.pontuar(desconhecido, "Fusca")
+    assert desconhecido[0].percentil_mercado is None
+
+def test_resumo_e_persistencia(tmp_path):
+    caminho = os.path.join(tmp_path, "mercado.sqlite")
+    anuncios = _anuncios(400)
+    mercado = EstatisticasMercado(caminho)
+    mercado.adicionar(anuncios, "Honda Civic")
+    resumo = mercado.resumo("Honda Civic", 2018, "SP")
+    mediana = sorted(a.preco for a in anuncios)[200]
+    assert resumo["anuncios"] == 400 and abs(resumo["mediana"] / mediana - 1) < 0.05
+    assert resumo["p10"] < resumo["p25"] < resumo["mediana"] < resumo["p75"] < resumo["p90"]
+    assert mercado.resumo("Fusca") is None
+    mercado.fechar()
+
+    reaberto = EstatisticasMercado(caminho)
+    assert len(reaberto) == 3
+    assert reaberto.resumo("Honda Civic", 2018, "SP") == resumo
+    reaberto.fechar()
+
+def test_listid_repetido_nao_conta_de_novo_e_preco_novo_substitui(tmp_path):
+    caminho = os.path.join(tmp_path, "mercado.sqlite")
+    anuncios = _anuncios(200)
+    mercado = EstatisticasMercado(caminho)
+    assert mercado.adicionar(anuncios, "Honda Civic") == 200
+    mercado.fechar()
+
+    reaberto = EstatisticasMercado(caminho)
+    assert reaberto.adicionar(anuncios, "Honda Civic") == 0
+    # 20 anúncios baixaram de preço: a observação antiga sai e a nova entra no lugar
+    alterados = [replace(a, preco=round(a.preco * 0.8)) for a in anuncios[:20]] + anuncios[20:]
+    assert reaberto.adicionar(alterados, "Honda Civic") == 20
+
+    do_zero = EstatisticasMercado()
+    do_zero.adicionar(alterados, "Honda Civic")
+    for chave, i in do_zero._grupos.items():
+        np.testing.assert_allclose(reaberto._est[reaberto._grupos[chave]], do_zero._est[i], atol=1e-9)
+        assert (reaberto._hist[reaberto._grupos[chave]] == do_zero._hist[i]).all()
+    reaberto.fechar()
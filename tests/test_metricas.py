@@ -0,0 +1,67 @@
+import json
+import os
+import threading
+
+from src.metricas import Histograma, Metricas, perfil
+
+def test_histograma_percentis_pelo_limite_do_balde():
+    h = Histograma()
+    for ms in [0.5] * 90 + [40] * 9 + [70_000]:
+        h.registrar(ms)
+    assert h.percentil(50) == 1
+    assert h.percentil(95) == 50
+    assert h.percentil(100) == 70_000
+    assert h.resumo()["baldes"] == {"<=1": 90, "<=50": 9, ">60000": 1}
+    assert Histograma().percentil(95) == 0.0
+
+def test_resumo_http_contadores_e_taxa_de_acerto():
+    m = Metricas()
+    m.requisicao("olx.busca", 200, 1024, 0.1)
+    m.requisicao("olx.busca", 429, 0, 0.01)
+    m.contar("fipe.cache.hit", 3)
+    m.contar("fipe.cache.miss")
+    m.erro("olx.parse_pagina")
+    with m.etapa("analise.lote"):
+        pass
+
+    r = m.resumo()
+    assert r["http"]["olx.busca"] == {"requisicoes": 2, "bytes": 1024, "status": {"200": 1, "429": 1}}
+    assert r["etapas"]["http.olx.busca"]["n"] == 2
+    assert r["etapas"]["analise.lote"]["n"] == 1
+    assert r["taxa_acerto"] == {"fipe.cache": 0.75}
+    assert r["erros"] == {"olx.parse_pagina": 1}
+
+def test_cronometrado_e_thread_safe():
+    m = Metricas()
+
+    @m.cronometrado("trabalho")
+    def trabalho():
+        m.contar("feito")
+
+    threads = [threading.Thread(target=lambda: [trabalho() for _ in range(500)]) for _ in range(8)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert m.resumo()["contadores"]["feito"] == 4_000
+    assert m.resumo()["etapas"]["trabalho"]["n"] == 4_000
+
+def test_inativo_nao_registra():
+    m = Metricas(ativo=False)
+    m.contar("x")
+    m.erro("y")
+    m.tempo("z", 1.0)
+    r = m.resumo()
+    assert (r["contadores"], r["erros"], r["etapas"]) == ({}, {}, {})
+
+def test_salvar_json_e_perfil(tmp_path):
+    m = Metricas()
+    m.contar("x")
+    caminho = m.salvar_json(os.path.join(tmp_path, "sub", "metricas.json"))
+    with open(caminho, encoding="utf-8") as f:
+        assert json.load(f)["contadores"] == {"x": 1}
+
+    prof = os.path.join(tmp_path, "sub", "busca.prof")
+    with perfil(prof):
+        sum(range(1000))
+    assert os.path.getsize(prof) > 0
+    with perfil(None):
+        pass
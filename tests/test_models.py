@@ -0,0 +1,22 @@
+from src.models import CAMPOS_ANUNCIO, Anuncio, AnuncioLeve, limpar_preco
+
+def test_leve_tem_os_campos_do_anuncio():
+    assert tuple(f for f in AnuncioLeve.__dataclass_fields__) == CAMPOS_ANUNCIO
+    assert not hasattr(AnuncioLeve(id="1", titulo="x"), "__dict__")
+
+def test_ida_e_volta_preserva_os_valores():
+    original = Anuncio(listId="7", subject="Honda Civic", price="R$ 95.500,00", ano=2020, km=30_000,
+                       tags=["✅ Abaixo da Fipe"], propriedades={"motor": "2.0"})
+    leve = AnuncioLeve.de_anuncio(original)
+    assert leve.preco == 95_500.0
+    assert leve.para_anuncio() == original
+    # Listas e dicionários são copiados: mexer no gêmeo não altera o original
+    leve.tags.append("outra")
+    leve.propriedades["cor"] = "preto"
+    assert original.tags == ["✅ Abaixo da Fipe"] and original.propriedades == {"motor": "2.0"}
+
+def test_limpar_preco():
+    assert limpar_preco("R$ 1.234,50") == 1234.5
+    assert limpar_preco("") == 0.0
+    assert limpar_preco(None) == 0.0
+    assert limpar_preco(1500) == 1500
@@ -0,0 +1,126 @@
+import json
+import os
+
+import pytest
+
+import src.pipeline
+from src.armazem import ArmazemAnuncios
+from src.detalhes import CacheDetalhes, EnriquecedorAnuncios
+from src.duplicados import IndiceDuplicados
+from src.fipe import ConsultorFipe
+from src.mercado import N, EstatisticasMercado
+from src.models import Consulta
+from src.pipeline import executar_consulta, executar_lote, ler_consultas
+from src.scraper import OLXScraper
+
+@pytest.fixture
+def fontes(stub):
+    return (OLXScraper(intervalo_minimo=0, max_paralelo=4, base_url=stub.url_olx),
+            ConsultorFipe(usar_cache=False, base_url=stub.url_fipe))
+
+def test_consulta_busca_precifica_e_analisa(fontes):
+    scraper, consultor = fontes
+    resultado = executar_consulta(Consulta(termo="Honda Civic", paginas=2, min_year=2018), scraper, consultor)
+    assert resultado.erro is None
+    assert len(resultado.anuncios) == resultado.novos == 100
+    assert resultado.fipe_valor > 0
+    assert resultado.fipe_confianca > 0.5
+    assert set(resultado.fipe_por_ano) >= {a.ano for a in resultado.anuncios if 2013 <= a.ano <= 2024}
+    assert any(a.tags for a in resultado.anuncios)
+    # Excelente e Bom primeiro
+    scores = [a.score_preco for a in resultado.anuncios]
+    assert scores == sorted(scores, key=lambda s: (s != "Excelente", s != "Bom"))
+
+def test_consulta_sem_ano_nao_usa_referencia_unica(fontes):
+    scraper, consultor = fontes
+    resultado = executar_consulta(Consulta(termo="Honda Civic", paginas=1), scraper, consultor)
+    assert resultado.fipe_valor == 0.0
+    assert resultado.fipe_msg == "Ano não informado."
+    assert resultado.fipe_confianca is not None
+
+def test_lote_grava_um_json_por_consulta(fontes, tmp_path):
+    scraper, consultor = fontes
+    consultas = [Consulta(termo="Honda Civic", paginas=1, estado=uf) for uf in ("SP", "RJ")]
+    resultados = executar_lote(consultas, workers=2, pasta_saida=str(tmp_path), scraper=scraper, consultor=consultor)
+    assert [r.consulta.estado for r in resultados] == ["SP", "RJ"]
+    assert sorted(os.listdir(tmp_path))[0].startswith("analise_RJ_Honda-Civic")
+    assert len(os.listdir(tmp_path)) == 2
+
+def test_ler_consultas_jsonl_e_csv(tmp_path):
+    jsonl = tmp_path / "consultas.jsonl"
+    jsonl.write_text(json.dumps({"termo": "Fiat Uno", "paginas": 3}) + "\n\n" + json.dumps({"termo": "Gol"}) + "\n")
+    csv = tmp_path / "consultas.csv"
+    csv.write_text("termo,paginas,min_year,estado\nFiat Uno,3,2015,\nGol,,,SP\n")
+
+    assert [(c.termo, c.paginas) for c in ler_consultas(str(jsonl))] == [("Fiat Uno", 3), ("Gol", 1)]
+    uno, gol = ler_consultas(str(csv))
+    assert (uno.min_year, uno.estado, gol.paginas, gol.estado) == (2015, None, 1, "SP")
+
+def test_incremental_so_analisa_o_que_mudou(fontes, tmp_path):
+    scraper, consultor = fontes
+    armazem = ArmazemAnuncios(os.path.join(tmp_path, "anuncios.sqlite"))
+    consulta = Consulta(termo="Honda Civic", paginas=3, min_year=2018)
+    primeira = executar_consulta(consulta, scraper, consultor, armazem)
+    segunda = executar_consulta(consulta, scraper, consultor, armazem)
+    assert primeira.novos == 150 and len(armazem) == 150
+    # Página 1 toda conhecida: a paginação para nela e nada passa de novo pela FIPE
+    assert segunda.novos == 0
+    assert segunda.fipe_msg == "Nenhum anúncio novo; FIPE não consultada."
+    assert segunda.fipe_confianca is None
+    por_id = {a.id: a for a in primeira.anuncios}
+    assert all(a == por_id[a.id] for a in segunda.anuncios) and len(segunda.anuncios) == 50
+    armazem.fechar()
+
+def test_incremental_guarda_as_copias_descartadas(fontes, tmp_path):
+    scraper, consultor = fontes
+    armazem = ArmazemAnuncios(os.path.join(tmp_path, "anuncios.sqlite"))
+    pagina = scraper.buscar("Honda Civic", paginas=1)
+    pagina.append(pagina[0].model_copy(update={"id": "copia"}))
+    consulta = Consulta(termo="Honda Civic", min_year=2018)
+
+    primeira = executar_consulta(consulta, scraper, consultor, armazem, paginas=[pagina],
+                                 duplicados=IndiceDuplicados())
+    assert primeira.novos == 50 and "copia" not in primeira.ids_novos
+    # A cópia foi registrada: o re-scan (outro processo, índice novo) não a vê como nova
+    assert len(armazem) == 51 and armazem.todos_conhecidos(pagina)
+    segunda = executar_consulta(consulta, scraper, consultor, armazem, paginas=[pagina],
+                                duplicados=IndiceDuplicados())
+    assert segunda.novos == 0 and len(segunda.anuncios) == 50
+    armazem.fechar()
+
+def test_lote_com_detalhes_abre_um_enriquecedor_e_fecha(fontes, tmp_path, monkeypatch):
+    abertos = []
+
+    class EnriquecedorContado(EnriquecedorAnuncios):
+        def __init__(self, scraper):
+            super().__init__(scraper, cache=CacheDetalhes(os.path.join(tmp_path, f"detalhes{len(abertos)}.sqlite")))
+            self.fechado = False
+            abertos.append(self)
+
+        def fechar(self):
+            super().fechar()
+            self.fechado = True
+
+    monkeypatch.setattr(src.pipeline, "EnriquecedorAnuncios", EnriquecedorContado)
+    scraper, consultor = fontes
+    consultas = [Consulta(termo="Honda Civic", paginas=1, estado=uf, detalhes=True) for uf in ("SP", "RJ")]
+    resultados = executar_lote(consultas, workers=2, pasta_saida=None, scraper=scraper, consultor=consultor)
+    assert all(r.erro is None and all(a.descricao for a in r.anuncios) for r in resultados)
+    assert len(abertos) == 1 and abertos[0].fechado
+
+    # Consulta avulsa com detalhes: o enriquecedor dela também é fechado no fim
+    executar_consulta(consultas[0], scraper, consultor)
+    assert len(abertos) == 2 and abertos[1].fechado
+
+def test_mercado_nao_reconta_o_mesmo_anuncio(fontes):
+    scraper, consultor = fontes
+    mercado = EstatisticasMercado()
+    consulta = Consulta(termo="Honda Civic", paginas=2, min_year=2018)
+    executar_consulta(consulta, scraper, consultor, mercado=mercado)
+    contagens = mercado._est[:len(mercado), N].copy()
+    assert contagens.max() == 100
+
+    # Sem armazém, o re-scan traz os mesmos 100 anúncios como "novos": o mercado não muda
+    resultado = executar_consulta(consulta, scraper, consultor, mercado=mercado)
+    assert resultado.erro is None and resultado.novos == 100
+    assert (mercado._est[:len(mercado), N] == contagens).all()
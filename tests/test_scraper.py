@@ -0,0 +1,130 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.fixtures import pagina_olx
+from src.metricas import metricas
+from src.scraper import OLXScraper, extrair_next_data, extrair_next_data_soup
+
+def _scraper(stub, **kwargs) -> OLXScraper:
+    return OLXScraper(intervalo_minimo=0, base_url=stub.url_olx, **kwargs)
+
+def test_paralelo_igual_ao_serial(stub):
+    serial = [a.id for a in _scraper(stub).buscar("civic", paginas=4)]
+    paralelo = [a.id for a in _scraper(stub, max_paralelo=4).buscar("civic", paginas=4)]
+    assert len(serial) == 200
+    assert paralelo == serial
+
+def test_para_na_primeira_pagina_vazia(stub):
+    # O stub tem 5 páginas; a 6ª vem vazia e nada depois dela é entregue
+    assert len(_scraper(stub, max_paralelo=3).buscar("civic", paginas=8)) == 250
+
+def test_parar_quando_encerra_a_paginacao(stub):
+    anuncios = _scraper(stub, max_paralelo=2).buscar("civic", paginas=5, parar_quando=lambda pagina: True)
+    assert len(anuncios) == 50
+
+def test_varredura_direta_igual_ao_soup():
+    html = pagina_olx(1, 20)
+    assert extrair_next_data(html) == extrair_next_data_soup(html)
+    assert extrair_next_data(html.encode()) == extrair_next_data(html)
+
+    scraper = OLXScraper()
+    rapido = scraper._parse_html(html.encode())
+    lento = scraper._parse_html(html.encode(), rapido=False)
+    assert len(rapido) == 20
+    assert [a.model_dump() for a in rapido] == [a.model_dump() for a in lento]
+
+def test_next_data_com_atributos_fora_do_padrao():
+    html = "<html><SCRIPT type='application/json' ID='__NEXT_DATA__' >{\"a\": 1}</SCRIPT ></html>"
+    assert extrair_next_data(html) == {"a": 1}
+    assert extrair_next_data("<html><body>sem dados</body></html>") is None
+    assert extrair_next_data('<script id="__NEXT_DATA__">{quebrado</script>') is None
+
+def test_paginas_chegam_uma_a_uma(stub):
+    scraper = _scraper(stub)
+    paginas = scraper.iterar_paginas("civic", paginas=5)
+    assert len(next(paginas)) == 50
+    # A primeira página sai antes de a segunda ser pedida
+    assert scraper.estatisticas["requisicoes"] == 1
+    assert sum(len(p) for p in paginas) == 200
+
+def test_parse_sem_validacao_igual_ao_validado():
+    html = pagina_olx(2, 30).encode()
+    scraper = OLXScraper()
+    validados = scraper._parse_html(html)
+    leves = scraper._parse_html(html, validar=False)
+    assert [a.para_anuncio() for a in leves] == validados
+
+class _SessaoRoteirizada:
+    """Sessão falsa que devolve as respostas do roteiro em ordem e anota o perfil usado em cada GET."""
+    def __init__(self, roteiro: list, chamadas: list):
+        self.roteiro = roteiro
+        self.chamadas = chamadas
+
+    def get(self, url, params=None, impersonate=None, timeout=None):
+        self.chamadas.append(impersonate)
+        passo = self.roteiro.pop(0)
+        if isinstance(passo, Exception):
+            raise passo
+        status, conteudo, cabecalhos = passo
+        return SimpleNamespace(status_code=status, content=conteudo, headers=cabecalhos)
+
+def _roteirizado(monkeypatch, roteiro: list, **kwargs):
+    scraper = OLXScraper(intervalo_minimo=0, backoff_base=0.01, **kwargs)
+    chamadas, esperas = [], []
+    scraper._sessoes = {p: _SessaoRoteirizada(roteiro, chamadas) for p in scraper.perfis}
+    monkeypatch.setattr(scraper, "_esperar", esperas.append)
+    return scraper, chamadas, esperas
+
+_OK = (200, pagina_olx(1, 2).encode(), {})
+
+def test_429_respeita_retry_after_e_tenta_de_novo(monkeypatch):
+    scraper, chamadas, esperas = _roteirizado(monkeypatch, [(429, b"", {"Retry-After": "0.05"}), _OK])
+    assert scraper.requisitar("https://exemplo").status_code == 200
+    assert esperas == [0.05]
+    assert len(chamadas) == 2
+    resumo = scraper.resumo_requisicoes()
+    assert resumo["limitadas_429"] == 1 and resumo["retentativas"] == 1
+    # Sem intervalo mínimo, um 429 não derruba o balde para 1 req/s
+    assert scraper.balde.taxa > 1.0
+
+def test_retry_after_enorme_fica_no_teto(monkeypatch):
+    scraper, _, esperas = _roteirizado(monkeypatch, [(429, b"", {"Retry-After": "86400"}), _OK], backoff_teto=0.2)
+    inicio = time.monotonic()
+    assert scraper.requisitar("https://exemplo").status_code == 200
+    assert esperas == [0.2]
+    # A pausa do balde também respeita o teto, não um dia inteiro
+    assert scraper.balde._pausa_ate <= inicio + 0.2 + 1.0
+
+def test_desafio_troca_o_perfil(monkeypatch):
+    desafio = (200, b"<html><title>Just a moment...</title></html>", {})
+    scraper, chamadas, _ = _roteirizado(monkeypatch, [desafio, (403, b"", {}), _OK])
+    assert scraper.requisitar("https://exemplo").status_code == 200
+    assert chamadas == list(scraper.perfis[:3])
+    resumo = scraper.resumo_requisicoes()
+    assert resumo["desafios"] == 2 and resumo["rotacoes"] == 2
+    assert resumo["perfil"] == scraper.perfis[2]
+
+def test_esgota_tentativas(monkeypatch):
+    scraper, chamadas, esperas = _roteirizado(monkeypatch, [(503, b"", {})] * 3, max_tentativas=2)
+    assert scraper.requisitar("https://exemplo").status_code == 503
+    assert len(chamadas) == 3 and len(esperas) == 2
+    assert scraper.estatisticas["erros_5xx"] == 3
+
+def test_falha_de_conexao_tenta_de_novo_e_relanca(monkeypatch):
+    scraper, _, _ = _roteirizado(monkeypatch, [ConnectionError("caiu"), _OK])
+    assert scraper.requisitar("https://exemplo").status_code == 200
+    assert scraper.estatisticas["falhas_conexao"] == 1
+
+    scraper, _, _ = _roteirizado(monkeypatch, [ConnectionError("caiu")] * 2, max_tentativas=1)
+    with pytest.raises(ConnectionError):
+        scraper.requisitar("https://exemplo")
+
+def test_erro_http_vai_para_as_metricas_sem_imprimir(monkeypatch, capsys):
+    metricas.zerar()
+    scraper, _, _ = _roteirizado(monkeypatch, [(404, b"", {})])
+    assert list(scraper.iterar_paginas("civic", paginas=3)) == []
+    assert scraper.estatisticas["erros_http"] == 1
+    assert metricas.resumo()["erros"] == {"olx.http_404": 1}
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,58 @@
+from datetime import datetime
+
+from src.models import Consulta
+from src.scraper import OLXScraper
+from src.varredura import ANO_MAIS_ANTIGO, Varredura, _corte, _dividir_ano, _dividir_preco
+
+# O stub tem 5 páginas de 50 anúncios, mas declara totalOfAds = 500 e ignora os filtros:
+# com 5 páginas de limite toda fatia "estoura"; com 10, cabe
+def _varredura(stub, **kwargs) -> Varredura:
+    return Varredura(OLXScraper(intervalo_minimo=0, base_url=stub.url_olx), workers=2, ufs=["SP"], **kwargs)
+
+def test_corte_cai_dentro_da_faixa():
+    assert _corte([2010, 2012, 2014, 2016], 2010, 2020) == 2014
+    assert _corte([2030, 2031], 2010, 2020) == 2015
+    assert _corte([2019, 2019, 2019], 2010, 2019) == 2018
+    assert _corte([], 100, None) is None
+
+def test_divisores():
+    fatia = Consulta(termo="civic", estado="SP")
+    velho, novo = _dividir_ano(fatia, [])
+    assert velho.min_year == ANO_MAIS_ANTIGO and novo.max_year == datetime.now().year + 1
+    assert velho.max_year + 1 == novo.min_year and novo.estado == "SP"
+
+    barato, caro = _dividir_preco(fatia.model_copy(update={"max_price": 100_000}), [])
+    assert barato.min_price is None and barato.max_price == 50_000
+    assert caro.min_price == 50_001 and caro.max_price == 100_000
+    assert _dividir_preco(fatia.model_copy(update={"min_price": 10_000, "max_price": 10_500}), []) is None
+
+def test_fatia_no_limite_divide_sem_baixar_tudo_antes(stub):
+    varredura = _varredura(stub, dividir_por=("ano",), max_profundidade=1)
+    anuncios = [a for p in varredura.paginas(Consulta(termo="civic", paginas=5)) for a in p]
+    assert len(anuncios) == 250
+    # Só a primeira página da fatia-mãe, depois as 5 páginas de cada filha
+    assert varredura.scraper.estatisticas["requisicoes"] == 1 + 2 * 5
+    assert varredura.estatisticas["divididas"] == 1 and varredura.estatisticas["truncadas"] == 2
+
+def test_amostra_nao_desperdica_paginas_em_paralelo(stub):
+    # Com 4 páginas simultâneas, a fatia-mãe ainda só pede a primeira antes de ser dividida
+    varredura = Varredura(OLXScraper(intervalo_minimo=0, max_paralelo=4, base_url=stub.url_olx), workers=2,
+                          ufs=["SP"], dividir_por=("ano",), max_profundidade=1)
+    anuncios = [a for p in varredura.paginas(Consulta(termo="civic", paginas=5)) for a in p]
+    assert len(anuncios) == 250
+    assert varredura.scraper.estatisticas["requisicoes"] == 1 + 2 * 5
+
+def test_fatia_que_cabe_nao_divide(stub):
+    varredura = _varredura(stub)
+    anuncios = [a for p in varredura.paginas(Consulta(termo="civic", paginas=10)) for a in p]
+    assert len(anuncios) == 250
+    assert varredura.scraper.estatisticas["requisicoes"] == 6
+    assert varredura.estatisticas == {"fatias": 1, "divididas": 0, "truncadas": 0, "repetidos": 0}
+
+def test_fatia_indivisivel_busca_as_paginas_restantes(stub):
+    varredura = _varredura(stub, dividir_por=("preco",))
+    consulta = Consulta(termo="civic", paginas=5, min_price=10_000, max_price=10_500)
+    anuncios = [a for p in varredura.paginas(consulta) for a in p]
+    assert len(anuncios) == 250
+    assert varredura.scraper.estatisticas["requisicoes"] == 1 + 5
+    assert varredura.estatisticas["truncadas"] == 1
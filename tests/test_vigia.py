@@ -0,0 +1,79 @@
+import json
+import os
+
+import pytest
+
+from src.armazem import ArmazemAnuncios
+from src.fipe import ConsultorFipe
+from src.models import Alerta, Anuncio, BuscaVigiada
+from src.scraper import OLXScraper
+from src.vigia import SaidaAlerta, SaidaArquivo, Vigia, criar_saida
+
+TODOS_OS_SCORES = ("Excelente", "Bom", "Neutro", "Caro", "Cuidado")
+
+class SaidaLista(SaidaAlerta):
+    def __init__(self):
+        self.alertas = []
+
+    def enviar(self, alerta: Alerta):
+        self.alertas.append(alerta)
+
+@pytest.fixture
+def armazem(tmp_path):
+    armazem = ArmazemAnuncios(os.path.join(tmp_path, "anuncios.sqlite"))
+    yield armazem
+    armazem.fechar()
+
+def _vigia(stub, armazem, **kwargs):
+    saida = SaidaLista()
+    vigia = Vigia([BuscaVigiada(termo="Honda Civic", paginas=2, min_year=2018)], [saida],
+                  OLXScraper(intervalo_minimo=0, base_url=stub.url_olx),
+                  ConsultorFipe(usar_cache=False, base_url=stub.url_fipe), armazem,
+                  scores=TODOS_OS_SCORES, **kwargs)
+    return vigia, saida
+
+def _esquecer(armazem, ids):
+    """Simula anúncios publicados enquanto o vigia estava parado."""
+    armazem._conn.executemany("DELETE FROM anuncios WHERE id = ?", [(i,) for i in ids])
+    armazem._conn.commit()
+
+def test_carga_inicial_nao_alerta(stub, armazem):
+    vigia, saida = _vigia(stub, armazem)
+    assert vigia.executar_busca(0) == []
+    assert len(armazem) == 100 and not saida.alertas
+    assert vigia.executar_busca(0) == []
+
+def test_alerta_o_que_apareceu_com_o_processo_parado(stub, armazem):
+    vigia, _ = _vigia(stub, armazem)
+    vigia.executar_busca(0)
+    ids = [str(1_000_000 + 1000 + i) for i in range(5)]
+    _esquecer(armazem, ids)
+
+    # Processo novo, mesmo armazém: a busca já é conhecida, então os 5 anúncios "novos" alertam
+    reiniciado, saida = _vigia(stub, armazem)
+    alertas = reiniciado.executar_busca(0)
+    assert sorted(a.anuncio.id for a in alertas) == sorted(ids)
+    assert saida.alertas == alertas
+    assert reiniciado.executar_busca(0) == []
+
+def test_alertar_na_primeira(stub, armazem):
+    vigia, saida = _vigia(stub, armazem, alertar_na_primeira=True)
+    assert len(vigia.executar_busca(0)) == 100
+
+def test_alertados_limitados(stub, armazem):
+    vigia, _ = _vigia(stub, armazem, max_alertados=3)
+    vigia.executar_busca(0)
+    ids = [str(1_000_000 + 1000 + i) for i in range(10)]
+    _esquecer(armazem, ids)
+    assert len(vigia.executar_busca(0)) == 10
+    assert len(vigia._alertados) == 3
+
+def test_saidas(tmp_path):
+    caminho = os.path.join(tmp_path, "alertas.jsonl")
+    saida = criar_saida(f"arquivo:{caminho}")
+    assert isinstance(saida, SaidaArquivo)
+    saida.enviar(Alerta(busca="civic", anuncio=Anuncio(id="1", titulo="Civic", preco=1.0)))
+    with open(caminho, encoding="utf-8") as f:
+        assert json.loads(f.readline())["anuncio"]["id"] == "1"
+    with pytest.raises(ValueError):
+        criar_saida("telegrama")